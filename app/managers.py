@@ -0,0 +1,33 @@
+from django.contrib.auth.models import UserManager
+from django.db import models
+
+
+class ActiveQuerySet(models.QuerySet):
+    def active(self):
+        return self.filter(is_active=True)
+
+    def inactive(self):
+        return self.filter(is_active=False)
+
+    def deactivate(self):
+        return self.update(is_active=False)
+
+
+class ActiveManager(models.Manager.from_queryset(ActiveQuerySet)):
+    """
+    Default manager for soft-deletable models. Only rows with is_active=True
+    are returned, which lets the planner use the partial indexes declared with
+    condition=Q(is_active=True). Use the `all_objects` manager to reach
+    soft-deleted rows.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_active=True)
+
+
+class StaffManager(UserManager.from_queryset(ActiveQuerySet)):
+    """
+    Staff keeps an unfiltered default manager because authentication,
+    natural key lookups and createsuperuser must still see inactive accounts.
+    Use Staff.objects.active() in clinical queries.
+    """
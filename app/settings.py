@@ -10,14 +10,19 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+from decimal import Decimal
 from pathlib import Path
-from dotenv import load_dotenv
 import os
 
-load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
+# python-dotenv is only imported when there is a .env file to load; processes
+# that get their environment from the deployment skip its import cost.
+if (BASE_DIR / '.env').exists():
+    from dotenv import load_dotenv
+    load_dotenv(BASE_DIR / '.env')
+
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/6.0/howto/deployment/checklist/
@@ -51,15 +56,27 @@ INSTALLED_APPS = [
     'appointments.apps.AppointmentsConfig',
     'visits.apps.VisitsConfig',
     'charges.apps.ChargesConfig',
-    'payments.apps.PaymentsConfig'
+    'payments.apps.PaymentsConfig',
+    'jobs.apps.JobsConfig',
+    'benchmarks.apps.BenchmarksConfig',
+    'monitoring.apps.MonitoringConfig',
+    'partitions.apps.PartitionsConfig',
+    'sync.apps.SyncConfig',
+    'pharmacy.apps.PharmacyConfig',
+    'search.apps.SearchConfig',
+    'documents.apps.DocumentsConfig',
+    'audit.apps.AuditConfig',
 ]
 
 MIDDLEWARE = [
+    'monitoring.middleware.RequestMetricsMiddleware',
+    'monitoring.middleware.QueryProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'audit.middleware.AuditContextMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -108,6 +125,35 @@ DATABASES = {
 }
 
 
+# Cache
+# Local memory unless REDIS_URL points the workers at a shared Redis.
+# 'documents' holds rendered statement sections, a month of visits at a time.
+
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'documents': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'documents',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'documents': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'documents',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('DOCUMENT_CACHE_ENTRIES', '100000'))},
+        },
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
 
@@ -144,4 +190,110 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
-AUTH_USER_MODEL = 'staff.Staff'
\ No newline at end of file
+AUTH_USER_MODEL = 'staff.Staff'
+
+# Clinical permissions come from the staff role matrix in staff.permissions;
+# ModelBackend still authenticates and answers every other permission.
+AUTHENTICATION_BACKENDS = [
+    'staff.permissions.RoleBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+
+# Appointment scheduling
+
+CLINIC_OPENING_HOUR = 8
+CLINIC_CLOSING_HOUR = 17
+APPOINTMENT_SLOT_MINUTES = 30
+APPOINTMENT_MAX_DURATION_MINUTES = 240
+
+APPOINTMENT_NOTIFIER = os.getenv('APPOINTMENT_NOTIFIER', 'appointments.notifiers.ConsoleNotifier')
+APPOINTMENT_NOTIFIER_FILE = os.getenv('APPOINTMENT_NOTIFIER_FILE', BASE_DIR / 'appointment_notifications.jsonl')
+
+
+# Patient charts
+
+PATIENT_CHART_CACHE_TIMEOUT = int(os.getenv('PATIENT_CHART_CACHE_TIMEOUT', '900'))
+PATIENT_CHART_VISITS = 20
+
+
+# Visit status
+
+# Times a status change is retried after losing a race to another writer
+# whose change still leaves the transition valid.
+VISIT_TRANSITION_RETRIES = int(os.getenv('VISIT_TRANSITION_RETRIES', '3'))
+
+
+# Duplicate patients
+
+# Pairs scoring at least this (0 to 1) are reported as merge candidates.
+DEDUP_MATCH_THRESHOLD = float(os.getenv('DEDUP_MATCH_THRESHOLD', '0.88'))
+DEDUP_WORKERS = int(os.getenv('DEDUP_WORKERS', str(os.cpu_count() or 1)))
+
+
+# Partitioning (PostgreSQL)
+
+# Monthly partitions created ahead of time for the append-heavy tables.
+PARTITION_MONTHS_AHEAD = 3
+# Closed months kept in the live tables before archive_partitions moves them out.
+PARTITION_RETENTION_MONTHS = int(os.getenv('PARTITION_RETENTION_MONTHS', '12'))
+PARTITION_ARCHIVE_DIR = os.getenv('PARTITION_ARCHIVE_DIR', BASE_DIR / 'archive')
+
+
+# Satellite sync
+
+# Rows per model shipped in one sync round trip.
+SYNC_BATCH_SIZE = int(os.getenv('SYNC_BATCH_SIZE', '500'))
+SYNC_MAX_ROUNDS = 50
+# Rows changed more recently than this are left for the next round, so rows
+# written by a transaction that has not committed yet are not skipped.
+SYNC_CHANGE_LAG_SECONDS = int(os.getenv('SYNC_CHANGE_LAG_SECONDS', '5'))
+
+
+# Pharmacy
+
+# Window of dispensing shown next to each item in the low-stock report.
+PHARMACY_USAGE_DAYS = int(os.getenv('PHARMACY_USAGE_DAYS', '30'))
+
+
+# Billing
+
+CONSULTATION_FEE = Decimal(os.getenv('CONSULTATION_FEE', '200.00'))
+
+# Name printed at the top of receipts and statements.
+CLINIC_NAME = os.getenv('CLINIC_NAME', 'Clinic')
+DOCUMENTS_DIR = os.getenv('DOCUMENTS_DIR', BASE_DIR / 'documents_out')
+# Patients whose statements are loaded and rendered together.
+STATEMENT_BATCH_SIZE = int(os.getenv('STATEMENT_BATCH_SIZE', '200'))
+# Processes rendering statements; 1 renders in the calling process.
+DOCUMENT_WORKERS = int(os.getenv('DOCUMENT_WORKERS', str(os.cpu_count() or 1)))
+# Rendered visit sections of statements are reused from this cache for this long.
+STATEMENT_FRAGMENT_CACHE = 'documents'
+STATEMENT_FRAGMENT_TIMEOUT = int(os.getenv('STATEMENT_FRAGMENT_TIMEOUT', str(60 * 60 * 24 * 40)))
+
+
+# Monitoring
+
+# Share of requests whose queries are profiled (0 disables, 1 profiles every request).
+QUERY_PROFILING_SAMPLE_RATE = float(os.getenv('QUERY_PROFILING_SAMPLE_RATE', '1.0' if DEBUG else '0.01'))
+# Number of executions of the same SQL fingerprint within one request reported as a possible N+1.
+QUERY_PROFILING_N_PLUS_ONE_THRESHOLD = int(os.getenv('QUERY_PROFILING_N_PLUS_ONE_THRESHOLD', '5'))
+
+
+# Task queue
+
+# Attempts before a failing task is dead-lettered.
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '5'))
+# Delay before the first retry, doubled on each further attempt up to the maximum.
+TASK_RETRY_DELAY_SECONDS = 10
+TASK_RETRY_MAX_DELAY_SECONDS = 3600
+# A running task whose worker has not finished it within the lease is handed out again.
+TASK_LEASE_SECONDS = int(os.getenv('TASK_LEASE_SECONDS', '300'))
+# Tasks a worker claims at once, and how long it sleeps when none are due.
+TASK_BATCH_SIZE = int(os.getenv('TASK_BATCH_SIZE', '20'))
+TASK_POLL_INTERVAL_SECONDS = float(os.getenv('TASK_POLL_INTERVAL_SECONDS', '1.0'))
+
+
+# Audit trail
+
+# Audit entries written per INSERT when a transaction's entries are flushed.
+AUDIT_BATCH_SIZE = int(os.getenv('AUDIT_BATCH_SIZE', '500'))
@@ -0,0 +1,25 @@
+from contextlib import contextmanager
+
+from django.db import models
+
+
+@contextmanager
+def preserve_timestamps(*model_classes):
+    """
+    Temporarily turn off auto_now/auto_now_add on the given models so that
+    save() and bulk_create() write the timestamps already set on the
+    instances. Only meant for single-threaded tooling such as data
+    generation and sync.
+    """
+    saved = []
+    for model in model_classes:
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.DateField) and (field.auto_now or field.auto_now_add):
+                saved.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now = auto_now
+            field.auto_now_add = auto_now_add
@@ -0,0 +1,77 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from appointments.models import Appointment
+from appointments.notifiers import get_notifier
+from jobs.batch import BatchJob
+from visits.models import Visit
+
+
+def day_bounds(day):
+    tz = timezone.get_current_timezone()
+    start = datetime.combine(day, time.min, tz)
+    return start, start + timedelta(days=1)
+
+
+class AppointmentReminderJob(BatchJob):
+    """Sends reminders for the active appointments scheduled on `day`."""
+    name = 'appointment_reminders'
+    key_field = 'scheduled_for'
+    self_limiting = True
+
+    def __init__(self, day, notifier=None, **kwargs):
+        super().__init__(run_key=day.isoformat(), **kwargs)
+        self.day = day
+        self.notifier = notifier or get_notifier()
+
+    def get_queryset(self):
+        start, end = day_bounds(self.day)
+        return Appointment.objects.filter(
+            scheduled_for__gte=start,
+            scheduled_for__lt=end,
+            status=Appointment.AppointmentStatusEnum.SCHEDULED,
+            reminder_sent_at__isnull=True,
+        ).select_related('patient', 'provider')
+
+    def process_chunk(self, chunk):
+        self.notifier.send(chunk, 'reminder')
+        Appointment.objects.filter(pk__in=[appointment.pk for appointment in chunk]).update(
+            reminder_sent_at=timezone.now(),
+        )
+
+
+class NoShowJob(BatchJob):
+    """
+    Closes out the appointments scheduled on `day`: those whose patient had a
+    visit that day are marked attended, the rest are marked as no-shows.
+    """
+    name = 'appointment_no_shows'
+    key_field = 'scheduled_for'
+    self_limiting = True
+
+    def __init__(self, day, **kwargs):
+        super().__init__(run_key=day.isoformat(), **kwargs)
+        self.day = day
+
+    def get_queryset(self):
+        start, end = day_bounds(self.day)
+        visited = Visit.objects.filter(
+            patient=OuterRef('patient'),
+            created_at__gte=start,
+            created_at__lt=end,
+        )
+        return Appointment.objects.filter(
+            scheduled_for__gte=start,
+            scheduled_for__lt=end,
+            status=Appointment.AppointmentStatusEnum.SCHEDULED,
+        ).annotate(visited=Exists(visited)).only('pk', 'scheduled_for')
+
+    def process_chunk(self, chunk):
+        attended = [appointment.pk for appointment in chunk if appointment.visited]
+        missed = [appointment.pk for appointment in chunk if not appointment.visited]
+        if attended:
+            Appointment.objects.filter(pk__in=attended).update(status=Appointment.AppointmentStatusEnum.ATTENDED)
+        if missed:
+            Appointment.objects.filter(pk__in=missed).update(status=Appointment.AppointmentStatusEnum.NO_SHOW)
@@ -0,0 +1,108 @@
+import random
+import time as timer
+from datetime import date, datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment
+from appointments.scheduling import find_conflicts, get_free_slots
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed appointments in steps up to --appointments, timing free-slot and conflict "
+        "lookups at each step. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=100_000)
+        parser.add_argument('--providers', type=int, default=50)
+        parser.add_argument('--steps', type=int, default=4)
+        parser.add_argument('--lookups', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            providers, patient, visit = self.seed_fixtures(options['providers'])
+            booked = {provider.pk: set() for provider in providers}
+            step_size = options['appointments'] // options['steps']
+            self.stdout.write(f"{'appointments':>12} {'free_slots_ms':>14} {'conflict_ms':>12}")
+            total = 0
+            for _ in range(options['steps']):
+                self.seed_appointments(rng, providers, patient, visit, booked, step_size)
+                total += step_size
+                with connection.cursor() as cursor:
+                    cursor.execute('ANALYZE')
+                free_ms, conflict_ms = self.measure(rng, providers, options['lookups'])
+                self.stdout.write(f"{total:>12} {free_ms:>14.3f} {conflict_ms:>12.3f}")
+            transaction.set_rollback(True)
+
+    def seed_fixtures(self, provider_count):
+        suffix = timezone.now().timestamp()
+        providers = Staff.objects.bulk_create([
+            Staff(username=f'bench-doctor-{suffix}-{i}', role=Staff.RoleEnum.DOCTOR)
+            for i in range(provider_count)
+        ])
+        patient = Patient.objects.create(
+            first_name='Bench',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        visit = Visit.objects.create(
+            patient=patient,
+            visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.COMPLETED,
+        )
+        return providers, patient, visit
+
+    def seed_appointments(self, rng, providers, patient, visit, booked, count):
+        slot_minutes = settings.APPOINTMENT_SLOT_MINUTES
+        slots_per_day = (settings.CLINIC_CLOSING_HOUR - settings.CLINIC_OPENING_HOUR) * 60 // slot_minutes
+        today = timezone.localdate()
+        tz = timezone.get_current_timezone()
+        appointments = []
+        while len(appointments) < count:
+            provider = rng.choice(providers)
+            # Most of the table is history; a small share lands in the next 14 days.
+            day_offset = rng.randint(0, 13) if rng.random() < 0.05 else -rng.randint(1, 3 * 365)
+            slot_index = rng.randrange(slots_per_day)
+            if (day_offset, slot_index) in booked[provider.pk]:
+                continue
+            booked[provider.pk].add((day_offset, slot_index))
+            scheduled_for = datetime.combine(
+                today + timedelta(days=day_offset), time(settings.CLINIC_OPENING_HOUR), tz,
+            ) + timedelta(minutes=slot_index * slot_minutes)
+            appointments.append(Appointment(
+                patient=patient,
+                visit=visit,
+                provider=provider,
+                scheduled_by=provider,
+                scheduled_for=scheduled_for,
+                duration_minutes=slot_minutes,
+                ends_at=scheduled_for + timedelta(minutes=slot_minutes),
+            ))
+        Appointment.objects.bulk_create(appointments, batch_size=5000)
+
+    def measure(self, rng, providers, lookups):
+        now = timezone.now()
+        started = timer.perf_counter()
+        for _ in range(lookups):
+            get_free_slots(rng.choice(providers), start=now, days=14)
+        free_ms = (timer.perf_counter() - started) * 1000 / lookups
+
+        started = timer.perf_counter()
+        for _ in range(lookups):
+            starts_at = now + timedelta(minutes=rng.randrange(14 * 24 * 60))
+            find_conflicts(rng.choice(providers), starts_at, starts_at + timedelta(minutes=30)).exists()
+        conflict_ms = (timer.perf_counter() - started) * 1000 / lookups
+        return free_ms, conflict_ms
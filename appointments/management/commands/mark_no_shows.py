@@ -0,0 +1,21 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from appointments.jobs import NoShowJob
+
+
+class Command(BaseCommand):
+    help = "Mark yesterday's appointments without a matching visit as no-shows and the rest as attended."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Day to close out (YYYY-MM-DD). Defaults to yesterday.")
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--restart', action='store_true', help="Ignore the saved checkpoint for this day.")
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate() - timedelta(days=1)
+        job = NoShowJob(day, chunk_size=options['chunk_size'], stdout=self.stdout)
+        checkpoint = job.run(restart=options['restart'])
+        self.stdout.write(self.style.SUCCESS(f"No-show pass for {day}: {checkpoint.processed} appointments processed."))
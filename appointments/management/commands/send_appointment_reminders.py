@@ -0,0 +1,21 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from appointments.jobs import AppointmentReminderJob
+
+
+class Command(BaseCommand):
+    help = "Send reminders for tomorrow's active appointments. Safe to re-run: completed chunks are skipped."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Day to remind for (YYYY-MM-DD). Defaults to tomorrow.")
+        parser.add_argument('--chunk-size', type=int, default=500)
+        parser.add_argument('--restart', action='store_true', help="Ignore the saved checkpoint for this day.")
+
+    def handle(self, *args, **options):
+        day = options['date'] or timezone.localdate() + timedelta(days=1)
+        job = AppointmentReminderJob(day, chunk_size=options['chunk_size'], stdout=self.stdout)
+        checkpoint = job.run(restart=options['restart'])
+        self.stdout.write(self.style.SUCCESS(f"Reminders for {day}: {checkpoint.processed} appointments processed."))
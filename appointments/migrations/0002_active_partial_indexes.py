@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0001_initial'),
+        ('patients', '0002_active_partial_indexes'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['patient', 'scheduled_for'], name='appt_patient_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['scheduled_for'], name='appt_scheduled_active_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:37
+
+from datetime import timedelta
+
+import django.contrib.postgres.operations
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_ends_at(apps, schema_editor):
+    Appointment = apps.get_model('appointments', 'Appointment')
+    Appointment.objects.using(schema_editor.connection.alias).update(
+        ends_at=F('scheduled_for') + timedelta(minutes=30),
+    )
+
+
+def add_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'ALTER TABLE appointments_appointment ADD CONSTRAINT appt_provider_no_overlap '
+        'EXCLUDE USING gist (provider_id WITH =, tstzrange(scheduled_for, ends_at) WITH &&) '
+        'WHERE (is_active AND provider_id IS NOT NULL)'
+    )
+
+
+def remove_overlap_constraint(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('ALTER TABLE appointments_appointment DROP CONSTRAINT IF EXISTS appt_provider_no_overlap')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0002_active_partial_indexes'),
+        ('patients', '0002_active_partial_indexes'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='duration_minutes',
+            field=models.PositiveIntegerField(default=30, help_text='Length of the appointment in minutes', validators=[django.core.validators.MinValueValidator(1), django.core.validators.MaxValueValidator(240)]),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, help_text='End of the appointment, derived from scheduled_for and duration_minutes', null=True),
+        ),
+        migrations.RunPython(backfill_ends_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='appointment',
+            name='ends_at',
+            field=models.DateTimeField(editable=False, help_text='End of the appointment, derived from scheduled_for and duration_minutes'),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='provider',
+            field=models.ForeignKey(blank=True, help_text='Doctor or staff member the appointment is booked with', null=True, on_delete=django.db.models.deletion.PROTECT, related_name='provider_appointments', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['provider', 'scheduled_for', 'ends_at'], name='appt_provider_active_idx'),
+        ),
+        django.contrib.postgres.operations.BtreeGistExtension(),
+        migrations.RunPython(add_overlap_constraint, remove_overlap_constraint),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+import django_enum.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0003_appointment_scheduling'),
+        ('patients', '0002_active_partial_indexes'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='appointment',
+            name='reminder_sent_at',
+            field=models.DateTimeField(blank=True, help_text='When the reminder for this appointment was sent', null=True),
+        ),
+        migrations.AddField(
+            model_name='appointment',
+            name='status',
+            field=django_enum.fields.EnumCharField(choices=[('SCHEDULED', 'Scheduled'), ('ATTENDED', 'Attended'), ('NO_SHOW', 'No Show')], default='SCHEDULED', max_length=9),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['SCHEDULED', 'ATTENDED', 'NO_SHOW'])), name='appointments_Appointment_status_AppointmentStatusEnum'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0004_appointment_status'),
+        ('patients', '0003_sync_feed_index'),
+        ('visits', '0006_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['updated_at', 'id'], name='appt_updated_idx'),
+        ),
+    ]
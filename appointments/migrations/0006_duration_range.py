@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:01
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('appointments', '0005_sync_feed_index'),
+        ('patients', '0003_sync_feed_index'),
+        ('visits', '0007_visit_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.CheckConstraint(condition=models.Q(('duration_minutes__gte', 1), ('duration_minutes__lte', 240)), name='appt_duration_range'),
+        ),
+    ]
@@ -1,4 +1,12 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Q
+from django_enum import EnumField
+
+from app.managers import ActiveManager
 
 from patients.models import Patient
 from staff.models import Staff
@@ -7,11 +15,24 @@ from visits.models import Visit
 
 # Create your models here.
 class Appointment(models.Model):
+    class AppointmentStatusEnum(models.TextChoices):
+        SCHEDULED = 'SCHEDULED', 'Scheduled'
+        ATTENDED = 'ATTENDED', 'Attended'
+        NO_SHOW = 'NO_SHOW', 'No Show'
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     scheduled_for = models.DateTimeField()
+    duration_minutes = models.PositiveIntegerField(
+        default=30,
+        validators=[MinValueValidator(1), MaxValueValidator(settings.APPOINTMENT_MAX_DURATION_MINUTES)],
+        help_text="Length of the appointment in minutes",
+    )
+    ends_at = models.DateTimeField(editable=False, help_text="End of the appointment, derived from scheduled_for and duration_minutes")
     reason = models.TextField(blank=True, null=True)
+    status = EnumField(AppointmentStatusEnum, default=AppointmentStatusEnum.SCHEDULED)
+    reminder_sent_at = models.DateTimeField(null=True, blank=True, help_text="When the reminder for this appointment was sent")
     is_active = models.BooleanField(default=True)
 
     patient = models.ForeignKey(
@@ -24,11 +45,42 @@ class Appointment(models.Model):
         on_delete=models.PROTECT,
         related_name='appointments',
     )
+    provider = models.ForeignKey(
+        Staff,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='provider_appointments',
+        help_text="Doctor or staff member the appointment is booked with",
+    )
     visit = models.ForeignKey(
         Visit,
         on_delete=models.PROTECT,
         related_name='appointments',
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'scheduled_for'], name='appt_patient_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['scheduled_for'], name='appt_scheduled_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['provider', 'scheduled_for', 'ends_at'], name='appt_provider_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='appt_updated_idx'),
+        ]
+        constraints = [
+            # find_conflicts() only looks this far back, so bulk writes that
+            # skip full_clean() must not store anything longer either.
+            models.CheckConstraint(
+                condition=Q(duration_minutes__gte=1, duration_minutes__lte=settings.APPOINTMENT_MAX_DURATION_MINUTES),
+                name='appt_duration_range',
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.ends_at = self.scheduled_for + timedelta(minutes=self.duration_minutes)
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"Patient {self.patient.fullname} appointment scheduled for {self.scheduled_for} by {self.scheduled_by.username}"
\ No newline at end of file
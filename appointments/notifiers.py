@@ -0,0 +1,55 @@
+import json
+import sys
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+
+class BaseNotifier:
+    """
+    Delivers appointment messages. Notifiers receive a whole chunk of
+    appointments at once so that real gateways can batch their sends.
+    """
+
+    def build_message(self, appointment, kind):
+        provider = appointment.provider.username if appointment.provider_id else None
+        return {
+            'kind': kind,
+            'appointment': appointment.pk,
+            'patient': appointment.patient_id,
+            'patient_name': appointment.patient.fullname,
+            'provider': provider,
+            'scheduled_for': timezone.localtime(appointment.scheduled_for).isoformat(),
+        }
+
+    def send(self, appointments, kind):
+        raise NotImplementedError
+
+
+class ConsoleNotifier(BaseNotifier):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, appointments, kind):
+        for appointment in appointments:
+            message = self.build_message(appointment, kind)
+            self.stream.write(f"[{kind}] {message['patient_name']} at {message['scheduled_for']}\n")
+
+
+class FileNotifier(BaseNotifier):
+    """Appends one JSON line per message to APPOINTMENT_NOTIFIER_FILE."""
+
+    def __init__(self, path=None):
+        self.path = path or settings.APPOINTMENT_NOTIFIER_FILE
+
+    def send(self, appointments, kind):
+        with open(self.path, 'a', encoding='utf-8') as handle:
+            handle.writelines(
+                json.dumps(self.build_message(appointment, kind)) + '\n'
+                for appointment in appointments
+            )
+
+
+def get_notifier():
+    return import_string(settings.APPOINTMENT_NOTIFIER)()
@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment
+from staff.models import Staff
+
+
+def find_conflicts(provider, starts_at, ends_at, exclude=None):
+    """
+    Active appointments of `provider` overlapping [starts_at, ends_at).
+
+    No appointment is longer than APPOINTMENT_MAX_DURATION_MINUTES (the
+    appt_duration_range check constraint holds every write to it), so an
+    overlapping booking must start inside (starts_at - max duration, ends_at).
+    That bound turns the lookup into a range scan on appt_provider_active_idx
+    instead of a scan over the provider's whole history.
+    """
+    max_duration = timedelta(minutes=settings.APPOINTMENT_MAX_DURATION_MINUTES)
+    conflicts = Appointment.objects.filter(
+        provider=provider,
+        scheduled_for__gt=starts_at - max_duration,
+        scheduled_for__lt=ends_at,
+        ends_at__gt=starts_at,
+    ).order_by('scheduled_for')
+    if exclude is not None:
+        conflicts = conflicts.exclude(pk=exclude.pk)
+    return conflicts
+
+
+def get_busy_intervals(provider, window_start, window_end):
+    max_duration = timedelta(minutes=settings.APPOINTMENT_MAX_DURATION_MINUTES)
+    return list(
+        Appointment.objects.filter(
+            provider=provider,
+            scheduled_for__gt=window_start - max_duration,
+            scheduled_for__lt=window_end,
+            ends_at__gt=window_start,
+        ).order_by('scheduled_for').values_list('scheduled_for', 'ends_at')
+    )
+
+
+def get_free_slots(provider, start=None, days=14, slot_minutes=None):
+    """
+    Free slots of `slot_minutes` for `provider` within clinic opening hours
+    over the next `days` days, as a list of (start, end) tuples.
+
+    Costs one indexed range query for the busy intervals followed by a single
+    sweep over them, so the work grows with the size of the window rather
+    than with the size of the appointments table.
+    """
+    slot = timedelta(minutes=slot_minutes or settings.APPOINTMENT_SLOT_MINUTES)
+    tz = timezone.get_current_timezone()
+    start = start or timezone.now()
+    first_day = timezone.localtime(start, tz).date()
+    window_start = datetime.combine(first_day, time(settings.CLINIC_OPENING_HOUR), tz)
+    window_end = datetime.combine(first_day + timedelta(days=days), time(settings.CLINIC_OPENING_HOUR), tz)
+
+    busy = get_busy_intervals(provider, window_start, window_end)
+    slots = []
+    cursor = 0
+    for offset in range(days):
+        day = first_day + timedelta(days=offset)
+        opening = datetime.combine(day, time(settings.CLINIC_OPENING_HOUR), tz)
+        closing = datetime.combine(day, time(settings.CLINIC_CLOSING_HOUR), tz)
+        candidate = _ceil_to_grid(max(start, opening), opening, slot)
+        while candidate + slot <= closing:
+            while cursor < len(busy) and busy[cursor][1] <= candidate:
+                cursor += 1
+            if cursor < len(busy) and busy[cursor][0] < candidate + slot:
+                candidate = _ceil_to_grid(busy[cursor][1], opening, slot)
+                continue
+            slots.append((candidate, candidate + slot))
+            candidate += slot
+    return slots
+
+
+def _ceil_to_grid(moment, origin, step):
+    remainder = (moment - origin) % step
+    return moment + (step - remainder) if remainder else moment
+
+
+def book_appointment(patient, visit, provider, scheduled_for, scheduled_by, duration_minutes=None, reason=None):
+    """
+    Book an appointment with `provider`, raising ValidationError on a double
+    booking or an invalid appointment, such as one longer than
+    APPOINTMENT_MAX_DURATION_MINUTES, which find_conflicts() relies on.
+
+    The provider row is locked for the duration of the check so concurrent
+    bookings for the same provider are serialized; on PostgreSQL the
+    appt_provider_no_overlap exclusion constraint backs this up.
+    """
+    appointment = Appointment(
+        patient=patient,
+        visit=visit,
+        provider=provider,
+        scheduled_for=scheduled_for,
+        scheduled_by=scheduled_by,
+        duration_minutes=duration_minutes or settings.APPOINTMENT_SLOT_MINUTES,
+        reason=reason,
+    )
+    ends_at = appointment.ends_at = scheduled_for + timedelta(minutes=appointment.duration_minutes)
+    appointment.full_clean()
+    try:
+        with transaction.atomic():
+            Staff.objects.select_for_update().only('pk').get(pk=provider.pk)
+            if find_conflicts(provider, scheduled_for, ends_at).exists():
+                raise ValidationError(f"{provider.username} already has an appointment between {scheduled_for} and {ends_at}.")
+            appointment.save()
+    except IntegrityError as exc:
+        raise ValidationError(f"{provider.username} already has an appointment between {scheduled_for} and {ends_at}.") from exc
+    return appointment
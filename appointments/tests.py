@@ -1,3 +1,94 @@
+import io
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from django.test import TestCase
+from django.utils import timezone
+
+from appointments.jobs import AppointmentReminderJob
+from appointments.models import Appointment
+from appointments.notifiers import ConsoleNotifier
+from appointments.scheduling import book_appointment
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit
 
 # Create your tests here.
+
+
+class AppointmentTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = Staff.objects.create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        cls.patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=cls.patient,
+            visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.COMPLETED,
+        )
+        cls.start = datetime(2030, 3, 4, 9, tzinfo=timezone.get_current_timezone())
+
+    def book(self, scheduled_for, duration_minutes=None):
+        return book_appointment(self.patient, self.visit, self.doctor, scheduled_for, self.doctor, duration_minutes)
+
+
+class BookAppointmentTests(AppointmentTestCase):
+    def test_books_default_slot(self):
+        appointment = self.book(self.start)
+        self.assertEqual(appointment.ends_at, self.start + timedelta(minutes=30))
+
+    def test_rejects_overlap(self):
+        self.book(self.start, 60)
+        with self.assertRaises(ValidationError):
+            self.book(self.start + timedelta(minutes=30))
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_allows_back_to_back(self):
+        self.book(self.start, 60)
+        self.book(self.start + timedelta(minutes=60))
+        self.assertEqual(Appointment.objects.count(), 2)
+
+    def test_rejects_duration_over_maximum(self):
+        # A longer booking would hide from find_conflicts(), which only looks
+        # back APPOINTMENT_MAX_DURATION_MINUTES from the new start.
+        with self.assertRaises(ValidationError):
+            self.book(self.start, settings.APPOINTMENT_MAX_DURATION_MINUTES + 1)
+        with self.assertRaises(ValidationError):
+            self.book(self.start, 600)
+        self.book(self.start + timedelta(hours=6))
+        self.assertEqual(Appointment.objects.count(), 1)
+
+    def test_database_rejects_duration_over_maximum(self):
+        appointment = Appointment(
+            patient=self.patient, visit=self.visit, scheduled_by=self.doctor, provider=self.doctor,
+            scheduled_for=self.start, duration_minutes=settings.APPOINTMENT_MAX_DURATION_MINUTES + 1,
+        )
+        appointment.ends_at = self.start + timedelta(minutes=appointment.duration_minutes)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Appointment.objects.bulk_create([appointment])
+        self.assertEqual(Appointment.objects.count(), 0)
+
+
+class AppointmentReminderJobTests(AppointmentTestCase):
+    def remind(self):
+        stream = io.StringIO()
+        AppointmentReminderJob(self.start.date(), notifier=ConsoleNotifier(stream)).run()
+        return stream.getvalue().count('[reminder]')
+
+    def test_rerun_reminds_appointments_booked_after_a_completed_run(self):
+        self.book(self.start + timedelta(hours=2))
+        self.assertEqual(self.remind(), 1)
+        # Booked after the run, earlier in the day than its last position.
+        self.book(self.start)
+        self.assertEqual(self.remind(), 1)
+        self.assertEqual(self.remind(), 0)
+        self.assertFalse(Appointment.objects.filter(reminder_sent_at__isnull=True).exists())
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class AuditConfig(AppConfig):
+    name = 'audit'
+
+    def ready(self):
+        from audit.signals import connect_audited_models
+        connect_audited_models()
@@ -0,0 +1,89 @@
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+
+from audit.models import AuditEntry
+from audit.signals import record_save
+from audit.trail import audit_context
+from monitoring.profiling import QueryProfiler
+from patients.models import Patient
+from staff.models import Staff
+
+BENCH_CITY = 'Audit bench'
+CITIES = ['Adama', 'Bahir Dar', 'Dessie', 'Gondar', 'Hawassa', 'Jimma', 'Mekelle']
+
+
+@contextmanager
+def auditing(enabled):
+    if enabled:
+        yield
+        return
+    uid = f'audit_save:{Patient._meta.label}'
+    post_save.disconnect(sender=Patient, dispatch_uid=uid)
+    try:
+        yield
+    finally:
+        post_save.connect(record_save, sender=Patient, dispatch_uid=uid)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure what the audit trail adds to saving patients, with one and with many saves per "
+        "transaction. The changes are committed, since entries are only written on commit, to "
+        "synthetic patients that are removed afterwards together with their entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--saves', type=int, default=2000)
+        parser.add_argument('--per-transaction', default='1,50', help="Comma-separated saves per transaction to run.")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        staff = Staff.objects.first()
+        if staff is None:
+            raise CommandError("No staff to attribute changes to; generate synthetic data first.")
+        if Patient.all_objects.filter(city__startswith=BENCH_CITY).exists():
+            raise CommandError("Patients from an interrupted run are left; remove them before benchmarking.")
+        rng = random.Random(options['seed'])
+        patients = Patient.objects.bulk_create([
+            Patient(
+                first_name='Bench', last_name=f'Patient {index}', date_of_birth=date(1980, 1, 1) + timedelta(days=index),
+                sex=Patient.SexEnum.FEMALE, region=Patient.RegionEnum.OROMIA, city=BENCH_CITY,
+            )
+            for index in range(options['saves'])
+        ])
+        ids = [patient.pk for patient in patients]
+        try:
+            self.stdout.write(f"{'audit':<6} {'per txn':>7} {'saves':>6} {'seconds':>8} {'us/save':>8} {'queries/txn':>12}")
+            for per_transaction in [int(value) for value in options['per_transaction'].split(',')]:
+                for enabled in (False, True):
+                    seconds, queries = self.run(ids, per_transaction, enabled, staff, rng)
+                    transactions = math.ceil(len(ids) / per_transaction)
+                    self.stdout.write(
+                        f"{'on' if enabled else 'off':<6} {per_transaction:>7} {len(ids):>6} {seconds:>8.2f} "
+                        f"{seconds / len(ids) * 1e6:>8.0f} {queries / transactions:>12.1f}"
+                    )
+        finally:
+            Patient.all_objects.filter(pk__in=ids).delete()
+            AuditEntry.objects.filter(model_label=Patient._meta.label, object_id__in=ids).delete()
+
+    def run(self, ids, per_transaction, enabled, staff, rng):
+        """(seconds, queries) to load, edit and save every patient in `ids`, `per_transaction` to a transaction."""
+        seconds = 0.0
+        profiler = QueryProfiler()
+        with auditing(enabled), audit_context(staff, 'bench_audit'), connection.execute_wrapper(profiler):
+            for start in range(0, len(ids), per_transaction):
+                chunk = ids[start:start + per_transaction]
+                started = time.perf_counter()
+                with transaction.atomic():
+                    for patient in Patient.objects.filter(pk__in=chunk):
+                        patient.city = f'{BENCH_CITY} {rng.choice(CITIES)}'
+                        patient.save()
+                seconds += time.perf_counter() - started
+        return seconds, profiler.count
@@ -0,0 +1,16 @@
+from audit.trail import audit_context
+
+
+class AuditContextMiddleware:
+    """
+    Attributes the changes made while serving a request to its user, which
+    is only loaded if something audited is changed. Changes made outside a
+    transaction are written together once the response is ready.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with audit_context(getattr(request, 'user', None), f'{request.method} {request.path}'):
+            return self.get_response(request)
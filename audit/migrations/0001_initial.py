@@ -0,0 +1,37 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:10
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django_enum.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('model_label', models.CharField(max_length=100)),
+                ('object_id', models.BigIntegerField(help_text='Primary key of the changed row')),
+                ('action', django_enum.fields.EnumCharField(choices=[('CREATE', 'Created'), ('UPDATE', 'Updated'), ('UPSERT', 'Created or updated'), ('DELETE', 'Deleted')], max_length=6)),
+                ('changes', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Field name to [old, new]; old is null when the row was written without being read first')),
+                ('changed_at', models.DateTimeField(help_text='When the change was saved, before the entry was flushed')),
+                ('source', models.CharField(blank=True, help_text='Request or command the change was made in', max_length=200)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='audit_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_label', 'object_id', 'changed_at'], name='auditentry_object_idx'), models.Index(fields=['changed_by', 'changed_at'], name='auditentry_actor_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('action__in', ['CREATE', 'UPDATE', 'UPSERT', 'DELETE'])), name='audit_AuditEntry_action_ActionEnum')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django_enum import EnumField
+
+from staff.models import Staff
+
+
+# Create your models here.
+class AuditEntry(models.Model):
+    class ActionEnum(models.TextChoices):
+        CREATE = 'CREATE', 'Created'
+        UPDATE = 'UPDATE', 'Updated'
+        UPSERT = 'UPSERT', 'Created or updated'
+        DELETE = 'DELETE', 'Deleted'
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    model_label = models.CharField(max_length=100)
+    object_id = models.BigIntegerField(help_text="Primary key of the changed row")
+    action = EnumField(ActionEnum)
+    changes = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+        help_text="Field name to [old, new]; old is null when the row was written without being read first",
+    )
+    changed_at = models.DateTimeField(help_text="When the change was saved, before the entry was flushed")
+    source = models.CharField(max_length=200, blank=True, help_text="Request or command the change was made in")
+
+    changed_by = models.ForeignKey(
+        Staff,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='audit_entries',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['model_label', 'object_id', 'changed_at'], name='auditentry_object_idx'),
+            models.Index(fields=['changed_by', 'changed_at'], name='auditentry_actor_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.object_id} {self.action.label} at {self.changed_at:%Y-%m-%d %H:%M}"
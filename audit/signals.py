@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from audit.trail import record
+from audit.tracking import Action, Audited, delete_changes, save_changes
+
+
+def record_save(sender, instance, created, raw, using, update_fields, **kwargs):
+    # Fixtures are loaded raw; they are not changes made by anyone.
+    if raw:
+        return
+    action, changes = save_changes(instance, created, update_fields)
+    if changes:
+        record(sender, instance.pk, action, changes, using)
+
+
+def record_delete(sender, instance, using, **kwargs):
+    record(sender, instance.pk, Action.DELETE, delete_changes(instance), using)
+
+
+def connect_audited_models():
+    for model in apps.get_models():
+        if issubclass(model, Audited):
+            post_save.connect(record_save, sender=model, dispatch_uid=f'audit_save:{model._meta.label}')
+            post_delete.connect(record_delete, sender=model, dispatch_uid=f'audit_delete:{model._meta.label}')
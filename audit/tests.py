@@ -0,0 +1,110 @@
+from datetime import date
+from decimal import Decimal
+
+from django.db import transaction
+from django.test import TransactionTestCase
+
+from audit.models import AuditEntry
+from audit.trail import audit_context
+from charges.models import Charge
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit
+
+# Create your tests here.
+Action = AuditEntry.ActionEnum
+
+
+class AuditTrailTests(TransactionTestCase):
+    # Entries are written on commit, which a TestCase never reaches.
+
+    def setUp(self):
+        self.patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        AuditEntry.objects.all().delete()
+
+    def updates(self):
+        return list(AuditEntry.objects.filter(action=Action.UPDATE).order_by('pk').values_list('changes', flat=True))
+
+    def test_rolled_back_savepoint_leaves_no_entry(self):
+        with transaction.atomic():
+            self.patient.city = 'Adama'
+            self.patient.save()
+            try:
+                with transaction.atomic():
+                    self.patient.city = 'Gondar'
+                    self.patient.save()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.assertEqual(AuditEntry.objects.count(), 0)
+        self.assertEqual(self.updates(), [{'city': ['Addis Ababa', 'Adama']}])
+
+    def test_nested_transactions_do_not_pile_up_buffers(self):
+        for index in range(200):
+            with transaction.atomic():
+                with transaction.atomic():
+                    self.patient.city = f'City {index}'
+                    self.patient.save()
+                try:
+                    with transaction.atomic():
+                        self.patient.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+        self.assertEqual(transaction.get_connection().__dict__.get('audit_entries'), None)
+        with transaction.atomic():
+            for index in range(200):
+                try:
+                    with transaction.atomic():
+                        self.patient.city = f'Town {index}'
+                        self.patient.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+            self.assertLessEqual(len(transaction.get_connection().__dict__['audit_entries']), 1)
+        self.assertEqual(AuditEntry.objects.filter(action=Action.UPDATE).count(), 200)
+
+    def test_unchanged_save_is_not_recorded(self):
+        staff = Staff.objects.create_user(username='cashier', role=Staff.RoleEnum.RECEPTION)
+        visit = Visit.objects.create(
+            patient=self.patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.AWAITING_VITALS,
+        )
+        Charge.objects.create(
+            visit=visit, charge_type=Charge.ChargeTypeEnum.OTHER, charge_status=Charge.ChargeStatusEnum.PENDING,
+            amount=Decimal('37.50'),
+        )
+        AuditEntry.objects.all().delete()
+
+        charge = Charge.objects.get(visit=visit)
+        charge.amount = '37.50'
+        charge.save()
+        Patient.objects.get(pk=self.patient.pk).save()
+        self.assertEqual(self.updates(), [])
+
+        with audit_context(staff, 'test'):
+            charge.amount = '40'
+            charge.save()
+        self.assertEqual(self.updates(), [{'amount': ['37.50', '40']}])
+
+    def test_changes_are_attributed_to_the_actor(self):
+        staff = Staff.objects.create_user(username='reception', role=Staff.RoleEnum.RECEPTION)
+        with audit_context(staff, 'POST /patients/1'):
+            self.patient.city = 'Adama'
+            self.patient.save()
+            with transaction.atomic():
+                self.patient.city = 'Jimma'
+                self.patient.save()
+        self.patient.city = 'Gondar'
+        self.patient.save()
+        self.assertEqual(
+            list(AuditEntry.objects.order_by('pk').values_list('changed_by', 'source')),
+            [(staff.pk, 'POST /patients/1'), (staff.pk, 'POST /patients/1'), (None, '')],
+        )
@@ -0,0 +1,126 @@
+"""
+Field-level change tracking for audited models.
+
+A model opts in by listing Audited first among its bases. Its save() and
+delete() calls are recorded by the receivers in audit.signals; the rows it
+writes in bulk are recorded by calling record_bulk() or record_update()
+next to the bulk_create() or update(). Other queryset.update() calls are
+not seen.
+"""
+from functools import cache
+
+from django.core.exceptions import ValidationError
+
+from audit.models import AuditEntry
+from audit.trail import record
+
+Action = AuditEntry.ActionEnum
+
+
+class Audited:
+    """
+    Model mixin recording every save and delete in the audit trail with the
+    fields that changed. The values a row is loaded with are kept by
+    from_db(), so the diff needs no query of its own. Fields named in
+    `audit_exclude`, the primary key and auto_now timestamps are left out.
+    """
+    audit_exclude = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Kept as loaded; only turned into a dict when the instance is saved.
+        instance._audit_loaded = (field_names, values)
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        self._audit_loaded = {**(loaded_values(self) or {}), **current_values(self, fields)}
+
+
+@cache
+def audited_fields(model):
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key
+        and not getattr(field, 'auto_now', False)
+        and not getattr(field, 'auto_now_add', False)
+        and field.name not in getattr(model, 'audit_exclude', ())
+    ]
+
+
+@cache
+def audited_attnames(model):
+    return frozenset(field.attname for field in audited_fields(model))
+
+
+def current_values(instance, fields=None):
+    """Audited field values held by `instance`, by attname; deferred fields are skipped."""
+    return {
+        field.attname: instance.__dict__[field.attname]
+        for field in audited_fields(type(instance))
+        if field.attname in instance.__dict__ and (fields is None or field.name in fields or field.attname in fields)
+    }
+
+
+def loaded_values(instance):
+    """The audited values `instance` was last loaded with or saved with, or None for a row never read."""
+    loaded = instance.__dict__.get('_audit_loaded')
+    if isinstance(loaded, tuple):
+        audited = audited_attnames(type(instance))
+        loaded = {name: value for name, value in zip(*loaded) if name in audited}
+    return loaded
+
+
+def same_value(field, old, new):
+    """Whether `old` and `new` are the same value of `field`, e.g. Decimal('37.50') and '37.50'."""
+    if old == new:
+        return True
+    try:
+        return field.to_python(old) == field.to_python(new)
+    except ValidationError:
+        return False
+
+
+def save_changes(instance, created, update_fields=None):
+    """(action, {attname: [old, new]}) of a save that just happened; the instance's baseline moves to the new values."""
+    new = current_values(instance, update_fields)
+    old = None if created else loaded_values(instance)
+    if created:
+        changes = {name: [None, value] for name, value in new.items() if value is not None}
+    elif old is None:
+        changes = {name: [None, value] for name, value in new.items()}
+    else:
+        fields = {field.attname: field for field in audited_fields(type(instance))}
+        changes = {
+            name: [old.get(name), value] for name, value in new.items()
+            if name not in old or not same_value(fields[name], old[name], value)
+        }
+    instance._audit_loaded = {**(old or {}), **new}
+    return Action.CREATE if created else Action.UPDATE, changes
+
+
+def delete_changes(instance):
+    # What was last read from or saved to the row wins over unsaved edits.
+    values = {**current_values(instance), **(loaded_values(instance) or {})}
+    return {name: [value, None] for name, value in values.items() if value is not None}
+
+
+def record_bulk(objs, action, fields=None, using='default'):
+    """
+    Record rows just written with bulk_create(): every audited field (or
+    only `fields`) that is set, with the old values unknown. Rows whose primary
+    key was not returned by the database are skipped.
+    """
+    for obj in objs:
+        if obj.pk is None:
+            continue
+        new = current_values(obj, fields)
+        obj._audit_loaded = new
+        record(type(obj), obj.pk, action, {name: [None, value] for name, value in new.items() if value is not None}, using)
+
+
+def record_update(model, pks, changes, using='default'):
+    """Record the same `changes` ({attname: [old, new]}) made to every row in `pks` with queryset.update()."""
+    for pk in pks:
+        record(model, pk, Action.UPDATE, changes, using)
@@ -0,0 +1,133 @@
+"""
+Audit trail of changes to clinical records.
+
+Entries are not written one by one. Inside a transaction they are kept
+with the connection and written with a single bulk_create once the
+transaction commits, so audited writes cost one extra query per
+transaction rather than one per change, and a change that is rolled back,
+also by a savepoint, leaves no entry. Outside a transaction, the entries
+of a request are written when its response is ready (see
+AuditContextMiddleware) and anywhere else at once.
+
+Because entries are written after the commit, a crash between the two
+loses them; the change itself is never held back by its audit entry.
+
+The actor and source of an entry come from the audit context: the
+request's user and path under the middleware, or what is passed to
+audit_context() in commands and tasks.
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from audit.models import AuditEntry
+
+_context = ContextVar('audit_context', default=None)
+
+
+class AuditContext:
+    def __init__(self, actor=None, source=''):
+        # May be request.user, which is only resolved once a change is recorded.
+        self.actor = actor
+        self.source = source[:200]
+        self.entries = []
+
+    @property
+    def actor_id(self):
+        if 'actor_id' not in self.__dict__:
+            actor = self.actor
+            self.__dict__['actor_id'] = actor.pk if actor is not None and actor.is_authenticated else None
+        return self.__dict__['actor_id']
+
+
+@contextmanager
+def audit_context(actor=None, source=''):
+    """
+    Attribute the changes made in the block to `actor` (a Staff member) and
+    `source`. Entries recorded outside a transaction are written on exit.
+    """
+    context = AuditContext(actor, source)
+    token = _context.set(context)
+    try:
+        yield context
+    finally:
+        _context.reset(token)
+        by_database = defaultdict(list)
+        for using, entry in context.entries:
+            by_database[using].append(entry)
+        for using, entries in by_database.items():
+            write(entries, using)
+
+
+def current_actor_id():
+    """Primary key of the staff member changes are attributed to, or None."""
+    context = _context.get()
+    return context.actor_id if context is not None else None
+
+
+def write(entries, using='default'):
+    AuditEntry.objects.using(using).bulk_create(entries, batch_size=settings.AUDIT_BATCH_SIZE)
+
+
+class PendingEntries(list):
+    """Entries recorded at one savepoint depth of a transaction, written when it commits."""
+
+    def __init__(self, using, position):
+        super().__init__()
+        self.using = using
+        # Index of flush() in the connection's on-commit callbacks.
+        self.position = position
+
+    def flush(self):
+        # The transaction is over, so every buffer kept with the connection,
+        # including those of savepoints rolled back, is done with; the ones
+        # committed still have their own flush() to run.
+        transaction.get_connection(self.using).__dict__.pop('audit_entries', None)
+        write(self, self.using)
+
+    def is_pending(self, connection):
+        # A rollback drops the callbacks registered since its savepoint, which
+        # all come after the ones registered before it, and a commit runs and
+        # clears them all; either way flush() is no longer at `position`.
+        callbacks = connection.run_on_commit
+        return self.position < len(callbacks) and callbacks[self.position][1] == self.flush
+
+
+def pending_entries(using):
+    """The entries to be written when the current transaction, savepoints included, commits."""
+    connection = transaction.get_connection(using)
+    buffers = connection.__dict__.setdefault('audit_entries', {})
+    key = tuple(connection.savepoint_ids)
+    entries = buffers.get(key)
+    if entries is None or not entries.is_pending(connection):
+        # Buffers of rolled back savepoints and transactions are never
+        # flushed; drop them before adding one.
+        for stale in [key for key, entries in buffers.items() if not entries.is_pending(connection)]:
+            del buffers[stale]
+        entries = buffers[key] = PendingEntries(using, len(connection.run_on_commit))
+        transaction.on_commit(entries.flush, using=using)
+    return entries
+
+
+def record(model, object_id, action, changes, using='default'):
+    """Add an entry for a change of `model` row `object_id` made on database `using`."""
+    context = _context.get()
+    entry = AuditEntry(
+        model_label=model._meta.label,
+        object_id=object_id,
+        action=action,
+        changes=changes,
+        changed_at=timezone.now(),
+        changed_by_id=context.actor_id if context is not None else None,
+        source=context.source if context is not None else '',
+    )
+    if transaction.get_connection(using).in_atomic_block:
+        pending_entries(using).append(entry)
+    elif context is not None:
+        context.entries.append((using, entry))
+    else:
+        write([entry], using)
@@ -0,0 +1,417 @@
+import random
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+
+from app.timestamps import preserve_timestamps
+from appointments.models import Appointment
+from charges.models import Charge
+from charges.services import consultation_key, lab_request_test_key
+from lab_requests.models import LabRequest, LabRequestTest, Test, TestGroup
+from lab_results.models import LabResult, Result
+from patients.models import Patient
+from payments.models import Payment
+from physical_exams.models import PhysicalExam
+from prescriptions.models import FormularyItem, Medication, Prescription
+from staff.models import Staff
+from visits.models import Visit, VisitStatusLog
+from vital_signs.models import VitalSign
+
+Status = Visit.VisitStatusEnum
+
+DEFAULT_ANCHOR = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+FIRST_NAMES = [
+    'Abebe', 'Almaz', 'Bekele', 'Birtukan', 'Chaltu', 'Dawit', 'Eleni', 'Fikru', 'Genet', 'Hana',
+    'Kebede', 'Lemlem', 'Meron', 'Mulugeta', 'Nardos', 'Selam', 'Solomon', 'Tadesse', 'Tigist', 'Yonas',
+]
+LAST_NAMES = [
+    'Alemu', 'Ayele', 'Bekele', 'Desta', 'Gebre', 'Girma', 'Haile', 'Kassa', 'Lemma', 'Mekonnen',
+    'Negash', 'Tadesse', 'Tesfaye', 'Wolde', 'Worku', 'Yilma', 'Zewdu', 'Getachew', 'Abera', 'Mengistu',
+]
+CITIES = ['Addis Ababa', 'Adama', 'Bahir Dar', 'Hawassa', 'Mekelle', 'Gondar', 'Dire Dawa', 'Jimma']
+COMPLAINTS = ['Fever', 'Headache', 'Cough', 'Abdominal pain', 'Back pain', 'Fatigue', 'Rash', 'Follow up']
+LAB_CATALOG = {
+    'Hematology': ['Hemoglobin', 'WBC count', 'Platelet count', 'ESR'],
+    'Chemistry': ['Fasting glucose', 'Creatinine', 'ALT', 'AST', 'Total cholesterol'],
+    'Serology': ['Widal', 'Weil-Felix', 'H. pylori antigen', 'HIV rapid test'],
+    'Parasitology': ['Stool exam', 'Malaria smear'],
+    'Urinalysis': ['Urine dipstick', 'Urine microscopy'],
+}
+DRUGS = [
+    ('Amoxicillin', '500mg capsule'), ('Paracetamol', '500mg tablet'), ('Ibuprofen', '400mg tablet'),
+    ('Metronidazole', '250mg tablet'), ('Ciprofloxacin', '500mg tablet'), ('Omeprazole', '20mg capsule'),
+    ('Metformin', '500mg tablet'), ('Amlodipine', '5mg tablet'), ('Azithromycin', '250mg tablet'),
+    ('Doxycycline', '100mg capsule'), ('Ceftriaxone', '1g vial'), ('Co-amoxiclav', '625mg tablet'),
+]
+
+# Share of past visits that were cancelled part way through.
+CANCELLED_SHARE = 0.05
+IN_PROGRESS_SHARE = 0.03
+QUEUE_PATH = [Status.AWAITING_PAYMENT, Status.AWAITING_VITALS, Status.AWAITING_CONSULTATION, Status.IN_CONSULTATION]
+LAB_PATH = [Status.AWAITING_LAB_PAYMENT, Status.AWAITING_LAB_SAMPLE, Status.AWAITING_REVIEW]
+
+
+class SyntheticClinic:
+    """
+    Deterministic synthetic clinic data.
+
+    The same seed, scale and anchor always produce the same rows. Patients are
+    generated in batches and everything that hangs off them is written with
+    bulk_create, so memory stays bounded by the batch size. Timestamps are
+    spread over `history_days` before the anchor; visits on the anchor's last
+    day are left in progress to populate the queues.
+    """
+
+    def __init__(self, scale=1.0, seed=0, anchor=None, history_days=365, batch_size=500):
+        self.scale = scale
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.anchor = anchor or DEFAULT_ANCHOR
+        self.history_days = history_days
+        self.batch_size = batch_size
+        self.counts = {}
+        self.booked_slots = set()
+
+    def count(self, model, rows):
+        self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(rows)
+        return rows
+
+    def scaled(self, base, minimum=1):
+        return max(minimum, int(round(base * self.scale)))
+
+    def generate(self):
+        models = [
+            Staff, Patient, Visit, VisitStatusLog, VitalSign, PhysicalExam, TestGroup, Test, LabRequest,
+            LabRequestTest, LabResult, Result, FormularyItem, Prescription, Medication, Charge, Payment, Appointment,
+        ]
+        with preserve_timestamps(*models), transaction.atomic():
+            self.create_staff()
+            self.create_catalogs()
+            patient_count = self.scaled(500)
+            for start in range(0, patient_count, self.batch_size):
+                self.create_patient_batch(min(self.batch_size, patient_count - start))
+        return self.counts
+
+    def timestamp(self, days_ago):
+        day = (self.anchor - timedelta(days=days_ago)).date()
+        opening = datetime.combine(day, time(self.rng.randint(8, 15)), self.anchor.tzinfo)
+        return opening + timedelta(minutes=self.rng.randrange(60))
+
+    def create_staff(self):
+        created = self.anchor - timedelta(days=self.history_days + 30)
+        roles = [
+            (Staff.RoleEnum.DOCTOR, self.scaled(4, 2)),
+            (Staff.RoleEnum.NURSE, self.scaled(4)),
+            (Staff.RoleEnum.LABORATORY, self.scaled(2)),
+            (Staff.RoleEnum.RECEPTION, self.scaled(2)),
+            (Staff.RoleEnum.ADMIN, 1),
+        ]
+        staff = []
+        for role, number in roles:
+            for i in range(number):
+                staff.append(Staff(
+                    username=f'syn{self.seed}-{role.lower()}-{i}',
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    role=role,
+                    phone=f'+2519{self.rng.randrange(10 ** 8):08d}',
+                    created_at=created,
+                    updated_at=created,
+                ))
+        self.staff = {role: [] for role, _ in roles}
+        for member in self.count(Staff, Staff.objects.bulk_create(staff)):
+            self.staff[member.role].append(member)
+
+    def create_catalogs(self):
+        created = self.anchor - timedelta(days=self.history_days + 30)
+        admin = self.staff[Staff.RoleEnum.ADMIN][0]
+        groups = self.count(TestGroup, TestGroup.objects.bulk_create([
+            TestGroup(name=name, price=Decimal(self.rng.randrange(100, 400, 25)), created_by=admin, created_at=created, updated_at=created)
+            for name in LAB_CATALOG
+        ]))
+        tests = []
+        for group in groups:
+            for name in LAB_CATALOG[group.name]:
+                numeric = self.rng.random() < 0.7
+                tests.append(Test(
+                    name=name,
+                    price=Decimal(self.rng.randrange(30, 200, 10)) if self.rng.random() < 0.8 else None,
+                    test_type=Test.TestTypeEnum.NUMERICAL if numeric else Test.TestTypeEnum.CATEGORICAL,
+                    unit_of_measurement='mg/dL' if numeric else None,
+                    reference_min=Decimal('10.00') if numeric else None,
+                    reference_max=Decimal('90.00') if numeric else None,
+                    test_group=group,
+                    created_by=admin,
+                    created_at=created,
+                    updated_at=created,
+                ))
+        self.tests = self.count(Test, Test.objects.bulk_create(tests))
+        self.groups_by_id = {group.pk: group for group in groups}
+        self.formulary = self.count(FormularyItem, FormularyItem.objects.bulk_create([
+            FormularyItem(name=name, strength=strength, created_at=created, updated_at=created)
+            for name, strength in DRUGS
+        ]))
+
+    def visit_path(self, days_ago):
+        needs_lab = self.rng.random() < 0.4
+        full_path = QUEUE_PATH + (LAB_PATH if needs_lab else []) + [Status.COMPLETED]
+        if days_ago > 0:
+            if self.rng.random() < CANCELLED_SHARE:
+                return full_path[:self.rng.randint(1, len(full_path) - 1)] + [Status.CANCELLED]
+            return full_path
+        return full_path[:self.rng.randint(1, len(full_path))]
+
+    def create_patient_batch(self, size):
+        rng = self.rng
+        patients = []
+        for i in range(size):
+            created = self.timestamp(rng.randint(1, self.history_days))
+            patients.append(Patient(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                date_of_birth=(self.anchor - timedelta(days=rng.randint(365, 90 * 365))).date(),
+                sex=rng.choice(list(Patient.SexEnum)),
+                weight=Decimal(rng.randint(40, 110)),
+                height=Decimal(rng.randint(140, 195)) / 100,
+                region=rng.choice(list(Patient.RegionEnum)),
+                city=rng.choice(CITIES),
+                created_at=created,
+                updated_at=created,
+            ))
+        patients = self.count(Patient, Patient.objects.bulk_create(patients))
+
+        visits, paths = [], []
+        for patient in patients:
+            first_day = (self.anchor - patient.created_at).days
+            for _ in range(rng.choices([1, 2, 3, 4], weights=[45, 30, 15, 10])[0]):
+                # A small share of visits happen on the anchor day and are still in the queues.
+                days_ago = 0 if rng.random() < IN_PROGRESS_SHARE else rng.randint(1, max(first_day, 1))
+                path = self.visit_path(days_ago)
+                moments = [self.timestamp(days_ago)]
+                for _ in path[1:]:
+                    moments.append(moments[-1] + timedelta(minutes=rng.randint(5, 45)))
+                visits.append(Visit(
+                    patient=patient,
+                    visit_category=rng.choice(list(Visit.VisitCategoryEnum)),
+                    visit_status=path[-1],
+                    chief_complaint=rng.choice(COMPLAINTS),
+                    created_at=moments[0],
+                    updated_at=moments[-1],
+                    current_status_since=moments[-1],
+                ))
+                paths.append(list(zip(path, moments)))
+        visits = self.count(Visit, Visit.objects.bulk_create(visits))
+
+        self.count(VisitStatusLog, VisitStatusLog.objects.bulk_create([
+            VisitStatusLog(visit=visit, status=status, changed_at=moment, created_at=moment, updated_at=moment)
+            for visit, path in zip(visits, paths)
+            for status, moment in path
+        ]))
+
+        reached = [{status: moment for status, moment in path} for path in paths]
+        self.create_clinical_records(visits, reached)
+
+    def create_clinical_records(self, visits, reached):
+        rng = self.rng
+        nurses = self.staff[Staff.RoleEnum.NURSE]
+        doctors = self.staff[Staff.RoleEnum.DOCTOR]
+        lab_staff = self.staff[Staff.RoleEnum.LABORATORY]
+        reception = self.staff[Staff.RoleEnum.RECEPTION]
+
+        vitals, exams, lab_requests, lab_request_visits = [], [], [], []
+        prescriptions, prescription_moments = [], []
+        charges, payments, appointments = [], [], []
+        for visit, moments in zip(visits, reached):
+            charges.append(Charge(
+                visit=visit,
+                source_key=consultation_key(visit.pk),
+                charge_type=Charge.ChargeTypeEnum.CONSULTATION,
+                charge_status=Charge.ChargeStatusEnum.PENDING,
+                amount=settings.CONSULTATION_FEE,
+                description='Consultation fee',
+                created_at=visit.created_at,
+                updated_at=visit.created_at,
+            ))
+            if Status.AWAITING_VITALS in moments:
+                paid_at = moments[Status.AWAITING_VITALS]
+                payments.append(Payment(
+                    visit=visit,
+                    amount=settings.CONSULTATION_FEE,
+                    payment_method=rng.choice(list(Payment.PaymentMethodEnum)),
+                    recorded_by=rng.choice(reception),
+                    created_at=paid_at,
+                    updated_at=paid_at,
+                ))
+            if Status.AWAITING_CONSULTATION in moments:
+                at = moments[Status.AWAITING_CONSULTATION]
+                vitals.append(VitalSign(
+                    visit=visit,
+                    recorded_by=rng.choice(nurses),
+                    bp_systolic=rng.randint(95, 165),
+                    bp_diastolic=rng.randint(60, 105),
+                    pulse_rate=rng.randint(55, 120),
+                    respiratory_rate=rng.randint(12, 28),
+                    temperature=Decimal(rng.randint(355, 395)) / 10,
+                    weight=Decimal(rng.randint(40, 110)),
+                    height=Decimal(rng.randint(140, 195)) / 100,
+                    spo2=Decimal(rng.randint(88, 100)),
+                    notes=rng.choice(['', '', 'Patient anxious', 'Repeat BP after rest']),
+                    created_at=at,
+                    updated_at=at,
+                ))
+            if Status.IN_CONSULTATION in moments:
+                at = moments[Status.IN_CONSULTATION]
+                exams.append(PhysicalExam(
+                    visit=visit,
+                    examined_by=rng.choice(doctors),
+                    heent='Unremarkable',
+                    chest=rng.choice(['Clear', 'Crackles bilaterally', 'Wheeze']),
+                    cardiovascular=rng.choice(['S1 S2 well heard', 'Murmur noted']),
+                    abdomen=rng.choice(['Soft, non tender', 'Epigastric tenderness']),
+                    created_at=at,
+                    updated_at=at,
+                ))
+            if Status.AWAITING_LAB_PAYMENT in moments:
+                at = moments[Status.AWAITING_LAB_PAYMENT]
+                lab_requests.append(LabRequest(
+                    visit=visit,
+                    ordered_by=rng.choice(doctors),
+                    is_paid=Status.AWAITING_LAB_SAMPLE in moments,
+                    created_at=at,
+                    updated_at=at,
+                ))
+                lab_request_visits.append(moments)
+            if Status.COMPLETED in moments and rng.random() < 0.6:
+                at = moments[Status.COMPLETED]
+                prescriptions.append(Prescription(visit=visit, prescribed_by=rng.choice(doctors), created_at=at, updated_at=at))
+                prescription_moments.append(at)
+                if rng.random() < 0.15:
+                    provider = rng.choice(doctors)
+                    scheduled_for = datetime.combine(
+                        (at + timedelta(days=rng.randint(7, 30))).date(),
+                        time(settings.CLINIC_OPENING_HOUR),
+                        at.tzinfo,
+                    ) + timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES * rng.randrange(16))
+                    if (provider.pk, scheduled_for) in self.booked_slots:
+                        continue
+                    self.booked_slots.add((provider.pk, scheduled_for))
+                    status = Appointment.AppointmentStatusEnum.SCHEDULED
+                    if scheduled_for < self.anchor:
+                        status = rng.choice([Appointment.AppointmentStatusEnum.ATTENDED, Appointment.AppointmentStatusEnum.NO_SHOW])
+                    appointments.append(Appointment(
+                        patient_id=visit.patient_id,
+                        visit=visit,
+                        provider=provider,
+                        scheduled_by=provider,
+                        scheduled_for=scheduled_for,
+                        duration_minutes=settings.APPOINTMENT_SLOT_MINUTES,
+                        ends_at=scheduled_for + timedelta(minutes=settings.APPOINTMENT_SLOT_MINUTES),
+                        reason='Follow up',
+                        status=status,
+                        created_at=at,
+                        updated_at=at,
+                    ))
+
+        self.count(VitalSign, VitalSign.objects.bulk_create(vitals))
+        self.count(PhysicalExam, PhysicalExam.objects.bulk_create(exams))
+        self.count(Appointment, Appointment.objects.bulk_create(appointments))
+
+        lab_requests = LabRequest.objects.bulk_create(lab_requests)
+        self.count(LabRequest, lab_requests)
+        lines, line_moments = [], []
+        for lab_request, moments in zip(lab_requests, lab_request_visits):
+            for test in rng.sample(self.tests, rng.randint(1, 4)):
+                lines.append(LabRequestTest(
+                    lab_request=lab_request,
+                    test=test,
+                    ordered_by=lab_request.ordered_by,
+                    price=test.price or self.groups_by_id[test.test_group_id].price,
+                    created_at=lab_request.created_at,
+                    updated_at=lab_request.created_at,
+                ))
+                line_moments.append(moments)
+        lines = self.count(LabRequestTest, LabRequestTest.objects.bulk_create(lines))
+
+        lab_totals = {}
+        for line in lines:
+            lab_totals[line.lab_request_id] = lab_totals.get(line.lab_request_id, Decimal('0.00')) + line.price
+            charges.append(Charge(
+                visit_id=line.lab_request.visit_id,
+                lab_request_id=line.lab_request_id,
+                source_key=lab_request_test_key(line.pk),
+                charge_type=Charge.ChargeTypeEnum.LABORATORY,
+                charge_status=Charge.ChargeStatusEnum.PENDING,
+                amount=line.price,
+                description=line.test.name,
+                created_at=line.created_at,
+                updated_at=line.created_at,
+            ))
+        for lab_request, moments in zip(lab_requests, lab_request_visits):
+            lab_request.price = lab_totals.get(lab_request.pk, Decimal('0.00'))
+            if Status.AWAITING_LAB_SAMPLE in moments:
+                paid_at = moments[Status.AWAITING_LAB_SAMPLE]
+                payments.append(Payment(
+                    visit_id=lab_request.visit_id,
+                    amount=lab_request.price,
+                    payment_method=rng.choice(list(Payment.PaymentMethodEnum)),
+                    recorded_by=rng.choice(reception),
+                    created_at=paid_at,
+                    updated_at=paid_at,
+                ))
+        LabRequest.objects.bulk_update(lab_requests, ['price'])
+        self.count(Charge, Charge.objects.bulk_create(charges))
+        self.count(Payment, Payment.objects.bulk_create(payments))
+
+        reviewed = [
+            (lab_request, moments[Status.AWAITING_REVIEW])
+            for lab_request, moments in zip(lab_requests, lab_request_visits)
+            if Status.AWAITING_REVIEW in moments
+        ]
+        lab_results = self.count(LabResult, LabResult.objects.bulk_create([
+            LabResult(
+                lab_request=lab_request,
+                visit_id=lab_request.visit_id,
+                reported_by=rng.choice(lab_staff),
+                created_at=at,
+                updated_at=at,
+            )
+            for lab_request, at in reviewed
+        ]))
+        result_by_request = {lab_result.lab_request_id: lab_result for lab_result in lab_results}
+        results = []
+        for line in lines:
+            lab_result = result_by_request.get(line.lab_request_id)
+            if lab_result is None:
+                continue
+            numeric = line.test.test_type == Test.TestTypeEnum.NUMERICAL
+            results.append(Result(
+                lab_result=lab_result,
+                test=line.test,
+                reported_by=lab_result.reported_by,
+                value_numeric=Decimal(rng.randint(50, 1200)) / 10 if numeric else None,
+                value_categorical=None if numeric else rng.choice([Result.CategoricalEnum.NEGATIVE] * 4 + [Result.CategoricalEnum.POSITIVE]),
+                created_at=lab_result.created_at,
+                updated_at=lab_result.created_at,
+            ))
+        self.count(Result, Result.objects.bulk_create(results))
+
+        prescriptions = self.count(Prescription, Prescription.objects.bulk_create(prescriptions))
+        medications = []
+        for prescription, at in zip(prescriptions, prescription_moments):
+            for item in rng.sample(self.formulary, rng.randint(1, 4)):
+                medications.append(Medication(
+                    prescription=prescription,
+                    prescribed_by=prescription.prescribed_by,
+                    formulary_item=item,
+                    name=item.name,
+                    strength=item.strength,
+                    route=item.route,
+                    frequency=rng.choice(list(Medication.FrequencyEnum)),
+                    days=rng.choice([3, 5, 7, 10, 14, 30]),
+                    created_at=at,
+                    updated_at=at,
+                ))
+        self.count(Medication, Medication.objects.bulk_create(medications))
@@ -0,0 +1,61 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from benchmarks.generator import SyntheticClinic
+from benchmarks.registry import BenchmarkContext, get_benchmarks
+from benchmarks.runner import build_report, compare_reports, run_benchmark, write_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic data, run the registered hot-path benchmarks and write a JSON report. "
+        "Everything runs in a transaction that is rolled back unless --keep-data is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--filter', help="Only run benchmarks whose name contains this string.")
+        parser.add_argument('--output', help="Write the JSON report to this path.")
+        parser.add_argument('--compare', help="Compare against a previous JSON report.")
+        parser.add_argument('--existing-data', action='store_true', help="Benchmark the data already in the database.")
+        parser.add_argument('--keep-data', action='store_true')
+
+    def handle(self, *args, **options):
+        benchmarks = get_benchmarks(options['filter'])
+        if not benchmarks:
+            raise CommandError("No benchmarks matched.")
+
+        with transaction.atomic():
+            if not options['existing_data']:
+                started = time.perf_counter()
+                counts = SyntheticClinic(scale=options['scale'], seed=options['seed']).generate()
+                self.stdout.write(f"Generated {sum(counts.values())} rows in {time.perf_counter() - started:.1f}s")
+
+            ctx = BenchmarkContext(seed=options['seed'])
+            results = []
+            self.stdout.write(f"{'benchmark':<36} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'peak KB':>9}")
+            for bench in benchmarks:
+                result = run_benchmark(bench, ctx, repeat=options['repeat'])
+                results.append(result)
+                self.stdout.write(
+                    f"{result['name']:<36} {result['queries']:>7} {result['wall_ms']['p50']:>9.3f} "
+                    f"{result['wall_ms']['p95']:>9.3f} {result['peak_memory_kb']:>9.1f}"
+                )
+            if not options['keep_data']:
+                transaction.set_rollback(True)
+
+        report = build_report(results, scale=options['scale'], seed=options['seed'], repeat=options['repeat'])
+        if options['output']:
+            write_report(report, options['output'])
+            self.stdout.write(f"Report written to {options['output']}")
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as handle:
+                previous = json.load(handle)
+            self.stdout.write(f"\n{'benchmark':<36} {'p50 now':>9} {'p50 was':>9} {'change':>8} {'queries':>9}")
+            for name, now, was, change, queries, old_queries in compare_reports(report, previous):
+                self.stdout.write(f"{name:<36} {now:>9.3f} {was:>9.3f} {change:>+8.1%} {old_queries:>4}->{queries:<4}")
@@ -0,0 +1,55 @@
+import random
+
+from django.utils.module_loading import autodiscover_modules
+
+_registry = {}
+
+
+class Benchmark:
+    def __init__(self, name, func, setup=None, repeat=None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+
+    def __repr__(self):
+        return f"<Benchmark {self.name}>"
+
+
+def benchmark(name, setup=None, repeat=None):
+    """
+    Register `func(ctx, *args)` as a benchmark. `setup(ctx)` runs before
+    every call, outside the measurement, and returns the args for `func`.
+    """
+    def decorator(func):
+        _registry[name] = Benchmark(name, func, setup=setup, repeat=repeat)
+        return func
+    return decorator
+
+
+def get_benchmarks(pattern=None):
+    autodiscover_modules('benchmarks')
+    return [
+        bench for name, bench in sorted(_registry.items())
+        if pattern is None or pattern in name
+    ]
+
+
+class BenchmarkContext:
+    """Shared state handed to benchmarks: a seeded RNG and cached pools of primary keys to sample from."""
+
+    def __init__(self, seed=0, pool_size=5000):
+        self.rng = random.Random(seed)
+        self.pool_size = pool_size
+        self._pools = {}
+
+    def pick_pk(self, queryset, key=None):
+        key = key or str(queryset.query)
+        if key not in self._pools:
+            self._pools[key] = list(queryset.values_list('pk', flat=True)[:self.pool_size])
+        if not self._pools[key]:
+            raise LookupError(f"No {queryset.model._meta.label} rows to sample; generate synthetic data first.")
+        return self.rng.choice(self._pools[key])
+
+    def pick(self, queryset, key=None):
+        return queryset.get(pk=self.pick_pk(queryset, key))
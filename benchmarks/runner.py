@@ -0,0 +1,89 @@
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_benchmark(bench, ctx, repeat=20, warmup=2):
+    """
+    Time `bench` over `repeat` calls, then make one more instrumented call to
+    count queries and measure peak Python memory. The instrumented call is
+    kept apart so query capture and tracemalloc do not skew the timings.
+    """
+    repeat = bench.repeat or repeat
+    for _ in range(warmup):
+        args = bench.setup(ctx) if bench.setup else ()
+        bench.func(ctx, *args)
+
+    timings = []
+    for _ in range(repeat):
+        args = bench.setup(ctx) if bench.setup else ()
+        started = time.perf_counter()
+        bench.func(ctx, *args)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+
+    args = bench.setup(ctx) if bench.setup else ()
+    # A busy setup can fill the capped query log, which would hide the capture.
+    reset_queries()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as captured:
+            bench.func(ctx, *args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'name': bench.name,
+        'repeat': repeat,
+        'queries': len(captured),
+        'wall_ms': {
+            'mean': round(statistics.fmean(timings), 4),
+            'p50': round(percentile(timings, 0.5), 4),
+            'p95': round(percentile(timings, 0.95), 4),
+            'min': round(timings[0], 4),
+            'max': round(timings[-1], 4),
+        },
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def build_report(results, **meta):
+    return {
+        'meta': {
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            **meta,
+        },
+        'results': results,
+    }
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2)
+
+
+def compare_reports(current, previous):
+    """Yield (name, p50 now, p50 before, relative change, queries now, queries before) per shared benchmark."""
+    before = {result['name']: result for result in previous['results']}
+    for result in current['results']:
+        old = before.get(result['name'])
+        if old is None:
+            continue
+        now_p50, old_p50 = result['wall_ms']['p50'], old['wall_ms']['p50']
+        change = (now_p50 - old_p50) / old_p50 if old_p50 else 0.0
+        yield result['name'], now_p50, old_p50, change, result['queries'], old['queries']
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ChargesConfig(AppConfig):
     name = 'charges'
+
+    def ready(self):
+        from charges import signals  # noqa: F401
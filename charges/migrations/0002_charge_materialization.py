@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charges', '0001_initial'),
+        ('lab_requests', '0003_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='charge',
+            name='lab_request',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='charges', to='lab_requests.labrequest'),
+        ),
+        migrations.AddField(
+            model_name='charge',
+            name='source_key',
+            field=models.CharField(blank=True, help_text='Identifies the order line a materialized charge was generated from', max_length=100, null=True, unique=True),
+        ),
+    ]
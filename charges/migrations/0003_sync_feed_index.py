@@ -0,0 +1,19 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('charges', '0002_charge_materialization'),
+        ('lab_requests', '0004_sync_feed_index'),
+        ('visits', '0006_sync_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='charge',
+            index=models.Index(fields=['updated_at', 'id'], name='charge_updated_idx'),
+        ),
+    ]
@@ -1,11 +1,13 @@
 from django.db import models
 from django_enum import EnumField
 
+from audit.tracking import Audited
+from lab_requests.models import LabRequest
 from visits.models import Visit
 
 
 # Create your models here.
-class Charge(models.Model):
+class Charge(Audited, models.Model):
     class ChargeStatusEnum(models.TextChoices):
         PENDING = 'PENDING', 'Pending'
         CANCELLED = 'CANCELLED', 'Cancelled'
@@ -23,9 +25,22 @@ class Charge(models.Model):
     description = models.TextField(null=True, blank=True, help_text='Description of the charge')
     charge_status = EnumField(ChargeStatusEnum)
     amount = models.DecimalField(max_digits=10, decimal_places=2)
+    source_key = models.CharField(max_length=100, unique=True, null=True, blank=True, help_text='Identifies the order line a materialized charge was generated from')
 
     visit = models.ForeignKey(
         Visit,
         on_delete=models.PROTECT,
         related_name='charges',
-    )
\ No newline at end of file
+    )
+    lab_request = models.ForeignKey(
+        LabRequest,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='charges',
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='charge_updated_idx'),
+        ]
@@ -0,0 +1,96 @@
+from decimal import Decimal
+
+from django.conf import settings
+
+from audit.tracking import Action, record_bulk
+from charges.models import Charge
+from lab_requests.models import LabRequestTest
+from visits.models import NON_BILLABLE_CHARGE_STATUSES
+
+MATERIALIZED_FIELDS = ['amount', 'charge_status', 'description', 'updated_at']
+
+
+def lab_request_test_key(line_id):
+    return f'lab_request_test:{line_id}'
+
+
+def consultation_key(visit_id):
+    return f'consultation:{visit_id}'
+
+
+def upsert_charges(charges):
+    """Insert or refresh materialized charges in a single statement, keyed on source_key."""
+    if not charges:
+        return []
+    charges = Charge.objects.bulk_create(
+        charges,
+        update_conflicts=True,
+        unique_fields=['source_key'],
+        update_fields=MATERIALIZED_FIELDS,
+    )
+    record_bulk(charges, Action.UPSERT)
+    return charges
+
+
+def materialize_lab_request_charges(lab_request, lines=None):
+    """
+    Bring the LABORATORY charges of `lab_request` in line with its tests:
+    one charge per LabRequestTest, cancelled when the line or the request is
+    no longer active. Waived charges are left as they are; cancellations
+    follow the lines, so a reactivated line is billed again. Costs one query
+    to read the lines (skipped when they are passed in), one to find the
+    waived charges and one upsert, whatever the number of tests.
+    """
+    if lines is None:
+        lines = LabRequestTest.all_objects.filter(lab_request=lab_request).select_related('test')
+    keys = {line.pk: lab_request_test_key(line.pk) for line in lines}
+    waived = set(
+        Charge.objects.filter(source_key__in=keys.values(), charge_status=Charge.ChargeStatusEnum.WAIVED)
+        .values_list('source_key', flat=True)
+    )
+    charges = [
+        Charge(
+            visit_id=lab_request.visit_id,
+            lab_request=lab_request,
+            source_key=keys[line.pk],
+            charge_type=Charge.ChargeTypeEnum.LABORATORY,
+            charge_status=(
+                Charge.ChargeStatusEnum.PENDING
+                if lab_request.is_active and line.is_active
+                else Charge.ChargeStatusEnum.CANCELLED
+            ),
+            amount=line.price or Decimal('0.00'),
+            description=line.test.name,
+        )
+        for line in lines
+        if keys[line.pk] not in waived
+    ]
+    return upsert_charges(charges)
+
+
+def cancel_lab_request_charges(lab_request):
+    """Cancel the charges of `lab_request` that are still owed; waived ones keep the cashier's decision."""
+    return (
+        Charge.objects.filter(lab_request=lab_request)
+        .exclude(charge_status__in=NON_BILLABLE_CHARGE_STATUSES)
+        .update(charge_status=Charge.ChargeStatusEnum.CANCELLED)
+    )
+
+
+def materialize_consultation_charge(visit, needs_to_pay=None):
+    """
+    Create or refresh the CONSULTATION charge of `visit`. Patients who do not
+    owe a visit fee (see Patient.needs_to_pay_visit_fee) get a waived charge so
+    the decision stays visible on the bill.
+    """
+    if needs_to_pay is None:
+        needs_to_pay = visit.patient.needs_to_pay_visit_fee()
+    charge = Charge(
+        visit=visit,
+        source_key=consultation_key(visit.pk),
+        charge_type=Charge.ChargeTypeEnum.CONSULTATION,
+        charge_status=Charge.ChargeStatusEnum.PENDING if needs_to_pay else Charge.ChargeStatusEnum.WAIVED,
+        amount=settings.CONSULTATION_FEE if needs_to_pay else Decimal('0.00'),
+        description='Consultation fee',
+    )
+    return upsert_charges([charge])[0]
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from charges.services import materialize_lab_request_charges
+from lab_requests.models import LabRequest, LabRequestTest
+
+
+@receiver(post_save, sender=LabRequest)
+def refresh_lab_request_charges(sender, instance, created, **kwargs):
+    # New requests have no lines yet; their charges are written with the lines.
+    if not created:
+        materialize_lab_request_charges(instance)
+
+
+@receiver(post_save, sender=LabRequestTest)
+def refresh_lab_request_test_charge(sender, instance, **kwargs):
+    materialize_lab_request_charges(instance.lab_request, lines=[instance])
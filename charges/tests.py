@@ -1,3 +1,69 @@
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
+from charges.models import Charge
+from charges.services import materialize_lab_request_charges
+from lab_requests.models import LabRequest, LabRequestTest, Test, TestGroup
+from lab_requests.services import create_lab_request, deactivate_lab_request
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit
+
 # Create your tests here.
+Status = Charge.ChargeStatusEnum
+
+
+class MaterializeLabRequestChargesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = Staff.objects.create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=Visit.VisitStatusEnum.IN_CONSULTATION,
+        )
+        group = TestGroup.objects.create(name='Chemistry', price=Decimal('100.00'), created_by=cls.doctor)
+        cls.tests = [
+            Test.objects.create(name=name, test_type=Test.TestTypeEnum.NUMERICAL, test_group=group, created_by=cls.doctor)
+            for name in ('Potassium', 'Sodium', 'Glucose')
+        ]
+
+    def statuses(self, lab_request):
+        return list(Charge.objects.filter(lab_request=lab_request).order_by('pk').values_list('description', 'charge_status'))
+
+    def test_rematerializing_keeps_waived_charges(self):
+        lab_request = create_lab_request(self.visit, self.doctor, self.tests)
+        charges = Charge.objects.filter(lab_request=lab_request).order_by('pk')
+        Charge.objects.filter(pk=charges[0].pk).update(charge_status=Status.WAIVED)
+        Charge.objects.filter(pk=charges[1].pk).update(amount=Decimal('1.00'))
+
+        materialize_lab_request_charges(lab_request)
+        self.assertEqual(
+            self.statuses(lab_request),
+            [('Potassium', Status.WAIVED), ('Sodium', Status.PENDING), ('Glucose', Status.PENDING)],
+        )
+        self.assertEqual(Charge.objects.get(pk=charges[1].pk).amount, Decimal('100.00'))
+
+    def test_reactivated_request_is_billed_again(self):
+        lab_request = create_lab_request(self.visit, self.doctor, self.tests[:2])
+        deactivate_lab_request(lab_request)
+        self.assertEqual(self.statuses(lab_request), [('Potassium', Status.CANCELLED), ('Sodium', Status.CANCELLED)])
+
+        LabRequest.all_objects.filter(pk=lab_request.pk).update(is_active=True)
+        LabRequestTest.all_objects.filter(lab_request=lab_request).update(is_active=True)
+        materialize_lab_request_charges(LabRequest.objects.get(pk=lab_request.pk))
+        self.assertEqual(self.statuses(lab_request), [('Potassium', Status.PENDING), ('Sodium', Status.PENDING)])
+
+    def test_cancelling_keeps_waived_charges(self):
+        lab_request = create_lab_request(self.visit, self.doctor, self.tests[:2])
+        Charge.objects.filter(lab_request=lab_request, description='Potassium').update(charge_status=Status.WAIVED)
+        deactivate_lab_request(lab_request)
+        self.assertEqual(self.statuses(lab_request), [('Potassium', Status.WAIVED), ('Sodium', Status.CANCELLED)])
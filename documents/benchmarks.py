@@ -0,0 +1,29 @@
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from benchmarks.registry import benchmark
+from charges.models import Charge
+from documents.receipts import render_receipt
+from documents.statements import generate_statements, month_period, statement_patient_ids
+from payments.models import Payment
+from visits.models import Visit
+
+
+def pick_payment(ctx):
+    return (ctx.pick_pk(Payment.objects.all()),)
+
+
+def pick_statement(ctx):
+    created_at = ctx.pick(Visit.objects.filter(Exists(Charge.objects.filter(visit=OuterRef('pk'))))).created_at
+    period = month_period(timezone.localtime(created_at).date().replace(day=1))
+    return period, [ctx.rng.choice(statement_patient_ids(period))]
+
+
+@benchmark('documents.receipt', setup=pick_payment)
+def receipt(ctx, payment_id):
+    render_receipt(payment_id)
+
+
+@benchmark('documents.statement', setup=pick_statement)
+def statement(ctx, period, patient_ids):
+    list(generate_statements(period, patient_ids, workers=1))
@@ -0,0 +1,129 @@
+import multiprocessing
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from app.timestamps import preserve_timestamps
+from charges.models import Charge
+from documents.statements import generate_statements, month_period, statement_visits
+from patients.models import Patient
+from payments.models import Payment
+from staff.models import Staff
+from visits.models import Visit
+
+FIRST_NAMES = ['Abebe', 'Almaz', 'Bekele', 'Dawit', 'Hana', 'Kebede', 'Meron', 'Selam', 'Tigist', 'Yonas']
+LAST_NAMES = ['Alemu', 'Bekele', 'Girma', 'Haile', 'Kassa', 'Mekonnen', 'Tadesse', 'Wolde', 'Worku', 'Yilma']
+CHARGE_TYPES = [Charge.ChargeTypeEnum.CONSULTATION, Charge.ChargeTypeEnum.LABORATORY, Charge.ChargeTypeEnum.MEDICATION]
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert --statements synthetic patients billed in one month, then time rendering their statements "
+        "with a cold and a warm fragment cache for each worker count. Everything runs in a transaction "
+        "that is rolled back, and the fragments it cached are deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--statements', type=int, default=10_000)
+        parser.add_argument('--workers', default='1,4', help="Comma-separated rendering process counts to run.")
+        parser.add_argument('--batch-size', type=int, help="Patients per batch (default STATEMENT_BATCH_SIZE).")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        workers = [int(value) for value in options['workers'].split(',')]
+        if max(workers) > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError("Rendering with several workers forks, which this platform does not support.")
+        staff = Staff.objects.first()
+        if staff is None:
+            raise CommandError("No staff to record payments with; generate synthetic data first.")
+        rng = random.Random(options['seed'])
+        # A month long past, so the synthetic visits are the only ones in it.
+        month = timezone.localdate().replace(day=1)
+        month = month.replace(year=month.year - 10)
+        period = month_period(month)
+        cache = caches[settings.STATEMENT_FRAGMENT_CACHE]
+
+        with preserve_timestamps(Patient, Visit, Charge, Payment), transaction.atomic():
+            patient_ids = self.create_statements(rng, period, options['statements'], staff)
+            keys = [visit['key'] for visit in statement_visits(patient_ids, period)]
+            try:
+                self.stdout.write(f"{'workers':>7} {'cache':<6} {'statements':>10} {'seconds':>8} {'statements/s':>13}")
+                for count in workers:
+                    cache.delete_many(keys)
+                    for label in ('cold', 'warm'):
+                        started = time.perf_counter()
+                        rendered = sum(
+                            1 for _ in generate_statements(period, patient_ids, workers=count, batch_size=options['batch_size'])
+                        )
+                        seconds = time.perf_counter() - started
+                        self.stdout.write(
+                            f"{count:>7} {label:<6} {rendered:>10} {seconds:>8.2f} {rendered / seconds:>13,.0f}"
+                        )
+            finally:
+                cache.delete_many(keys)
+                transaction.set_rollback(True)
+
+    def create_statements(self, rng, period, count, staff):
+        """`count` patients with one visit in `period`, billed with a few charges and paid in part; returns their ids."""
+        start = period.since
+        born = date(1950, 1, 1)
+        patients = Patient.objects.bulk_create([
+            Patient(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                date_of_birth=born + timedelta(days=rng.randrange(365 * 60)),
+                sex=rng.choice(list(Patient.SexEnum)),
+                region=rng.choice(list(Patient.RegionEnum)),
+                city='Addis Ababa',
+                created_at=start,
+                updated_at=start,
+            )
+            for _ in range(count)
+        ], batch_size=2000)
+        visits = []
+        for patient in patients:
+            created = start + timedelta(minutes=rng.randrange(27 * 24 * 60))
+            visits.append(Visit(
+                patient=patient,
+                visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+                visit_status=Visit.VisitStatusEnum.COMPLETED,
+                chief_complaint='Follow up',
+                created_at=created,
+                updated_at=created,
+                current_status_since=created,
+            ))
+        Visit.objects.bulk_create(visits, batch_size=2000)
+        charges, payments = [], []
+        for visit in visits:
+            created = visit.created_at
+            amounts = [Decimal(rng.randrange(50, 500)) for _ in range(rng.randint(1, 4))]
+            charges.extend(
+                Charge(
+                    visit=visit,
+                    charge_type=rng.choice(CHARGE_TYPES),
+                    charge_status=Charge.ChargeStatusEnum.PENDING,
+                    amount=amount,
+                    created_at=created,
+                    updated_at=created,
+                )
+                for amount in amounts
+            )
+            paid = created + timedelta(minutes=30)
+            payments.append(Payment(
+                visit=visit,
+                recorded_by=staff,
+                amount=sum(amounts) // 2,
+                payment_method=rng.choice(list(Payment.PaymentMethodEnum)),
+                created_at=paid,
+                updated_at=paid,
+            ))
+        Charge.objects.bulk_create(charges, batch_size=2000)
+        Payment.objects.bulk_create(payments, batch_size=2000)
+        return [patient.pk for patient in patients]
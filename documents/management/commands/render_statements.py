@@ -0,0 +1,39 @@
+import time
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from documents.statements import generate_statements, month_period
+
+
+def parse_month(value):
+    return date.fromisoformat(f'{value}-01')
+
+
+class Command(BaseCommand):
+    help = "Render the monthly statement of every patient with billable charges in a month to HTML files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', type=parse_month, help="Month to bill (YYYY-MM). Defaults to last month.")
+        parser.add_argument('--output', default=settings.DOCUMENTS_DIR, help="Directory the month's folder is written to.")
+        parser.add_argument('--workers', type=int, help="Rendering processes (default DOCUMENT_WORKERS).")
+        parser.add_argument('--batch-size', type=int, help="Patients per batch (default STATEMENT_BATCH_SIZE).")
+
+    def handle(self, *args, **options):
+        month = options['month'] or (timezone.localdate().replace(day=1) - date.resolution).replace(day=1)
+        period = month_period(month)
+        directory = Path(options['output']) / f'{month:%Y-%m}'
+        directory.mkdir(parents=True, exist_ok=True)
+
+        started = time.perf_counter()
+        count = 0
+        for patient_id, html in generate_statements(period, workers=options['workers'], batch_size=options['batch_size']):
+            (directory / f'statement-{patient_id}.html').write_text(html, encoding='utf-8')
+            count += 1
+        seconds = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {count} statements for {period.label} to {directory} in {seconds:.1f}s."
+        ))
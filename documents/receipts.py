@@ -0,0 +1,65 @@
+"""
+Payment receipts.
+
+A receipt is read with one query: the payment joined to its visit,
+patient and cashier, with the visit's billable charges and the payments up
+to and including this one as correlated subqueries.
+"""
+from decimal import Decimal
+
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from charges.models import Charge
+from documents.rendering import render
+from payments.models import Payment
+from visits.models import NON_BILLABLE_CHARGE_STATUSES
+
+
+def receipt_data(payment_id):
+    charged = (
+        Charge.objects.filter(visit=OuterRef('visit'))
+        .exclude(charge_status__in=NON_BILLABLE_CHARGE_STATUSES)
+        .values('visit').annotate(total=Sum('amount')).values('total')
+    )
+    paid = (
+        Payment.objects.filter(visit=OuterRef('visit'), pk__lte=OuterRef('pk'))
+        .values('visit').annotate(total=Sum('amount')).values('total')
+    )
+    row = (
+        Payment.objects.filter(pk=payment_id)
+        .annotate(
+            total_charged=Coalesce(Subquery(charged), Value(Decimal('0.00'))),
+            paid_to_date=Coalesce(Subquery(paid), Value(Decimal('0.00'))),
+        )
+        .values(
+            'id', 'created_at', 'amount', 'payment_method', 'visit_id', 'visit__created_at', 'visit__patient_id',
+            'visit__patient__first_name', 'visit__patient__last_name', 'recorded_by__first_name',
+            'recorded_by__last_name', 'total_charged', 'paid_to_date',
+        )
+        .first()
+    )
+    if row is None:
+        return None
+    return {
+        'id': row['id'],
+        'created_at': row['created_at'],
+        'amount': row['amount'],
+        'method': Payment.PaymentMethodEnum(row['payment_method']).label,
+        'visit_id': row['visit_id'],
+        'visit_created_at': row['visit__created_at'],
+        'patient_id': row['visit__patient_id'],
+        'patient_name': f"{row['visit__patient__first_name']} {row['visit__patient__last_name']}",
+        'received_by': f"{row['recorded_by__first_name']} {row['recorded_by__last_name']}",
+        'total_charged': row['total_charged'],
+        'paid_to_date': row['paid_to_date'],
+        'balance': row['total_charged'] - row['paid_to_date'],
+    }
+
+
+def render_receipt(payment_id):
+    """The receipt of a payment as an HTML page, or None for an unknown payment."""
+    payment = receipt_data(payment_id)
+    if payment is None:
+        return None
+    return render('receipt', {'payment': payment})
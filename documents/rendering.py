@@ -0,0 +1,22 @@
+from functools import cache
+
+from django.conf import settings
+from django.template.loader import get_template
+
+DOCUMENT_TEMPLATES = ['receipt', 'statement', 'statement_visit']
+
+
+@cache
+def compiled(name):
+    """The compiled template `documents/<name>.html`, parsed once per process."""
+    return get_template(f'documents/{name}.html')
+
+
+def precompile():
+    """Compile every document template, e.g. before forking renderer processes so they inherit them."""
+    for name in DOCUMENT_TEMPLATES:
+        compiled(name)
+
+
+def render(name, context):
+    return compiled(name).render({'clinic_name': settings.CLINIC_NAME, **context})
@@ -0,0 +1,205 @@
+"""
+Monthly patient statements.
+
+A statement lists, for every visit of the patient in the period, its
+billable charges and the payments made against it. Statements are
+generated in batches of STATEMENT_BATCH_SIZE patients. Each batch costs
+at most three queries, all run in the calling process:
+
+- the visits of the batch, with patient names and a fingerprint of their
+  charges and payments
+- the charges of the visits whose section is not cached
+- the payments of those visits
+
+The section of each visit is cached under the visit's updated_at plus the
+count and latest updated_at of its charges and payments. Charges are
+upserted without touching their visit, so updated_at alone would miss
+them. A re-run of the month only renders the visits whose billing changed.
+
+With more than one worker, rendering runs in forked processes while the
+next batch is loaded. The workers never touch the database; they receive
+plain dicts and return HTML.
+"""
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, time
+from decimal import Decimal
+from multiprocessing import get_context
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Count, Exists, Max, OuterRef, Subquery
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from charges.models import Charge
+from documents.rendering import precompile, render
+from payments.models import Payment
+from visits.models import NON_BILLABLE_CHARGE_STATUSES, Visit
+
+Period = namedtuple('Period', ['since', 'until', 'label'])
+
+VISIT_FIELDS = [
+    'id', 'created_at', 'updated_at', 'visit_category', 'patient_id', 'patient__first_name', 'patient__last_name',
+    'patient__city', 'charge_count', 'charges_changed', 'payment_count', 'payments_changed',
+]
+CHARGE_FIELDS = ['visit_id', 'created_at', 'charge_type', 'description', 'amount']
+PAYMENT_FIELDS = ['visit_id', 'created_at', 'payment_method', 'amount']
+
+
+def month_period(month):
+    """The Period of the calendar month starting on `month` (a date on the 1st)."""
+    tz = timezone.get_current_timezone()
+    following = month.replace(year=month.year + month.month // 12, month=month.month % 12 + 1)
+    return Period(datetime.combine(month, time.min, tz), datetime.combine(following, time.min, tz), f'{month:%B %Y}')
+
+
+def billable_charges():
+    return Charge.objects.exclude(charge_status__in=NON_BILLABLE_CHARGE_STATUSES)
+
+
+def statement_patient_ids(period):
+    """Patients with a billable charge on a visit in `period`, in id order."""
+    return list(
+        Visit.objects.filter(created_at__gte=period.since, created_at__lt=period.until)
+        .filter(Exists(billable_charges().filter(visit=OuterRef('pk'))))
+        .order_by('patient_id').values_list('patient_id', flat=True).distinct()
+    )
+
+
+def latest(model):
+    return Subquery(
+        model.objects.filter(visit=OuterRef('pk')).values('visit').annotate(changed=Max('updated_at')).values('changed')
+    )
+
+
+def counted(model):
+    return Subquery(model.objects.filter(visit=OuterRef('pk')).values('visit').annotate(count=Count('id')).values('count'))
+
+
+def fragment_key(visit):
+    changed = [visit[field] and visit[field].timestamp() for field in ('updated_at', 'charges_changed', 'payments_changed')]
+    return f"statement-visit:{visit['id']}:{changed[0]}:{visit['charge_count']}:{changed[1]}:{visit['payment_count']}:{changed[2]}"
+
+
+def statement_visits(patient_ids, period):
+    """The visits of `patient_ids` in `period` as dicts of VISIT_FIELDS plus their fragment key."""
+    visits = list(
+        Visit.objects.filter(patient_id__in=patient_ids, created_at__gte=period.since, created_at__lt=period.until)
+        .annotate(
+            charge_count=counted(Charge), charges_changed=latest(Charge),
+            payment_count=counted(Payment), payments_changed=latest(Payment),
+        )
+        .order_by('patient_id', 'created_at', 'id')
+        .values(*VISIT_FIELDS)
+    )
+    for visit in visits:
+        visit['key'] = fragment_key(visit)
+    return visits
+
+
+def load_batch(patient_ids, period, cache):
+    """Statement inputs for `patient_ids`: one dict per patient, each visit carrying its cached section or its lines."""
+    visits = statement_visits(patient_ids, period)
+    cached = cache.get_many([visit['key'] for visit in visits])
+    missed = {visit['id']: visit for visit in visits if visit['key'] not in cached}
+    for visit in visits:
+        visit['fragment'] = cached.get(visit['key'])
+        visit['charges'], visit['payments'] = [], []
+    if missed:
+        for charge in billable_charges().filter(visit_id__in=missed).order_by('created_at', 'id').values(*CHARGE_FIELDS):
+            missed[charge['visit_id']]['charges'].append(charge)
+        for payment in Payment.objects.filter(visit_id__in=missed).order_by('created_at', 'id').values(*PAYMENT_FIELDS):
+            missed[payment['visit_id']]['payments'].append(payment)
+
+    statements = {}
+    for visit in visits:
+        statement = statements.get(visit['patient_id'])
+        if statement is None:
+            statement = statements[visit['patient_id']] = {
+                'patient': {
+                    'id': visit['patient_id'],
+                    'name': f"{visit['patient__first_name']} {visit['patient__last_name']}",
+                    'city': visit['patient__city'],
+                },
+                'visits': [],
+            }
+        statement['visits'].append(visit)
+    return list(statements.values())
+
+
+def render_visit(visit):
+    """(html, charged, paid) of one visit's section."""
+    charged = sum((charge['amount'] for charge in visit['charges']), Decimal('0.00'))
+    paid = sum((payment['amount'] for payment in visit['payments']), Decimal('0.00'))
+    html = render('statement_visit', {
+        'visit': {
+            'id': visit['id'],
+            'created_at': visit['created_at'],
+            'category': Visit.VisitCategoryEnum(visit['visit_category']).label,
+        },
+        'charges': [
+            {**charge, 'type': Charge.ChargeTypeEnum(charge['charge_type']).label} for charge in visit['charges']
+        ],
+        'payments': [
+            {**payment, 'method': Payment.PaymentMethodEnum(payment['payment_method']).label}
+            for payment in visit['payments']
+        ],
+        'balance': charged - paid,
+    })
+    return html, charged, paid
+
+
+def render_batch(statements, period):
+    """Render a loaded batch; returns [(patient_id, html)] and the visit sections rendered on the way, by cache key."""
+    rendered, fragments = [], {}
+    for statement in statements:
+        parts = []
+        for visit in statement['visits']:
+            fragment = visit['fragment']
+            if fragment is None:
+                fragment = fragments[visit['key']] = render_visit(visit)
+            parts.append(fragment)
+        charged = sum((part[1] for part in parts), Decimal('0.00'))
+        paid = sum((part[2] for part in parts), Decimal('0.00'))
+        html = render('statement', {
+            'patient': statement['patient'],
+            'period': period._asdict(),
+            'fragments': [mark_safe(part[0]) for part in parts],
+            'totals': {'charged': charged, 'paid': paid, 'balance': charged - paid},
+        })
+        rendered.append((statement['patient']['id'], html))
+    return rendered, fragments
+
+
+def generate_statements(period, patient_ids=None, workers=None, batch_size=None):
+    """
+    Yield (patient_id, html) for every patient with billable charges in
+    `period`, or only for `patient_ids`, in batches of `batch_size`
+    patients rendered by `workers` processes.
+    """
+    workers = workers or settings.DOCUMENT_WORKERS
+    batch_size = batch_size or settings.STATEMENT_BATCH_SIZE
+    cache = caches[settings.STATEMENT_FRAGMENT_CACHE]
+    patient_ids = statement_patient_ids(period) if patient_ids is None else sorted(patient_ids)
+    batches = (patient_ids[start:start + batch_size] for start in range(0, len(patient_ids), batch_size))
+
+    def finish(rendered, fragments):
+        if fragments:
+            cache.set_many(fragments, settings.STATEMENT_FRAGMENT_TIMEOUT)
+        return rendered
+
+    if workers <= 1:
+        for batch in batches:
+            yield from finish(*render_batch(load_batch(batch, period, cache), period))
+        return
+
+    precompile()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('fork')) as pool:
+        pending = deque()
+        for batch in batches:
+            pending.append(pool.submit(render_batch, load_batch(batch, period, cache), period))
+            if len(pending) > workers:
+                yield from finish(*pending.popleft().result())
+        while pending:
+            yield from finish(*pending.popleft().result())
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from documents import views
+
+urlpatterns = [
+    path('payments/<int:pk>/receipt', views.payment_receipt, name='payment-receipt'),
+]
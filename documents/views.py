@@ -0,0 +1,14 @@
+from django.contrib.auth.decorators import permission_required
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from documents.receipts import render_receipt
+
+
+@require_GET
+@permission_required('payments.view_payment', raise_exception=True)
+def payment_receipt(request, pk):
+    html = render_receipt(pk)
+    if html is None:
+        raise Http404("No such payment.")
+    return HttpResponse(html)
@@ -0,0 +1,111 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from jobs.models import JobCheckpoint
+
+
+def keyset_chunks(queryset, key_field='pk', chunk_size=500, position=None):
+    """
+    Yield lists of at most `chunk_size` rows ordered by (key_field, pk).
+
+    Each chunk is fetched with a `WHERE (key, pk) > (last_key, last_pk)`
+    seek instead of OFFSET, so every query costs the same no matter how
+    far into the table the job is, and only one chunk is held in memory.
+    """
+    model = queryset.model
+    pk_name = model._meta.pk.name
+    if key_field in ('pk', pk_name):
+        ordering = [pk_name]
+    else:
+        ordering = [key_field, pk_name]
+
+    while True:
+        page = queryset
+        if position is not None:
+            if len(ordering) == 1:
+                page = page.filter(pk__gt=position[-1])
+            else:
+                page = page.filter(
+                    Q(**{f'{key_field}__gt': position[0]})
+                    | Q(**{key_field: position[0], f'{pk_name}__gt': position[1]})
+                )
+        chunk = list(page.order_by(*ordering)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last = chunk[-1]
+        position = [getattr(last, field) for field in ordering]
+
+
+class BatchJob:
+    """
+    Resumable, chunked batch job.
+
+    Subclasses set `name` and implement get_queryset() and process_chunk().
+    Every chunk is processed in its own transaction together with the update
+    of the job's JobCheckpoint, so an interrupted run picks up after the last
+    committed chunk when started again with the same run key.
+
+    Running a completed job again processes the rows added after its last
+    position. Jobs whose get_queryset() drops the rows they have processed
+    set `self_limiting`; they scan again from the start instead, so rows
+    added anywhere in the key range are picked up.
+    """
+    name = None
+    key_field = 'pk'
+    chunk_size = 500
+    self_limiting = False
+
+    def __init__(self, run_key, chunk_size=None, stdout=None):
+        self.run_key = str(run_key)
+        self.chunk_size = chunk_size or self.chunk_size
+        self.stdout = stdout
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def process_chunk(self, chunk):
+        raise NotImplementedError
+
+    def run(self, restart=False):
+        checkpoint, _ = JobCheckpoint.objects.get_or_create(job_name=self.name, run_key=self.run_key)
+        if restart:
+            checkpoint.position = None
+            checkpoint.processed = 0
+            checkpoint.completed_at = None
+        elif checkpoint.completed_at and self.self_limiting:
+            checkpoint.position = None
+
+        for chunk in keyset_chunks(
+            self.get_queryset(),
+            key_field=self.key_field,
+            chunk_size=self.chunk_size,
+            position=self.load_position(checkpoint.position),
+        ):
+            with transaction.atomic():
+                self.process_chunk(chunk)
+                last = chunk[-1]
+                checkpoint.position = self.dump_position(last)
+                checkpoint.processed += len(chunk)
+                checkpoint.save(update_fields=['position', 'processed', 'updated_at'])
+            if self.stdout:
+                self.stdout.write(f"{self.name} [{self.run_key}]: {checkpoint.processed} processed")
+
+        checkpoint.completed_at = timezone.now()
+        checkpoint.save(update_fields=['position', 'processed', 'completed_at', 'updated_at'])
+        return checkpoint
+
+    def dump_position(self, row):
+        values = [row.pk] if self.key_field == 'pk' else [getattr(row, self.key_field), row.pk]
+        encoder = DjangoJSONEncoder()
+        return [value if isinstance(value, (int, str)) else encoder.default(value) for value in values]
+
+    def load_position(self, position):
+        if position is None:
+            return None
+        if self.key_field == 'pk':
+            return position
+        field = self.get_queryset().model._meta.get_field(self.key_field)
+        return [field.to_python(position[0]), position[1]]
@@ -0,0 +1,75 @@
+import multiprocessing
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from jobs.models import Task
+from jobs.queue import Worker, enqueue, task
+
+BENCH_TASK = 'jobs.bench'
+
+
+@task(BENCH_TASK)
+def bench_task(sleep_ms):
+    # Stands in for a side effect that mostly waits, such as a notification.
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
+
+
+def run_worker(index, batch_size):
+    connections.close_all()
+    worker = Worker(name=f'bench-{index}', batch_size=batch_size, poll_interval=0)
+    return worker.run(burst=True)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure enqueue cost and worker throughput of the task queue with 1..N worker processes. "
+        "Benchmark tasks are committed (workers run in other processes) and removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=5000)
+        parser.add_argument('--workers', default='1,2,4', help="Comma-separated worker process counts to run.")
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--task-ms', type=float, default=2.0, help="Time each task spends waiting.")
+
+    def handle(self, *args, **options):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError("The benchmark forks its workers, which this platform does not support.")
+        if Task.objects.filter(status=Task.StatusEnum.QUEUED).exclude(name=BENCH_TASK).exists():
+            raise CommandError("Other tasks are queued; run the benchmark against an idle queue.")
+        count, payload = options['tasks'], {'sleep_ms': options['task_ms']}
+        context = multiprocessing.get_context('fork')
+        try:
+            started = time.perf_counter()
+            with transaction.atomic():
+                for _ in range(count):
+                    enqueue(BENCH_TASK, payload)
+            seconds = time.perf_counter() - started
+            self.stdout.write(f"enqueue on commit: {count} tasks in {seconds:.2f}s ({count / seconds:,.0f} tasks/s)")
+            Task.objects.filter(name=BENCH_TASK).delete()
+
+            self.stdout.write(f"{'workers':>7} {'tasks':>7} {'seconds':>8} {'tasks/s':>9} {'retried':>8} {'dead':>5}")
+            for workers in [int(value) for value in options['workers'].split(',')]:
+                now = timezone.now()
+                Task.objects.bulk_create(
+                    [Task(name=BENCH_TASK, payload=payload, max_attempts=1, run_after=now) for _ in range(count)],
+                    batch_size=1000,
+                )
+                connections.close_all()
+                started = time.perf_counter()
+                with context.Pool(workers) as pool:
+                    results = pool.starmap(run_worker, [(index, options['batch_size']) for index in range(workers)])
+                seconds = time.perf_counter() - started
+                totals = {key: sum(result[key] for result in results) for key in ('done', 'retried', 'dead')}
+                self.stdout.write(
+                    f"{workers:>7} {totals['done']:>7} {seconds:>8.2f} {totals['done'] / seconds:>9,.0f} "
+                    f"{totals['retried']:>8} {totals['dead']:>5}"
+                )
+                if totals['done'] != count:
+                    self.stderr.write(f"  {totals['done']} of {count} tasks done; check last_error of the dead ones.")
+        finally:
+            Task.objects.filter(name=BENCH_TASK).delete()
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max
+
+from jobs.models import Task
+from jobs.queue import requeue_dead_tasks
+
+
+class Command(BaseCommand):
+    help = "List dead-lettered tasks by name, or put them back in the queue with --requeue."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--name', help="Only tasks with this name.")
+        parser.add_argument('--requeue', action='store_true', help="Queue the dead tasks again with fresh attempts.")
+
+    def handle(self, *args, **options):
+        if options['requeue']:
+            count = requeue_dead_tasks(name=options['name'])
+            self.stdout.write(self.style.SUCCESS(f"Requeued {count} dead tasks."))
+            return
+        dead = Task.objects.filter(status=Task.StatusEnum.DEAD)
+        if options['name']:
+            dead = dead.filter(name=options['name'])
+        self.stdout.write(f"{'task':<40} {'dead':>6}  last failure")
+        for row in dead.order_by('name').values('name').annotate(count=Count('id'), last=Max('updated_at')):
+            self.stdout.write(f"{row['name'][:40]:<40} {row['count']:>6}  {row['last']:%Y-%m-%d %H:%M}")
@@ -0,0 +1,30 @@
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import Worker
+
+
+class Command(BaseCommand):
+    help = "Run queued background tasks until stopped with SIGINT or SIGTERM; the batch in progress is finished first."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help="Tasks claimed at once (default TASK_BATCH_SIZE).")
+        parser.add_argument('--poll-interval', type=float, help="Seconds to sleep when no task is due (default TASK_POLL_INTERVAL_SECONDS).")
+        parser.add_argument('--burst', action='store_true', help="Exit once no task is due instead of waiting for more.")
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        worker = Worker(batch_size=options['batch_size'], poll_interval=options['poll_interval'], using=options['database'])
+
+        def stop(signum, frame):
+            worker.stop = True
+
+        signal.signal(signal.SIGINT, stop)
+        signal.signal(signal.SIGTERM, stop)
+        self.stdout.write(f"Task worker {worker.name} started.")
+        counts = worker.run(burst=options['burst'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Task worker {worker.name} stopped: {counts['done']} done, {counts['retried']} retried, "
+            f"{counts['dead']} dead-lettered, {counts['lost']} taken over by other workers."
+        ))
@@ -0,0 +1,30 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('job_name', models.CharField(help_text='Name of the batch job', max_length=100)),
+                ('run_key', models.CharField(help_text='Identifies one run of the job, e.g. the date it processes', max_length=100)),
+                ('position', models.JSONField(blank=True, help_text='Keyset position of the last processed row', null=True)),
+                ('processed', models.PositiveIntegerField(default=0, help_text='Rows processed so far in this run')),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('job_name', 'run_key'), name='jobcheckpoint_job_run_unique')],
+            },
+        ),
+    ]
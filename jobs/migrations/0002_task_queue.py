@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:53
+
+import django.core.serializers.json
+import django_enum.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jobs', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(help_text='Registered name of the task function', max_length=100)),
+                ('payload', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, help_text='Keyword arguments the task is called with')),
+                ('status', django_enum.fields.EnumCharField(choices=[('QUEUED', 'Queued'), ('RUNNING', 'Running'), ('DEAD', 'Dead-lettered')], default='QUEUED', max_length=7)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Times a worker has picked the task up')),
+                ('max_attempts', models.PositiveIntegerField(help_text='Attempts before the task is dead-lettered')),
+                ('run_after', models.DateTimeField(help_text='The task is not picked up before this time; pushed back after a failure')),
+                ('claimed_by', models.CharField(blank=True, help_text='Worker batch currently running the task', max_length=100)),
+                ('locked_until', models.DateTimeField(blank=True, help_text='A running task still held past this time is given up as lost', null=True)),
+                ('last_error', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'QUEUED')), fields=['run_after', 'id'], name='task_queued_idx'), models.Index(condition=models.Q(('status', 'RUNNING')), fields=['locked_until'], name='task_running_idx'), models.Index(condition=models.Q(('status', 'DEAD')), fields=['name', 'id'], name='task_dead_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('status__in', ['QUEUED', 'RUNNING', 'DEAD'])), name='jobs_Task_status_StatusEnum')],
+            },
+        ),
+    ]
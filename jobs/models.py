@@ -0,0 +1,54 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django_enum import EnumField
+
+
+# Create your models here.
+class JobCheckpoint(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    job_name = models.CharField(max_length=100, help_text="Name of the batch job")
+    run_key = models.CharField(max_length=100, help_text="Identifies one run of the job, e.g. the date it processes")
+    position = models.JSONField(null=True, blank=True, help_text="Keyset position of the last processed row")
+    processed = models.PositiveIntegerField(default=0, help_text="Rows processed so far in this run")
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['job_name', 'run_key'], name='jobcheckpoint_job_run_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.job_name} [{self.run_key}]: {self.processed} processed"
+
+
+class Task(models.Model):
+    class StatusEnum(models.TextChoices):
+        QUEUED = 'QUEUED', 'Queued'
+        RUNNING = 'RUNNING', 'Running'
+        DEAD = 'DEAD', 'Dead-lettered'
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    name = models.CharField(max_length=100, help_text="Registered name of the task function")
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder, help_text="Keyword arguments the task is called with")
+    status = EnumField(StatusEnum, default=StatusEnum.QUEUED)
+    attempts = models.PositiveIntegerField(default=0, help_text="Times a worker has picked the task up")
+    max_attempts = models.PositiveIntegerField(help_text="Attempts before the task is dead-lettered")
+    run_after = models.DateTimeField(help_text="The task is not picked up before this time; pushed back after a failure")
+    claimed_by = models.CharField(max_length=100, blank=True, help_text="Worker batch currently running the task")
+    locked_until = models.DateTimeField(null=True, blank=True, help_text="A running task still held past this time is given up as lost")
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['run_after', 'id'], name='task_queued_idx', condition=Q(status='QUEUED')),
+            models.Index(fields=['locked_until'], name='task_running_idx', condition=Q(status='RUNNING')),
+            models.Index(fields=['name', 'id'], name='task_dead_idx', condition=Q(status='DEAD')),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status.label})"
@@ -0,0 +1,214 @@
+"""
+Task queue kept in the database.
+
+Side effects that the saving request does not need to wait for are queued
+with enqueue() and run by `manage.py run_task_worker` processes. The task
+row is inserted once the request's transaction commits, so a rolled back
+request queues nothing and the task never reads data that is not there yet.
+
+Workers claim tasks in batches. On PostgreSQL the claim selects with
+FOR UPDATE SKIP LOCKED, so concurrent workers take disjoint batches
+without waiting on each other. Elsewhere a batch is claimed with a single
+UPDATE, and concurrent workers wait for each other's claims.
+Each task runs in its own transaction together with the deletion of its
+row, so its writes and its completion commit together. That transaction
+first renews the task's lease, since the lease taken when the batch was
+claimed may have run out while earlier tasks ran; a task already handed
+to another worker is skipped. A failed task is
+retried with exponential backoff until max_attempts, then kept as DEAD
+for inspection and requeue_dead_tasks. A claimed task whose worker dies
+is handed out again once its lease runs out, so tasks must be safe to
+run twice.
+"""
+import os
+import socket
+import time
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from jobs.models import Task
+
+Status = Task.StatusEnum
+
+_registry = {}
+_discovered = False
+
+
+def task(name, max_attempts=None):
+    """Register `func(**payload)` as the task `name`, looked up in `<app>/tasks.py` modules."""
+    def decorator(func):
+        func.task_name = name
+        func.max_attempts = max_attempts
+        _registry[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    global _discovered
+    if name not in _registry and not _discovered:
+        autodiscover_modules('tasks')
+        _discovered = True
+    return _registry[name]
+
+
+def enqueue(name, payload=None, delay=None, using=None):
+    """
+    Queue the task `name` with the keyword arguments `payload` (JSON-able;
+    dates come back as ISO strings) when the current transaction commits,
+    or at once outside a transaction. `delay` holds the task back.
+    """
+    func = get_task(name)
+    using = using or router.db_for_write(Task)
+    delay = delay or timedelta(0)
+
+    def insert():
+        Task.objects.using(using).create(
+            name=name,
+            payload=payload or {},
+            max_attempts=func.max_attempts or settings.TASK_MAX_ATTEMPTS,
+            run_after=timezone.now() + delay,
+        )
+
+    transaction.on_commit(insert, using=using)
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=min(settings.TASK_RETRY_DELAY_SECONDS * 2 ** (attempts - 1), settings.TASK_RETRY_MAX_DELAY_SECONDS))
+
+
+def claim_tasks(worker, limit, using='default'):
+    """Mark up to `limit` due tasks as running for `worker` and return them, oldest first."""
+    now = timezone.now()
+    claim = f'{worker}:{uuid.uuid4().hex[:12]}'
+    tasks = Task.objects.using(using)
+    due = tasks.filter(status=Status.QUEUED, run_after__lte=now).order_by('run_after', 'id')
+    claimed = {
+        'status': Status.RUNNING,
+        'claimed_by': claim,
+        'locked_until': now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+        'attempts': F('attempts') + 1,
+        'updated_at': now,
+    }
+    if connections[using].features.has_select_for_update_skip_locked:
+        with transaction.atomic(using=using):
+            ids = list(due.select_for_update(skip_locked=True).values_list('pk', flat=True)[:limit])
+            if not ids:
+                return []
+            tasks.filter(pk__in=ids).update(**claimed)
+    else:
+        # One UPDATE, so the write lock is taken up front rather than upgraded
+        # from a read, which SQLite refuses when two workers race for it.
+        if not tasks.filter(pk__in=due.values('pk')[:limit], status=Status.QUEUED).update(**claimed):
+            return []
+    return list(tasks.filter(status=Status.RUNNING, claimed_by=claim).order_by('run_after', 'id'))
+
+
+def fail_task(claimed, error, using='default'):
+    """Record a failed attempt: back into the queue after a delay, or dead once out of attempts."""
+    now = timezone.now()
+    changes = {'claimed_by': '', 'locked_until': None, 'last_error': error, 'updated_at': now}
+    if claimed.attempts >= claimed.max_attempts:
+        changes['status'] = Status.DEAD
+    else:
+        changes.update(status=Status.QUEUED, run_after=now + retry_delay(claimed.attempts))
+    Task.objects.using(using).filter(pk=claimed.pk, claimed_by=claimed.claimed_by).update(**changes)
+    return changes['status']
+
+
+def renew_lease(claimed, using='default'):
+    """Extend the lease on `claimed`; False if it has been released or handed to another worker since."""
+    return bool(
+        Task.objects.using(using)
+        .filter(pk=claimed.pk, status=Status.RUNNING, claimed_by=claimed.claimed_by)
+        .update(locked_until=timezone.now() + timedelta(seconds=settings.TASK_LEASE_SECONDS))
+    )
+
+
+def run_task(claimed, using='default'):
+    """
+    Run one claimed task; returns None on success, or the status the task
+    was left in: QUEUED or DEAD after a failure, RUNNING when another
+    worker holds it now.
+    """
+    try:
+        func = get_task(claimed.name)
+    except KeyError:
+        claimed.attempts = claimed.max_attempts
+        return fail_task(claimed, f"Unknown task {claimed.name!r}.", using)
+    try:
+        with transaction.atomic(using=using):
+            # Also holds the row, so the lease cannot be taken over while the task runs.
+            if not renew_lease(claimed, using):
+                return Status.RUNNING
+            func(**claimed.payload)
+            Task.objects.using(using).filter(pk=claimed.pk, claimed_by=claimed.claimed_by).delete()
+    except Exception:
+        return fail_task(claimed, traceback.format_exc(), using)
+    return None
+
+
+def release_lost_tasks(using='default'):
+    """Hand out again the running tasks whose lease ran out; those already out of attempts die. Returns both counts."""
+    now = timezone.now()
+    lost = Task.objects.using(using).filter(status=Status.RUNNING, locked_until__lt=now)
+    dead = lost.filter(attempts__gte=F('max_attempts')).update(
+        status=Status.DEAD, claimed_by='', locked_until=None, last_error="Worker lost while running the task.", updated_at=now,
+    )
+    requeued = lost.update(status=Status.QUEUED, claimed_by='', locked_until=None, run_after=now, updated_at=now)
+    return requeued, dead
+
+
+def requeue_dead_tasks(name=None, using='default'):
+    dead = Task.objects.using(using).filter(status=Status.DEAD)
+    if name:
+        dead = dead.filter(name=name)
+    return dead.update(status=Status.QUEUED, attempts=0, run_after=timezone.now(), updated_at=timezone.now())
+
+
+def worker_name():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+class Worker:
+    """
+    Runs queued tasks batch by batch. run() returns once `stop` is set,
+    after the batch in progress; with `burst` it also returns as soon as
+    the queue has nothing due.
+    """
+
+    def __init__(self, name=None, batch_size=None, poll_interval=None, using='default'):
+        self.name = name or worker_name()
+        self.batch_size = batch_size or settings.TASK_BATCH_SIZE
+        self.poll_interval = settings.TASK_POLL_INTERVAL_SECONDS if poll_interval is None else poll_interval
+        self.using = using
+        self.stop = False
+        self.counts = {'done': 0, 'retried': 0, 'dead': 0, 'lost': 0}
+
+    def run_batch(self):
+        tasks = claim_tasks(self.name, self.batch_size, self.using)
+        for claimed in tasks:
+            failed = run_task(claimed, self.using)
+            self.counts[{None: 'done', Status.QUEUED: 'retried', Status.DEAD: 'dead', Status.RUNNING: 'lost'}[failed]] += 1
+        return len(tasks)
+
+    def run(self, burst=False):
+        released_at = None
+        while not self.stop:
+            now = timezone.now()
+            if released_at is None or now - released_at > timedelta(seconds=settings.TASK_LEASE_SECONDS):
+                release_lost_tasks(self.using)
+                released_at = now
+            if self.run_batch():
+                continue
+            if burst:
+                break
+            time.sleep(self.poll_interval)
+        return self.counts
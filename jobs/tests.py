@@ -0,0 +1,87 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jobs.models import Task
+from jobs.queue import Worker, claim_tasks, enqueue, release_lost_tasks, run_task, task
+
+# Create your tests here.
+Status = Task.StatusEnum
+calls = []
+
+
+@task('jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('jobs.tests.fail', max_attempts=2)
+def fail():
+    raise RuntimeError("Task failed.")
+
+
+@override_settings(TASK_RETRY_DELAY_SECONDS=10, TASK_RETRY_MAX_DELAY_SECONDS=15, TASK_LEASE_SECONDS=60)
+class TaskQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def enqueue(self, name, **payload):
+        with self.captureOnCommitCallbacks(execute=True):
+            enqueue(name, payload)
+        return Task.objects.latest('pk')
+
+    def make_due(self, queued):
+        Task.objects.filter(pk=queued.pk).update(run_after=timezone.now())
+
+    def test_task_runs_and_is_removed(self):
+        self.enqueue('jobs.tests.record', value=1)
+        self.assertEqual(Worker('test').run(burst=True)['done'], 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    def test_failed_task_backs_off_then_dies(self):
+        queued = self.enqueue('jobs.tests.fail')
+        before = timezone.now()
+        self.assertEqual(Worker('test').run(burst=True)['retried'], 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts, queued.claimed_by), (Status.QUEUED, 1, ''))
+        self.assertIn("Task failed.", queued.last_error)
+        self.assertGreaterEqual(queued.run_after, before + timedelta(seconds=10))
+        # Not due yet.
+        self.assertEqual(Worker('test').run(burst=True)['retried'], 0)
+
+        self.make_due(queued)
+        self.assertEqual(Worker('test').run(burst=True)['dead'], 1)
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.attempts), (Status.DEAD, 2))
+
+    def test_lost_task_is_handed_to_another_worker(self):
+        queued = self.enqueue('jobs.tests.record', value=1)
+        [claimed] = claim_tasks('first', 10)
+        Task.objects.filter(pk=queued.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(release_lost_tasks(), (1, 0))
+
+        [taken] = claim_tasks('second', 10)
+        self.assertEqual(taken.attempts, 2)
+        # The first worker comes back to a task it no longer holds.
+        self.assertEqual(run_task(claimed), Status.RUNNING)
+        self.assertEqual(calls, [])
+        self.assertIsNone(run_task(taken))
+        self.assertEqual(calls, [1])
+
+    def test_lease_is_renewed_before_each_task(self):
+        queued = self.enqueue('jobs.tests.record', value=1)
+        [claimed] = claim_tasks('first', 10)
+        # The batch's lease ran out while earlier tasks ran, but nobody took it.
+        Task.objects.filter(pk=queued.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertIsNone(run_task(claimed))
+        self.assertEqual(calls, [1])
+
+    def test_lost_task_out_of_attempts_dies(self):
+        queued = self.enqueue('jobs.tests.fail')
+        Task.objects.filter(pk=queued.pk).update(attempts=1)
+        claim_tasks('first', 10)
+        Task.objects.filter(pk=queued.pk).update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(release_lost_tasks(), (0, 1))
+        self.assertEqual(Task.objects.get(pk=queued.pk).status, Status.DEAD)
@@ -0,0 +1,17 @@
+from benchmarks.registry import benchmark
+from lab_requests.models import Test
+from lab_requests.services import create_lab_request
+from staff.models import Staff
+from visits.models import Visit
+
+
+def pick_order(ctx):
+    visit = ctx.pick(Visit.objects.all())
+    doctor = ctx.pick(Staff.objects.active().filter(role=Staff.RoleEnum.DOCTOR))
+    tests = [ctx.pick_pk(Test.objects.all()) for _ in range(ctx.rng.randint(1, 5))]
+    return visit, doctor, tests
+
+
+@benchmark('lab_requests.order', setup=pick_order)
+def order(ctx, visit, doctor, tests):
+    create_lab_request(visit, doctor, tests)
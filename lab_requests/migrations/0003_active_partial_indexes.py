@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0002_remove_labrequest_patient_and_more'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labrequest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['visit', 'created_at'], name='labreq_visit_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labrequesttest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['lab_request', 'created_at'], name='labreqtest_req_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labrequesttest',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['test', 'created_at'], name='labreqtest_test_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['test_group', 'created_at'], name='test_group_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testgroup',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name'], name='testgroup_name_active_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0003_active_partial_indexes'),
+        ('visits', '0006_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labrequest',
+            index=models.Index(fields=['updated_at', 'id'], name='labreq_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labrequesttest',
+            index=models.Index(fields=['updated_at', 'id'], name='labreqtest_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='test',
+            index=models.Index(fields=['updated_at', 'id'], name='test_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testgroup',
+            index=models.Index(fields=['updated_at', 'id'], name='testgroup_updated_idx'),
+        ),
+    ]
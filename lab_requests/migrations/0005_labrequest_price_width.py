@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0004_sync_feed_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='labrequest',
+            name='price',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Total of the prices of the ordered tests', max_digits=10, null=True),
+        ),
+    ]
@@ -1,6 +1,9 @@
 from django.db import models
+from django.db.models import Q
 from django_enum import EnumField
 
+from app.managers import ActiveManager
+
 from patients.models import Patient
 from staff.models import Staff
 from visits.models import Visit
@@ -21,6 +24,15 @@ class TestGroup(models.Model):
         related_name="created_test_groups",
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name'], name='testgroup_name_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='testgroup_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Test group {self.name}: Price {self.price}"
 
@@ -49,6 +61,15 @@ class Test(models.Model):
         related_name="created_tests",
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['test_group', 'created_at'], name='test_group_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='test_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Test {self.name}: Price {self.price}"
 
@@ -56,7 +77,7 @@ class LabRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    price = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
+    price = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True, help_text="Total of the prices of the ordered tests")
     is_paid = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True, help_text="Is this request active?")
 
@@ -70,6 +91,15 @@ class LabRequest(models.Model):
         related_name="lab_requests",
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['visit', 'created_at'], name='labreq_visit_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='labreq_updated_idx'),
+        ]
+
     @property
     def total_price(self):
         return sum(test.price for test in self.tests.all())
@@ -93,6 +123,16 @@ class LabRequestTest(models.Model):
     )
     price = models.DecimalField(max_digits=5, decimal_places=2, blank=True, null=True)
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lab_request', 'created_at'], name='labreqtest_req_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['test', 'created_at'], name='labreqtest_test_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='labreqtest_updated_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         self.price = self.test.price or self.test.test_group.price
         super().save(*args, **kwargs)
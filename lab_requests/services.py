@@ -0,0 +1,49 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from charges.services import cancel_lab_request_charges, materialize_lab_request_charges
+from lab_requests.models import LabRequest, LabRequestTest, Test
+
+
+def create_lab_request(visit, ordered_by, tests, notes=None):
+    """
+    Order `tests` (Test instances or ids) for `visit`. The request, all of its
+    lines and their LABORATORY charges are written in one transaction with a
+    fixed number of queries, however many tests are ordered. Raises
+    ValidationError for a test that does not exist or is inactive.
+    """
+    test_ids = [Test._meta.pk.to_python(getattr(test, 'pk', test)) for test in tests]
+    tests_by_id = Test.objects.select_related('test_group').in_bulk(test_ids)
+    unknown = sorted(set(test_ids) - tests_by_id.keys())
+    if unknown:
+        raise ValidationError(f"Unknown or inactive test(s): {', '.join(map(str, unknown))}.")
+    prices = {test_id: test.price or test.test_group.price for test_id, test in tests_by_id.items()}
+
+    with transaction.atomic():
+        lab_request = LabRequest.objects.create(
+            visit=visit,
+            ordered_by=ordered_by,
+            price=sum(prices[test_id] for test_id in test_ids),
+        )
+        lines = LabRequestTest.objects.bulk_create([
+            LabRequestTest(
+                lab_request=lab_request,
+                test=tests_by_id[test_id],
+                ordered_by=ordered_by,
+                price=prices[test_id],
+                notes=notes,
+            )
+            for test_id in test_ids
+        ])
+        materialize_lab_request_charges(lab_request, lines=lines)
+    return lab_request
+
+
+def deactivate_lab_request(lab_request):
+    """Soft-delete a lab request with its lines and cancel the charges generated for it."""
+    with transaction.atomic():
+        LabRequest.all_objects.filter(pk=lab_request.pk).update(is_active=False)
+        LabRequestTest.all_objects.filter(lab_request=lab_request).update(is_active=False)
+        cancel_lab_request_charges(lab_request)
+    lab_request.is_active = False
+    return lab_request
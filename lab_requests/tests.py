@@ -1,3 +1,52 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 
+from charges.models import Charge
+from lab_requests.models import LabRequest, Test, TestGroup
+from lab_requests.services import create_lab_request
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit
+
 # Create your tests here.
+
+
+class CreateLabRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = Staff.objects.create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=Visit.VisitStatusEnum.IN_CONSULTATION,
+        )
+        group = TestGroup.objects.create(name='Chemistry', price=Decimal('100.00'), created_by=cls.doctor)
+        cls.test = Test.objects.create(
+            name='Potassium', price=Decimal('40.00'), test_type=Test.TestTypeEnum.NUMERICAL, test_group=group, created_by=cls.doctor,
+        )
+
+    def test_creates_lines_and_charges(self):
+        lab_request = create_lab_request(self.visit, self.doctor, [self.test, str(self.test.pk)])
+        self.assertEqual(lab_request.price, Decimal('80.00'))
+        self.assertEqual(lab_request.tests.count(), 2)
+        self.assertEqual(Charge.objects.filter(lab_request=lab_request, charge_status=Charge.ChargeStatusEnum.PENDING).count(), 2)
+
+    def test_unknown_test_raises_validation_error(self):
+        with self.assertRaises(ValidationError):
+            create_lab_request(self.visit, self.doctor, [self.test, self.test.pk + 1000])
+        self.assertFalse(LabRequest.objects.exists())
+
+    def test_total_over_999(self):
+        # LabRequest.price holds the sum of the lines; PostgreSQL rejects
+        # values wider than the column instead of storing them.
+        lab_request = create_lab_request(self.visit, self.doctor, [self.test] * 30)
+        self.assertEqual(LabRequest.objects.get(pk=lab_request.pk).price, Decimal('1200.00'))
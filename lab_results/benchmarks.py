@@ -0,0 +1,42 @@
+from benchmarks.registry import benchmark
+from lab_requests.models import Test
+from lab_requests.services import create_lab_request
+from lab_results.ingestion import BatchRow, ingest_batch
+from lab_results.worklist import get_worklist, turnaround_by_test
+from staff.models import Staff
+from visits.models import Visit
+
+SAMPLES = 500
+TESTS_PER_SAMPLE = 2
+
+
+def build_batch(ctx):
+    """Order fresh lab requests for visits waiting on samples and return analyzer rows for 1,000 results."""
+    doctor = ctx.pick(Staff.objects.active().filter(role=Staff.RoleEnum.DOCTOR))
+    technician = ctx.pick(Staff.objects.active().filter(role=Staff.RoleEnum.LABORATORY))
+    tests = Test.objects.in_bulk([ctx.pick_pk(Test.objects.all()) for _ in range(TESTS_PER_SAMPLE * 4)])
+    rows = []
+    for _ in range(SAMPLES):
+        visit = ctx.pick(Visit.objects.all())
+        Visit.objects.filter(pk=visit.pk).update(visit_status=Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE)
+        ordered = ctx.rng.sample(list(tests.values()), min(TESTS_PER_SAMPLE, len(tests)))
+        lab_request = create_lab_request(visit, doctor, ordered)
+        for test in ordered:
+            value = str(ctx.rng.randint(10, 200)) if test.test_type == Test.TestTypeEnum.NUMERICAL else ctx.rng.choice('+-')
+            rows.append(BatchRow(len(rows) + 2, str(lab_request.pk), str(test.pk), value, None))
+    return rows, technician
+
+
+@benchmark('lab_results.ingest', setup=build_batch, repeat=5)
+def ingest(ctx, rows, technician):
+    ingest_batch(rows, technician)
+
+
+@benchmark('lab_results.worklist')
+def worklist(ctx):
+    get_worklist()
+
+
+@benchmark('lab_results.turnaround')
+def turnaround(ctx):
+    turnaround_by_test()
@@ -0,0 +1,201 @@
+import csv
+import time
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from audit.tracking import Action, record_bulk
+from audit.trail import current_actor_id
+from lab_requests.models import LabRequestTest, Test
+from lab_results.models import LabResult, Result
+from lab_results.worklist import unresulted_lines
+from monitoring.metrics import LAB_TURNAROUND, VISIT_STATUS_TRANSITIONS
+from patients.chart import invalidate_patient_charts
+from visits.models import Visit, VisitStatusLog
+
+BATCH_COLUMNS = ('sample_id', 'test', 'value')
+
+CATEGORICAL_VALUES = {
+    '+': Result.CategoricalEnum.POSITIVE,
+    'pos': Result.CategoricalEnum.POSITIVE,
+    'positive': Result.CategoricalEnum.POSITIVE,
+    '-': Result.CategoricalEnum.NEGATIVE,
+    'neg': Result.CategoricalEnum.NEGATIVE,
+    'negative': Result.CategoricalEnum.NEGATIVE,
+}
+
+BatchRow = namedtuple('BatchRow', ['line', 'sample_id', 'test', 'value', 'notes'])
+RejectedRow = namedtuple('RejectedRow', ['line', 'sample_id', 'test', 'reason'])
+
+
+class IngestReport:
+    def __init__(self):
+        self.rows = 0
+        self.lab_results = 0
+        self.results = 0
+        self.visits_advanced = 0
+        self.rejected = []
+        self.seconds = 0.0
+
+    @property
+    def results_per_second(self):
+        return self.results / self.seconds if self.seconds else 0.0
+
+
+def parse_batch(handle, delimiter=','):
+    """
+    Read an analyzer batch: a delimited file with a header row naming at least
+    sample_id, test and value, plus an optional notes column. The sample id is
+    the LabRequest id and test is a Test id or name. Pipe-delimited HL7-style
+    exports are read with delimiter='|'.
+    """
+    reader = csv.DictReader(handle, delimiter=delimiter)
+    columns = {(name or '').strip().lower(): name for name in reader.fieldnames or []}
+    missing = [column for column in BATCH_COLUMNS if column not in columns]
+    if missing:
+        raise ValueError(f"Batch is missing the column(s): {', '.join(missing)}")
+    for line, record in enumerate(reader, start=2):
+        values = {column: (record.get(name) or '').strip() for column, name in columns.items()}
+        yield BatchRow(
+            line=line,
+            sample_id=values['sample_id'],
+            test=values['test'],
+            value=values['value'],
+            notes=values.get('notes') or None,
+        )
+
+
+def _match_line(lines, test):
+    """Find the ordered line for `test`, given as a Test id or a case-insensitive name."""
+    for line in lines:
+        if test.isdigit() and line.test_id == int(test):
+            return line
+        if line.test.name.lower() == test.lower():
+            return line
+    return None
+
+
+def _build_result(row, line, reported_by):
+    test = line.test
+    if test.test_type == Test.TestTypeEnum.NUMERICAL:
+        try:
+            value = Decimal(row.value)
+        except InvalidOperation:
+            raise ValueError(f"'{row.value}' is not a number")
+        return Result(test=test, reported_by=reported_by, value_numeric=value, notes=row.notes)
+    try:
+        value = CATEGORICAL_VALUES[row.value.lower()]
+    except KeyError:
+        raise ValueError(f"'{row.value}' is not a categorical result (+/-)")
+    return Result(test=test, reported_by=reported_by, value_categorical=value, notes=row.notes)
+
+
+def ingest_batch(rows, reported_by, batch_size=500):
+    """
+    Store the results of an analyzer batch with a fixed number of queries.
+
+    Rows are matched to the active LabRequestTest lines of their sample in one
+    query. Rows that cannot be matched, fail to parse, or repeat a test that
+    already has a result are rejected and reported without stopping the
+    batch. One LabResult is created per sample, all Result rows are bulk
+    inserted, and the visits whose lab requests all have results now move
+    from AWAITING_LAB_SAMPLE to AWAITING_REVIEW with a status log each.
+    """
+    report = IngestReport()
+    started = time.perf_counter()
+    rows = list(rows)
+    report.rows = len(rows)
+
+    sample_ids = {int(row.sample_id) for row in rows if row.sample_id.isdigit()}
+    lines_by_sample = {}
+    for line in (
+        LabRequestTest.objects.filter(lab_request_id__in=sample_ids, lab_request__is_active=True)
+        .select_related('test', 'lab_request__visit')
+    ):
+        lines_by_sample.setdefault(line.lab_request_id, []).append(line)
+    resulted = set(
+        Result.objects.filter(lab_result__lab_request_id__in=lines_by_sample, lab_result__is_active=True)
+        .values_list('lab_result__lab_request_id', 'test_id')
+    )
+
+    pending = {}
+    for row in rows:
+        lines = lines_by_sample.get(int(row.sample_id)) if row.sample_id.isdigit() else None
+        if not lines:
+            report.rejected.append(RejectedRow(row.line, row.sample_id, row.test, "Unknown or inactive sample"))
+            continue
+        line = _match_line(lines, row.test)
+        if line is None:
+            report.rejected.append(RejectedRow(row.line, row.sample_id, row.test, "Test was not ordered for this sample"))
+            continue
+        if (line.lab_request_id, line.test_id) in resulted:
+            report.rejected.append(RejectedRow(row.line, row.sample_id, row.test, "Test already has a result"))
+            continue
+        try:
+            result = _build_result(row, line, reported_by)
+        except ValueError as error:
+            report.rejected.append(RejectedRow(row.line, row.sample_id, row.test, str(error)))
+            continue
+        resulted.add((line.lab_request_id, line.test_id))
+        pending.setdefault(line.lab_request, []).append(result)
+
+    if pending:
+        with transaction.atomic():
+            lab_results = LabResult.objects.bulk_create(
+                [
+                    LabResult(lab_request=lab_request, visit_id=lab_request.visit_id, reported_by=reported_by)
+                    for lab_request in pending
+                ],
+                batch_size=batch_size,
+            )
+            results = []
+            for lab_result in lab_results:
+                for result in pending[lab_result.lab_request]:
+                    result.lab_result = lab_result
+                    results.append(result)
+            Result.objects.bulk_create(results, batch_size=batch_size)
+            record_bulk(results, Action.CREATE)
+            report.visits_advanced = advance_resulted_visits({lab_request.visit_id for lab_request in pending})
+            invalidate_patient_charts({lab_request.visit.patient_id for lab_request in pending})
+
+        report.lab_results = len(lab_results)
+        report.results = len(results)
+        for lab_result in lab_results:
+            LAB_TURNAROUND.observe((lab_result.created_at - lab_result.lab_request.created_at).total_seconds())
+
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def advance_resulted_visits(visit_ids):
+    """
+    Move the visits among `visit_ids` that are waiting for lab samples and have
+    a result for every ordered test, by the worklist's definition, to
+    AWAITING_REVIEW, logging the transition. Must run inside a transaction;
+    returns the number of visits advanced.
+    """
+    ready = list(
+        Visit.objects.select_for_update()
+        .filter(pk__in=visit_ids, visit_status=Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE)
+        .exclude(Exists(unresulted_lines().filter(lab_request__visit=OuterRef('pk'))))
+        .values_list('pk', flat=True)
+    )
+    if not ready:
+        return 0
+    now = timezone.now()
+    Visit.objects.filter(pk__in=ready).update(
+        visit_status=Visit.VisitStatusEnum.AWAITING_REVIEW,
+        current_status_since=now,
+        updated_at=now,
+        version=F('version') + 1,
+    )
+    changed_by_id = current_actor_id()
+    VisitStatusLog.objects.bulk_create([
+        VisitStatusLog(visit_id=pk, status=Visit.VisitStatusEnum.AWAITING_REVIEW, changed_by_id=changed_by_id)
+        for pk in ready
+    ])
+    VISIT_STATUS_TRANSITIONS.inc(len(ready), status=Visit.VisitStatusEnum.AWAITING_REVIEW.value)
+    return len(ready)
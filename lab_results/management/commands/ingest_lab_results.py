@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from lab_results.ingestion import ingest_batch, parse_batch
+from staff.models import Staff
+
+
+class Command(BaseCommand):
+    help = "Ingest an analyzer batch file of lab results and advance the visits that are ready for review."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV (or pipe-delimited) file with sample_id, test, value and optional notes columns.")
+        parser.add_argument('--reported-by', required=True, help="Username of the laboratory staff member reporting the batch.")
+        parser.add_argument('--delimiter', default=',')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        try:
+            reported_by = Staff.objects.get(username=options['reported_by'], is_active=True)
+        except Staff.DoesNotExist:
+            raise CommandError(f"No active staff member named {options['reported_by']}.")
+
+        try:
+            with open(options['path'], newline='', encoding='utf-8') as handle:
+                rows = list(parse_batch(handle, delimiter=options['delimiter']))
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+        with CaptureQueriesContext(connection) as queries:
+            report = ingest_batch(rows, reported_by, batch_size=options['batch_size'])
+
+        for rejected in report.rejected:
+            self.stderr.write(f"Line {rejected.line} (sample {rejected.sample_id}, test {rejected.test}): {rejected.reason}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {report.results} of {report.rows} results for {report.lab_results} samples in "
+            f"{report.seconds:.3f}s ({report.results_per_second:.0f} results/s, {len(queries)} queries); "
+            f"{report.visits_advanced} visits ready for review, {len(report.rejected)} rows rejected."
+        ))
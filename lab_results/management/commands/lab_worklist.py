@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from lab_results.worklist import get_worklist, turnaround_by_test
+
+
+def format_duration(duration):
+    minutes = int(duration.total_seconds() // 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m"
+
+
+class Command(BaseCommand):
+    help = "Print the outstanding lab tests grouped by test group, or turnaround percentiles per test."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--turnaround', action='store_true', help="Show turnaround percentiles instead of the worklist.")
+        parser.add_argument('--days', type=int, default=30, help="Turnaround window in days.")
+
+    def handle(self, *args, **options):
+        if options['turnaround']:
+            self.stdout.write(f"{'test':<30} {'count':>6} {'p50':>9} {'p90':>9} {'p95':>9} {'max':>9}")
+            for stats in turnaround_by_test(days=options['days']):
+                self.stdout.write(
+                    f"{stats.test_name[:30]:<30} {stats.count:>6} {format_duration(stats.p50):>9} "
+                    f"{format_duration(stats.p90):>9} {format_duration(stats.p95):>9} {format_duration(stats.max):>9}"
+                )
+            return
+
+        for group in get_worklist():
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{group.test_group.name} ({len(group.entries)})"))
+            for entry in group.entries:
+                visit = entry.line.lab_request.visit
+                self.stdout.write(
+                    f"  {format_duration(entry.age):>9}  request {entry.line.lab_request_id:<8} "
+                    f"{entry.line.test.name:<30} {visit.patient.fullname} [{visit.visit_status}]"
+                )
@@ -0,0 +1,33 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0003_active_partial_indexes'),
+        ('lab_results', '0002_remove_labresult_patient_remove_result_patient'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labresult',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['lab_request', 'created_at'], name='labresult_req_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='labresult',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['visit', 'created_at'], name='labresult_visit_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['lab_result', 'created_at'], name='result_labresult_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['test', 'created_at'], name='result_test_active_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:50
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0003_active_partial_indexes'),
+        ('lab_results', '0003_active_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['lab_result', 'test'], name='result_labresult_test_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='result_created_active_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from partitions.postgres import partition_table, unpartition_table
+
+
+def partition_result(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Result = apps.get_model('lab_results', 'Result')
+    partition_table(schema_editor.connection, Result._meta.db_table, 'created_at')
+
+
+def unpartition_result(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Result = apps.get_model('lab_results', 'Result')
+    unpartition_table(schema_editor.connection, Result._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_results', '0004_worklist_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_result, unpartition_result),
+    ]
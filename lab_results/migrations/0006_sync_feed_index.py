@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_requests', '0004_sync_feed_index'),
+        ('lab_results', '0005_partition_result'),
+        ('visits', '0006_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='labresult',
+            index=models.Index(fields=['updated_at', 'id'], name='labresult_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='result',
+            index=models.Index(fields=['updated_at', 'id'], name='result_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 14:31
+
+import django_enum.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lab_results', '0006_sync_feed_index'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='result',
+            name='lab_results_Result_value_categorical_CategoricalEnum',
+        ),
+        migrations.AlterField(
+            model_name='result',
+            name='value_categorical',
+            field=django_enum.fields.EnumCharField(blank=True, choices=[('+', 'Positive'), ('-', 'Negative')], help_text='Positive or negative; empty for numerical tests', max_length=1, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='result',
+            constraint=models.CheckConstraint(condition=models.Q(('value_categorical__in', ['+', '-']), ('value_categorical__isnull', True), _connector='OR'), name='lab_results_Result_value_categorical_CategoricalEnum'),
+        ),
+    ]
@@ -1,6 +1,10 @@
 from django.db import models
+from django.db.models import Q
 from django_enum import EnumField
 
+from app.managers import ActiveManager
+from audit.tracking import Audited
+
 from lab_requests.models import LabRequest, Test
 from patients.models import Patient
 from staff.models import Staff
@@ -31,10 +35,20 @@ class LabResult(models.Model):
         related_name="lab_results",
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lab_request', 'created_at'], name='labresult_req_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['visit', 'created_at'], name='labresult_visit_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='labresult_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Patient {self.visit.patient.fullname} lab result {self.id} for lab request {self.lab_request.id} reported by {self.reported_by.username}"
 
-class Result(models.Model):
+class Result(Audited, models.Model):
     class CategoricalEnum(models.TextChoices):
         POSITIVE = "+", "Positive"
         NEGATIVE = "-", "Negative"
@@ -42,7 +56,7 @@ class Result(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     value_numeric = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
-    value_categorical = EnumField(CategoricalEnum)
+    value_categorical = EnumField(CategoricalEnum, null=True, blank=True, help_text="Positive or negative; empty for numerical tests")
     notes = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
 
@@ -62,16 +76,32 @@ class Result(models.Model):
         related_name="results"
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['lab_result', 'created_at'], name='result_labresult_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['test', 'created_at'], name='result_test_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['lab_result', 'test'], name='result_labresult_test_idx', condition=Q(is_active=True)),
+            models.Index(fields=['created_at'], name='result_created_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='result_updated_idx'),
+        ]
+
     @property
     def result_display(self):
-        if self.test.test_type == "NUMERIC":
+        if self.test.test_type == Test.TestTypeEnum.NUMERICAL:
             return f"{self.value_numeric} {self.test.unit_of_measurement}"
         return self.value_categorical
 
     @property
     def is_abnormal(self):
-        if self.test.test_type == "NUMERIC":
-            return not (self.test.reference_min <= self.value_numeric <= self.test.reference_max)
+        if self.test.test_type == Test.TestTypeEnum.NUMERICAL:
+            if self.value_numeric is None:
+                return False
+            below = self.test.reference_min is not None and self.value_numeric < self.test.reference_min
+            above = self.test.reference_max is not None and self.value_numeric > self.test.reference_max
+            return below or above
         return self.value_categorical == Result.CategoricalEnum.POSITIVE
 
     def __str__(self):
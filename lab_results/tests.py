@@ -1,3 +1,83 @@
+import io
+from datetime import date
+from decimal import Decimal
+
 from django.test import TestCase
 
+from lab_requests.models import Test, TestGroup
+from lab_requests.services import create_lab_request
+from lab_results.ingestion import ingest_batch, parse_batch
+from lab_results.models import Result
+from lab_results.worklist import outstanding_tests
+from patients.models import Patient
+from staff.models import Staff
+from visits.models import Visit, VisitStatusLog
+
 # Create your tests here.
+
+
+def batch(*rows):
+    lines = ['sample_id,test,value'] + [','.join(str(value) for value in row) for row in rows]
+    return list(parse_batch(io.StringIO('\n'.join(lines))))
+
+
+class IngestBatchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.technician = Staff.objects.create_user(username='lab', role=Staff.RoleEnum.LABORATORY)
+        patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=patient,
+            visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE,
+        )
+        group = TestGroup.objects.create(name='Chemistry', price=Decimal('100.00'), created_by=cls.technician)
+        cls.potassium = Test.objects.create(
+            name='Potassium', test_type=Test.TestTypeEnum.NUMERICAL, test_group=group, created_by=cls.technician,
+            reference_min=Decimal('3.50'), reference_max=Decimal('5.50'),
+        )
+        cls.malaria = Test.objects.create(
+            name='Malaria', test_type=Test.TestTypeEnum.CATEGORICAL, test_group=group, created_by=cls.technician,
+        )
+        cls.lab_request = create_lab_request(cls.visit, cls.technician, [cls.potassium, cls.malaria])
+
+    def status(self):
+        return Visit.objects.get(pk=self.visit.pk).visit_status
+
+    def test_visit_waits_for_every_ordered_test(self):
+        report = ingest_batch(batch((self.lab_request.pk, 'Potassium', '4.1')), self.technician)
+        self.assertEqual((report.results, report.visits_advanced), (1, 0))
+        self.assertEqual(self.status(), Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE)
+        self.assertEqual([line.test for line in outstanding_tests()], [self.malaria])
+
+        report = ingest_batch(batch((self.lab_request.pk, 'Malaria', 'neg')), self.technician)
+        self.assertEqual((report.results, report.visits_advanced), (1, 1))
+        self.assertEqual(self.status(), Visit.VisitStatusEnum.AWAITING_REVIEW)
+        self.assertEqual(list(outstanding_tests()), [])
+        self.assertEqual(VisitStatusLog.objects.filter(visit=self.visit).count(), 1)
+
+    def test_numerical_results_are_not_categorized(self):
+        ingest_batch(batch((self.lab_request.pk, 'Potassium', '6.2'), (self.lab_request.pk, 'Malaria', '+')), self.technician)
+        potassium = Result.objects.get(test=self.potassium)
+        self.assertIsNone(potassium.value_categorical)
+        self.assertTrue(potassium.is_abnormal)
+        self.assertTrue(Result.objects.get(test=self.malaria).is_abnormal)
+
+    def test_rejects_repeated_and_unknown_tests(self):
+        ingest_batch(batch((self.lab_request.pk, 'Potassium', '4.1')), self.technician)
+        report = ingest_batch(
+            batch((self.lab_request.pk, 'Potassium', '4.3'), (self.lab_request.pk, 'Sodium', '140'), (0, 'Malaria', '-')),
+            self.technician,
+        )
+        self.assertEqual(report.results, 0)
+        self.assertEqual(
+            [rejected.reason for rejected in report.rejected],
+            ["Test already has a result", "Test was not ordered for this sample", "Unknown or inactive sample"],
+        )
@@ -0,0 +1,93 @@
+from collections import namedtuple
+from datetime import timedelta
+from itertools import groupby
+
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from lab_requests.models import LabRequestTest
+from lab_results.models import LabResult, Result
+from visits.models import Visit
+
+# Visit statuses in which ordered tests are still waiting on the laboratory.
+WORKLIST_VISIT_STATUSES = [
+    Visit.VisitStatusEnum.AWAITING_LAB_PAYMENT,
+    Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE,
+]
+
+WorklistEntry = namedtuple('WorklistEntry', ['line', 'age'])
+WorklistGroup = namedtuple('WorklistGroup', ['test_group', 'entries'])
+TurnaroundStats = namedtuple('TurnaroundStats', ['test_id', 'test_name', 'count', 'p50', 'p90', 'p95', 'max'])
+
+
+def unresulted_lines():
+    """
+    Active ordered test lines of active lab requests that have no active
+    Result for their test on an active LabResult of the same request. This
+    is what the worklist shows and what keeps a visit waiting on the lab.
+    """
+    # Correlated on the request's active LabResult ids rather than joined
+    # through lab_result, so each probe is a lookup on
+    # labresult_req_active_idx followed by result_labresult_test_idx.
+    lab_results = LabResult.objects.filter(lab_request=OuterRef(OuterRef('lab_request'))).values('pk')
+    resulted = Result.objects.filter(lab_result__in=lab_results, test=OuterRef('test'))
+    return LabRequestTest.objects.filter(lab_request__is_active=True).exclude(Exists(resulted))
+
+
+def outstanding_tests(statuses=None, test_group=None):
+    """
+    Ordered tests without a result, for visits that are waiting on the lab.
+
+    On PostgreSQL the scan starts from the open-visit partial index (the lab
+    statuses imply its predicate), so its cost follows the number of visits
+    currently in the lab queue rather than the size of the history.
+    """
+    queryset = (
+        unresulted_lines().filter(lab_request__visit__visit_status__in=statuses or WORKLIST_VISIT_STATUSES)
+        .select_related('test__test_group', 'lab_request__visit__patient')
+        .order_by('test__test_group__name', 'test__test_group_id', 'lab_request__created_at', 'pk')
+    )
+    if test_group is not None:
+        queryset = queryset.filter(test__test_group=test_group)
+    return queryset
+
+
+def get_worklist(statuses=None, test_group=None, now=None):
+    """The outstanding tests grouped by TestGroup, oldest request first within each group."""
+    now = now or timezone.now()
+    lines = outstanding_tests(statuses=statuses, test_group=test_group)
+    return [
+        WorklistGroup(group, [WorklistEntry(line, now - line.lab_request.created_at) for line in group_lines])
+        for group, group_lines in groupby(lines, key=lambda line: line.test.test_group)
+    ]
+
+
+def _percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def turnaround_by_test(since=None, days=30):
+    """
+    Time from lab request to result for each test, over results reported
+    since `since` (default: the last `days` days). Percentiles are computed
+    in Python from one query over the window.
+    """
+    since = since or timezone.now() - timedelta(days=days)
+    rows = (
+        Result.objects.filter(created_at__gte=since, lab_result__is_active=True)
+        .values_list('test_id', 'test__name', 'created_at', 'lab_result__lab_request__created_at')
+        .order_by('test_id')
+    )
+    stats = []
+    for (test_id, test_name), group in groupby(rows, key=lambda row: (row[0], row[1])):
+        durations = sorted(reported - requested for _, _, reported, requested in group)
+        stats.append(TurnaroundStats(
+            test_id=test_id,
+            test_name=test_name,
+            count=len(durations),
+            p50=_percentile(durations, 0.5),
+            p90=_percentile(durations, 0.9),
+            p95=_percentile(durations, 0.95),
+            max=durations[-1],
+        ))
+    return stats
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MonitoringConfig(AppConfig):
+    name = 'monitoring'
+
+    def ready(self):
+        from monitoring import collectors, signals  # noqa: F401
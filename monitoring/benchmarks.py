@@ -0,0 +1,56 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from benchmarks.registry import benchmark
+from monitoring.metrics import registry
+from monitoring.middleware import QueryProfilingMiddleware
+from patients.models import Patient
+
+request_factory = RequestFactory()
+
+
+def patient_list_view(request):
+    return HttpResponse(str([patient.fullname for patient in Patient.objects.order_by('-created_at')[:20]]))
+
+
+def build_middleware(sample_rate):
+    middleware = QueryProfilingMiddleware(patient_list_view)
+    middleware.sample_rate = sample_rate
+    return middleware
+
+
+unprofiled = build_middleware(0.0)
+profiled = build_middleware(1.0)
+
+
+@benchmark('monitoring.request_unprofiled')
+def request_unprofiled(ctx):
+    unprofiled(request_factory.get('/patients/'))
+
+
+@benchmark('monitoring.request_profiled')
+def request_profiled(ctx):
+    profiled(request_factory.get('/patients/'))
+
+
+@benchmark('monitoring.metrics_scrape')
+def metrics_scrape(ctx):
+    registry.collect()
+
+
+def run_manage(*args):
+    subprocess.run([sys.executable, *args], cwd=settings.BASE_DIR, check=True, capture_output=True)
+
+
+@benchmark('startup.check', repeat=5)
+def startup_check(ctx):
+    run_manage('manage.py', 'check')
+
+
+@benchmark('startup.first_request', repeat=5)
+def startup_first_request(ctx):
+    run_manage('-m', 'monitoring.startup', '--first-request')
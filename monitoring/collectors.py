@@ -0,0 +1,24 @@
+from django.db.models import Count, Min
+from django.utils import timezone
+
+from monitoring.metrics import VISIT_QUEUE_LENGTH, VISIT_QUEUE_OLDEST, registry
+from visits.models import CLOSED_VISIT_STATUSES, Visit
+
+
+@registry.collector
+def collect_visit_queue():
+    """One grouped query over the open-visit partial index per scrape."""
+    now = timezone.now()
+    rows = {
+        row['visit_status']: row
+        for row in Visit.objects.exclude(visit_status__in=CLOSED_VISIT_STATUSES)
+        .order_by()
+        .values('visit_status')
+        .annotate(waiting=Count('id'), oldest=Min('current_status_since'))
+    }
+    for status in Visit.VisitStatusEnum:
+        if status.value in CLOSED_VISIT_STATUSES:
+            continue
+        row = rows.get(status)
+        VISIT_QUEUE_LENGTH.set(row['waiting'] if row else 0, status=status.value)
+        VISIT_QUEUE_OLDEST.set(round((now - row['oldest']).total_seconds(), 3) if row else 0, status=status.value)
@@ -0,0 +1,78 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+def run_cold_start(settings_module, first_request=False):
+    """Start a fresh interpreter running monitoring.startup and return its report plus total wall time."""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings_module}
+    command = [sys.executable, '-m', 'monitoring.startup'] + (['--first-request'] if first_request else [])
+    started = time.perf_counter()
+    completed = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - started
+    if completed.returncode:
+        raise CommandError(f"Startup profile for {settings_module} failed:\n{completed.stderr}")
+    report = json.loads(completed.stdout)
+    report['wall_seconds'] = wall_seconds
+    return report
+
+
+def ms(seconds):
+    return f"{seconds * 1000:8.1f}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile cold starts: per-app import, models and ready() time, settings import and total "
+        "process time, as the median of several fresh interpreters."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--settings-module', action='append', dest='settings_modules',
+            help="Settings module to profile; repeat to compare profiles. Defaults to the current one.",
+        )
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('--first-request', action='store_true', help="Also time the first request after setup.")
+        parser.add_argument('--json', action='store_true', help="Print the raw reports as JSON.")
+
+    def handle(self, *args, **options):
+        modules = options['settings_modules'] or [os.environ['DJANGO_SETTINGS_MODULE']]
+        results = {}
+        for module in modules:
+            results[module] = [run_cold_start(module, options['first_request']) for _ in range(options['repeat'])]
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for module, reports in results.items():
+            median = lambda values: statistics.median(values)  # noqa: E731
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{module} (median of {len(reports)} cold starts)"))
+            self.stdout.write(f"  process      {ms(median([r['wall_seconds'] for r in reports]))} ms")
+            self.stdout.write(f"  settings     {ms(median([r['settings_seconds'] for r in reports]))} ms")
+            self.stdout.write(f"  setup        {ms(median([r['setup_seconds'] for r in reports]))} ms")
+            app_seconds = median([
+                sum(sum(phases[phase] for phase in ('import', 'models', 'ready')) for phases in r['apps'].values())
+                for r in reports
+            ])
+            self.stdout.write(f"  apps         {ms(app_seconds)} ms")
+            if options['first_request']:
+                self.stdout.write(f"  1st request  {ms(median([r['first_request']['seconds'] for r in reports]))} ms")
+
+            self.stdout.write(f"  {'app':<22} {'import':>8} {'models':>8} {'ready':>8} {'total':>8}")
+            rows = []
+            for label in reports[0]['apps']:
+                phases = [
+                    median([r['apps'][label][phase] for r in reports if label in r['apps']])
+                    for phase in ('import', 'models', 'ready')
+                ]
+                rows.append((label, *phases, sum(phases)))
+            for label, imported, models, ready, total in sorted(rows, key=lambda row: -row[-1]):
+                self.stdout.write(f"  {label:<22} {ms(imported)} {ms(models)} {ms(ready)} {ms(total)}")
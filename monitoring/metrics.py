@@ -0,0 +1,198 @@
+import threading
+from bisect import bisect_left
+
+
+def format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values)) + list(extra or [])
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        for name, labels, value in self.samples():
+            lines.append(f'{name}{labels} {format_value(value)}')
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [(self.name, format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def count(self, **labels):
+        counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+        return sum(counts)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                samples.append((f'{self.name}_bucket', format_labels(self.labelnames, key, [('le', format_value(float(bound)))]), cumulative))
+            samples.append((f'{self.name}_sum', format_labels(self.labelnames, key), total))
+            samples.append((f'{self.name}_count', format_labels(self.labelnames, key), cumulative))
+        return samples
+
+
+class Registry:
+    """
+    In-process metric registry. Metrics live in the memory of each worker
+    process; a scrape reports the worker that served it, as with the
+    Prometheus client's default (non-multiprocess) mode. Collectors are
+    called at scrape time to refresh gauges that are computed from the
+    database.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+
+    def register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=Histogram.DEFAULT_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def collector(self, func):
+        self._collectors.append(func)
+        return func
+
+    def collect(self):
+        for collector in self._collectors:
+            collector()
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.histogram(
+    'clinic_http_request_duration_seconds',
+    'Time spent serving HTTP requests.',
+    ['method', 'route', 'status'],
+)
+VISIT_STATUS_TRANSITIONS = registry.counter(
+    'clinic_visit_status_transitions_total',
+    'Visits entering each status; the FIN series gives visits completed.',
+    ['status'],
+)
+VISIT_QUEUE_LENGTH = registry.gauge(
+    'clinic_visit_queue_length',
+    'Open visits currently waiting in each status.',
+    ['status'],
+)
+VISIT_QUEUE_OLDEST = registry.gauge(
+    'clinic_visit_queue_oldest_seconds',
+    'Time the longest waiting visit has spent in each open status.',
+    ['status'],
+)
+LAB_TURNAROUND = registry.histogram(
+    'clinic_lab_turnaround_seconds',
+    'Time from lab request to reported result.',
+    buckets=(900, 1800, 3600, 7200, 14400, 28800, 86400, 259200),
+)
+PAYMENTS = registry.counter(
+    'clinic_payments_total',
+    'Payments recorded.',
+    ['method'],
+)
+PAYMENT_AMOUNT = registry.counter(
+    'clinic_payment_amount_total',
+    'Sum of recorded payment amounts.',
+    ['method'],
+)
+PATIENT_CHART_CACHE = registry.counter(
+    'clinic_patient_chart_cache_requests_total',
+    'Patient chart reads by cache outcome (hit or miss).',
+    ['result'],
+)
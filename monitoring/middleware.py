@@ -0,0 +1,82 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from monitoring.metrics import REQUEST_LATENCY
+from monitoring.profiling import QueryProfiler
+
+logger = logging.getLogger('monitoring.queries')
+
+
+class QueryProfilingMiddleware:
+    """
+    Profiles the database queries of a sample of requests.
+
+    For sampled requests every connection gets a QueryProfiler execute
+    wrapper; the query count, total database time and the SQL fingerprints
+    repeated at least QUERY_PROFILING_N_PLUS_ONE_THRESHOLD times are returned
+    as X-Query-* response headers and logged to `monitoring.queries`.
+    Unsampled requests only pay for one random() call.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.QUERY_PROFILING_SAMPLE_RATE
+        self.threshold = settings.QUERY_PROFILING_N_PLUS_ONE_THRESHOLD
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profiler = QueryProfiler()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(profiler))
+            response = self.get_response(request)
+
+        repeated = profiler.repeated(self.threshold)
+        db_time_ms = round(profiler.duration * 1000, 2)
+        response['X-Query-Count'] = str(profiler.count)
+        response['X-Query-Time-Ms'] = str(db_time_ms)
+        response['X-Query-Repeated'] = str(len(repeated))
+
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'query_count': profiler.count,
+            'db_time_ms': db_time_ms,
+            'repeated_queries': [{'sql': sql, 'count': times} for sql, times in repeated],
+        }
+        if repeated:
+            logger.warning('Possible N+1 queries on %s %s', request.method, request.path, extra={'query_profile': record})
+        else:
+            logger.info('Query profile for %s %s', request.method, request.path, extra={'query_profile': record})
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Records every request in the request latency histogram. Requests are
+    labelled by URL route pattern rather than path so that ids in the URL
+    do not create a new series per object.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        REQUEST_LATENCY.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=match.route if match else 'unmatched',
+            status=response.status_code,
+        )
+        return response
@@ -0,0 +1,39 @@
+import re
+import time
+from collections import Counter
+
+_IN_LIST = re.compile(r'IN \((?:%s, )*%s\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Normalize SQL so that queries differing only in parameters or IN-list length compare equal."""
+    return _WHITESPACE.sub(' ', _IN_LIST.sub('IN (...)', sql)).strip()
+
+
+class QueryProfiler:
+    """
+    Database execute wrapper recording query count, total time and how often
+    each SQL fingerprint ran. Install it with connection.execute_wrapper().
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.fingerprints[sql] += 1
+
+    def repeated(self, threshold):
+        """Fingerprints executed at least `threshold` times, most frequent first."""
+        repeated = Counter()
+        for sql, times in self.fingerprints.items():
+            repeated[fingerprint(sql)] += times
+        return [(sql, times) for sql, times in repeated.most_common() if times >= threshold]
@@ -0,0 +1,22 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from lab_results.models import LabResult
+from monitoring.metrics import LAB_TURNAROUND, PAYMENT_AMOUNT, PAYMENTS
+from payments.models import Payment
+
+
+@receiver(post_save, sender=LabResult)
+def observe_lab_turnaround(sender, instance, created, **kwargs):
+    if created:
+        requested_at = instance.lab_request.created_at
+        LAB_TURNAROUND.observe(((instance.created_at or timezone.now()) - requested_at).total_seconds())
+
+
+@receiver(post_save, sender=Payment)
+def count_payment(sender, instance, created, **kwargs):
+    if created:
+        method = Payment.PaymentMethodEnum(instance.payment_method).value
+        PAYMENTS.inc(method=method)
+        PAYMENT_AMOUNT.inc(float(instance.amount), method=method)
@@ -0,0 +1,86 @@
+"""
+Measure Django startup in a fresh interpreter.
+
+Run as `python -m monitoring.startup` with DJANGO_SETTINGS_MODULE set; it
+prints one JSON document with the settings import time and, per installed
+app, the time spent importing the app module, its models and its ready().
+With --first-request it also serves one request through the WSGI handler
+and reports how long that took. The profile_startup command and the
+startup benchmarks run it in subprocesses so every sample is a cold start.
+"""
+import json
+import os
+import sys
+import time
+
+
+FIRST_REQUEST_PATH = '/metrics'
+
+
+def serve_first_request(path=FIRST_REQUEST_PATH):
+    from django.core.wsgi import get_wsgi_application
+    from django.test import Client
+
+    started = time.perf_counter()
+    get_wsgi_application()
+    response = Client(HTTP_HOST='localhost').get(path)
+    return {'status': response.status_code, 'seconds': time.perf_counter() - started}
+
+
+def profile(first_request=False):
+    from django.apps.config import AppConfig
+
+    timings = {}
+    original_create = AppConfig.create.__func__
+    original_import_models = AppConfig.import_models
+
+    def timed_create(cls, entry):
+        started = time.perf_counter()
+        app_config = original_create(cls, entry)
+        timings[app_config.label] = {'name': entry, 'import': time.perf_counter() - started, 'models': 0.0, 'ready': 0.0}
+        original_ready = app_config.ready
+
+        def timed_ready():
+            started = time.perf_counter()
+            try:
+                return original_ready()
+            finally:
+                timings[app_config.label]['ready'] = time.perf_counter() - started
+
+        app_config.ready = timed_ready
+        return app_config
+
+    def timed_import_models(self):
+        started = time.perf_counter()
+        try:
+            return original_import_models(self)
+        finally:
+            timings[self.label]['models'] = time.perf_counter() - started
+
+    AppConfig.create = classmethod(timed_create)
+    AppConfig.import_models = timed_import_models
+
+    started = time.perf_counter()
+    import django
+    from django.conf import settings
+
+    settings.INSTALLED_APPS
+    settings_seconds = time.perf_counter() - started
+
+    setup_started = time.perf_counter()
+    django.setup()
+    setup_seconds = time.perf_counter() - setup_started
+
+    report = {
+        'settings_module': os.environ.get('DJANGO_SETTINGS_MODULE'),
+        'settings_seconds': settings_seconds,
+        'setup_seconds': setup_seconds,
+        'apps': timings,
+    }
+    if first_request:
+        report['first_request'] = serve_first_request()
+    return report
+
+
+if __name__ == '__main__':
+    json.dump(profile(first_request='--first-request' in sys.argv), sys.stdout)
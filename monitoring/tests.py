@@ -0,0 +1,114 @@
+from datetime import date
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from monitoring.metrics import (
+    PAYMENT_AMOUNT, PAYMENTS, REQUEST_LATENCY, VISIT_QUEUE_LENGTH, VISIT_STATUS_TRANSITIONS, Counter, Histogram, Registry,
+)
+from patients.models import Patient
+from payments.models import Payment
+from staff.models import Staff
+from visits.models import Visit
+from visits.services import transition_visit
+
+# Create your tests here.
+Status = Visit.VisitStatusEnum
+
+
+class MetricRenderingTests(SimpleTestCase):
+    def test_counter(self):
+        counter = Counter('test_total', 'Things counted.', ['kind'])
+        counter.inc(kind='b')
+        counter.inc(2, kind='a')
+        counter.inc(kind='a')
+        self.assertEqual(counter.value(kind='a'), 3)
+        self.assertEqual(
+            counter.render(),
+            '# HELP test_total Things counted.\n'
+            '# TYPE test_total counter\n'
+            'test_total{kind="a"} 3\n'
+            'test_total{kind="b"} 1',
+        )
+
+    def test_histogram(self):
+        histogram = Histogram('test_seconds', 'Time taken.', buckets=(1, 0.5))
+        for value in (0.25, 0.5, 0.75, 3):
+            histogram.observe(value)
+        self.assertEqual(histogram.count(), 4)
+        self.assertEqual(
+            histogram.render().splitlines()[2:],
+            [
+                'test_seconds_bucket{le="0.5"} 2',
+                'test_seconds_bucket{le="1.0"} 3',
+                'test_seconds_bucket{le="+Inf"} 4',
+                'test_seconds_sum 4.5',
+                'test_seconds_count 4',
+            ],
+        )
+
+    def test_label_values_are_escaped(self):
+        counter = Counter('test_total', 'Things counted.', ['path'])
+        counter.inc(path='a\\b\n"c"')
+        self.assertEqual(counter.samples(), [('test_total', '{path="a\\\\b\\n\\"c\\""}', 1)])
+
+    def test_labels_must_match(self):
+        counter = Counter('test_total', 'Things counted.', ['kind'])
+        with self.assertRaises(ValueError):
+            counter.inc(method='GET')
+
+    def test_registry_rejects_duplicates_and_runs_collectors(self):
+        registry = Registry()
+        counter = registry.counter('test_total', 'Things counted.')
+        with self.assertRaises(ValueError):
+            registry.counter('test_total', 'Things counted again.')
+        registry.collector(lambda: counter.inc())
+        self.assertIn('test_total 1\n', registry.collect())
+
+
+class SignalMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = Staff.objects.create_user(username='reception', role=Staff.RoleEnum.RECEPTION)
+        patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=Status.AWAITING_VITALS,
+        )
+
+    def test_saved_status_change_is_counted_in_this_process(self):
+        # The status log is written later by a task worker; the counter
+        # must not wait for it.
+        before = VISIT_STATUS_TRANSITIONS.value(status=Status.AWAITING_CONSULTATION.value)
+        visit = Visit.objects.get(pk=self.visit.pk)
+        visit.visit_status = Status.AWAITING_CONSULTATION
+        visit.save()
+        visit.chief_complaint = 'Headache'
+        visit.save()
+        self.assertEqual(VISIT_STATUS_TRANSITIONS.value(status=Status.AWAITING_CONSULTATION.value), before + 1)
+
+    def test_transition_is_counted(self):
+        before = VISIT_STATUS_TRANSITIONS.value(status=Status.CANCELLED.value)
+        transition_visit(Visit.objects.get(pk=self.visit.pk), Status.CANCELLED)
+        self.assertEqual(VISIT_STATUS_TRANSITIONS.value(status=Status.CANCELLED.value), before + 1)
+
+    def test_payment_is_counted(self):
+        method = Payment.PaymentMethodEnum.MOBILE.value
+        count, amount = PAYMENTS.value(method=method), PAYMENT_AMOUNT.value(method=method)
+        Payment.objects.create(visit=self.visit, recorded_by=self.staff, amount=Decimal('12.50'), payment_method=method)
+        self.assertEqual(PAYMENTS.value(method=method), count + 1)
+        self.assertEqual(PAYMENT_AMOUNT.value(method=method), amount + 12.5)
+
+    def test_metrics_view(self):
+        before = REQUEST_LATENCY.count(method='GET', route='metrics', status=200)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(f'clinic_visit_queue_length{{status="{Status.AWAITING_VITALS.value}"}} 1', response.content.decode())
+        self.assertEqual(VISIT_QUEUE_LENGTH.value(status=Status.AWAITING_VITALS.value), 1)
+        self.assertEqual(REQUEST_LATENCY.count(method='GET', route='metrics', status=200), before + 1)
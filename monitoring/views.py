@@ -0,0 +1,11 @@
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from monitoring.metrics import registry
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+@require_GET
+def metrics(request):
+    return HttpResponse(registry.collect(), content_type=CONTENT_TYPE)
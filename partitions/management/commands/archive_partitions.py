@@ -0,0 +1,64 @@
+import os
+from datetime import date
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from partitions.postgres import (
+    ARCHIVE_SCHEMA, PARTITIONED_TABLES, add_months, archive_partition, history_view_name, is_partitioned,
+    list_partitions, month_start,
+)
+
+
+def parse_month(value):
+    return date.fromisoformat(f'{value}-01')
+
+
+class Command(BaseCommand):
+    help = (
+        "Move monthly partitions older than the retention window into the archive schema, optionally "
+        "exporting each one to a gzip-compressed CSV. Archived rows stay queryable through the "
+        "archive.<table>_history views until they are dropped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--before', type=parse_month, help="Archive partitions for months before this one (YYYY-MM).")
+        parser.add_argument('--export', action='store_true', help="Write each archived partition to PARTITION_ARCHIVE_DIR.")
+        parser.add_argument('--drop', action='store_true', help="Drop archived partitions once exported (requires --export).")
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError("Table partitioning is only available on PostgreSQL.")
+        if options['drop'] and not options['export']:
+            raise CommandError("--drop only applies to exported partitions; add --export.")
+
+        cutoff = options['before'] or add_months(month_start(date.today()), -settings.PARTITION_RETENTION_MONTHS)
+        archive_dir = settings.PARTITION_ARCHIVE_DIR
+        if options['export'] and not options['dry_run']:
+            os.makedirs(archive_dir, exist_ok=True)
+
+        for label, column in PARTITIONED_TABLES.items():
+            table = apps.get_model(label)._meta.db_table
+            if not is_partitioned(connection, table):
+                self.stderr.write(f"{table} is not partitioned; run migrate first.")
+                continue
+            for name, month in list_partitions(connection, table):
+                if month >= cutoff:
+                    continue
+                export_path = os.path.join(archive_dir, f'{name}.csv.gz') if options['export'] else None
+                if options['dry_run']:
+                    self.stdout.write(f"Would archive {name}" + (f" to {export_path}" if export_path else ""))
+                    continue
+                archive_partition(connection, table, name, export_path=export_path, drop=options['drop'])
+                if options['drop']:
+                    outcome = f"exported to {export_path} and dropped"
+                else:
+                    outcome = f"queryable through {ARCHIVE_SCHEMA}.{history_view_name(table)}"
+                    if export_path:
+                        outcome += f", exported to {export_path}"
+                self.stdout.write(self.style.SUCCESS(f"Archived {name}: {outcome}"))
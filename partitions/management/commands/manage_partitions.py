@@ -0,0 +1,40 @@
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from partitions.postgres import (
+    PARTITIONED_TABLES, default_partition_name, ensure_partitions, is_partitioned, list_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = "Create the upcoming monthly partitions of the append-heavy tables and report on the existing ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--months-ahead', type=int, default=settings.PARTITION_MONTHS_AHEAD)
+        parser.add_argument('--list', action='store_true', help="Only list the partitions of each table.")
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'postgresql':
+            raise CommandError("Table partitioning is only available on PostgreSQL.")
+
+        for label, column in PARTITIONED_TABLES.items():
+            table = apps.get_model(label)._meta.db_table
+            if not is_partitioned(connection, table):
+                self.stderr.write(f"{table} is not partitioned; run migrate first.")
+                continue
+            if not options['list']:
+                for name in ensure_partitions(connection, table, column, months_ahead=options['months_ahead']):
+                    self.stdout.write(self.style.SUCCESS(f"Created {name}"))
+
+            partitions = list_partitions(connection, table)
+            with connection.cursor() as cursor:
+                cursor.execute(f'SELECT count(*) FROM "{default_partition_name(table)}"')
+                stray = cursor.fetchone()[0]
+            span = f"{partitions[0][1]:%Y-%m} to {partitions[-1][1]:%Y-%m}" if partitions else "none"
+            self.stdout.write(f"{table}: {len(partitions)} monthly partitions ({span}), {stray} rows in the default partition")
+            if stray:
+                self.stderr.write(f"  {table} has rows outside its monthly partitions; create partitions covering them.")
@@ -0,0 +1,235 @@
+"""
+Monthly range partitioning of append-heavy tables on PostgreSQL.
+
+Each partitioned table keeps Django's `id` column; the primary key becomes
+(id, partition column) because PostgreSQL requires the partition key in
+every unique constraint. Nothing references these tables by foreign key,
+so the ORM keeps treating `id` as the primary key. Partitions are named
+`<table>_pYYYYMM`, with a `<table>_pdefault` partition catching rows that
+fall outside the months created so far.
+"""
+import gzip
+import re
+from datetime import date
+
+from django.db import transaction
+
+ARCHIVE_SCHEMA = 'archive'
+
+# Partitioned model label -> partition column.
+PARTITIONED_TABLES = {
+    'visits.VisitStatusLog': 'changed_at',
+    'vital_signs.VitalSign': 'created_at',
+    'lab_results.Result': 'created_at',
+    'payments.Payment': 'created_at',
+}
+
+_PARTITION_SUFFIX = re.compile(r'_p(\d{4})(\d{2})$')
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(month, months):
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_p{month:%Y%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_pdefault'
+
+
+def history_view_name(table):
+    return f'{table}_history'
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt JOIN pg_class c ON c.oid = pt.partrelid "
+            "WHERE c.relname = %s AND c.relnamespace = 'public'::regnamespace",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(connection, table):
+    """Return [(partition name, first month)] for the monthly partitions attached to `table`, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = %s AND p.relnamespace = 'public'::regnamespace",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    partitions = []
+    for name in names:
+        match = _PARTITION_SUFFIX.search(name)
+        if match:
+            partitions.append((name, date(int(match[1]), int(match[2]), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def list_archived(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT tablename FROM pg_tables WHERE schemaname = %s AND tablename LIKE %s ORDER BY tablename",
+            [ARCHIVE_SCHEMA, f'{table}\\_p%'],
+        )
+        return [row[0] for row in cursor.fetchall() if _PARTITION_SUFFIX.search(row[0])]
+
+
+def create_partition(connection, table, column, month):
+    """
+    Create the partition for `month` unless it exists. Rows of that month
+    that already landed in the default partition are moved into it first,
+    since PostgreSQL refuses to attach a range the default partition holds.
+    """
+    name = partition_name(table, month)
+    start, end = month, add_months(month, 1)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [f'public.{name}'])
+        if cursor.fetchone()[0] is not None:
+            return False
+        cursor.execute(f'CREATE TABLE "{name}" (LIKE "{table}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{default_partition_name(table)}" '
+            f'WHERE "{column}" >= %s AND "{column}" < %s RETURNING *) '
+            f'INSERT INTO "{name}" SELECT * FROM moved',
+            [start, end],
+        )
+        cursor.execute(
+            f'ALTER TABLE "{table}" ATTACH PARTITION "{name}" FOR VALUES FROM (%s) TO (%s)',
+            [start.isoformat(), end.isoformat()],
+        )
+    return True
+
+
+def ensure_partitions(connection, table, column, months_ahead=3, since=None):
+    """Create the monthly partitions from `since` (default: this month) up to `months_ahead` months ahead."""
+    today = month_start(date.today())
+    month = month_start(since) if since else today
+    created = []
+    while month <= add_months(today, months_ahead):
+        if create_partition(connection, table, column, month):
+            created.append(partition_name(table, month))
+        month = add_months(month, 1)
+    return created
+
+
+def _dependent_definitions(cursor, table):
+    """The secondary index and foreign key definitions of `table`, to recreate after rebuilding it."""
+    cursor.execute(
+        "SELECT indexdef FROM pg_indexes WHERE schemaname = 'public' AND tablename = %s "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'p')",
+        [table, table],
+    )
+    index_definitions = [row[0] for row in cursor.fetchall()]
+    cursor.execute(
+        "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+        [table],
+    )
+    return index_definitions, cursor.fetchall()
+
+
+def _restore_definitions(cursor, table, index_definitions, foreign_keys):
+    for definition in index_definitions:
+        cursor.execute(definition)
+    for name, definition in foreign_keys:
+        cursor.execute(f'ALTER TABLE "{table}" ADD CONSTRAINT "{name}" {definition}')
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence(%s, 'id'), coalesce(max(id), 0) + 1, false) FROM \"{table}\"",
+        [table],
+    )
+
+
+def partition_table(connection, table, column, months_ahead=3):
+    """
+    Rebuild `table` as a table partitioned by month on `column`, copying the
+    existing rows and recreating its indexes and foreign keys. Takes an
+    exclusive lock for the duration of the copy.
+    """
+    if is_partitioned(connection, table):
+        return
+    legacy = f'{table}_unpartitioned'
+    with connection.cursor() as cursor:
+        index_definitions, foreign_keys = _dependent_definitions(cursor, table)
+        cursor.execute(f'SELECT min("{column}") FROM "{table}"')
+        oldest = cursor.fetchone()[0]
+
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{legacy}"')
+        cursor.execute(
+            f'CREATE TABLE "{table}" (LIKE "{legacy}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY) '
+            f'PARTITION BY RANGE ("{column}")'
+        )
+        cursor.execute(f'CREATE TABLE "{default_partition_name(table)}" PARTITION OF "{table}" DEFAULT')
+    ensure_partitions(connection, table, column, months_ahead=months_ahead, since=oldest)
+    with connection.cursor() as cursor:
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{legacy}"')
+        cursor.execute(f'DROP TABLE "{legacy}"')
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("id", "{column}")')
+        _restore_definitions(cursor, table, index_definitions, foreign_keys)
+
+
+def unpartition_table(connection, table):
+    """Reverse of partition_table: fold the partitions back into a plain table."""
+    if not is_partitioned(connection, table):
+        return
+    partitioned = f'{table}_partitioned'
+    with connection.cursor() as cursor:
+        index_definitions, foreign_keys = _dependent_definitions(cursor, table)
+
+        cursor.execute(f'DROP VIEW IF EXISTS "{ARCHIVE_SCHEMA}"."{history_view_name(table)}"')
+        cursor.execute(f'ALTER TABLE "{table}" RENAME TO "{partitioned}"')
+        cursor.execute(f'CREATE TABLE "{table}" (LIKE "{partitioned}" INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY)')
+        cursor.execute(f'INSERT INTO "{table}" SELECT * FROM "{partitioned}"')
+        cursor.execute(f'DROP TABLE "{partitioned}" CASCADE')
+        cursor.execute(f'ALTER TABLE "{table}" ADD PRIMARY KEY ("id")')
+        _restore_definitions(cursor, table, index_definitions, foreign_keys)
+
+
+def refresh_history_view(connection, table):
+    """(Re)create archive.<table>_history as the live table plus every archived partition still in the database."""
+    selects = [f'SELECT * FROM public."{table}"'] + [
+        f'SELECT * FROM "{ARCHIVE_SCHEMA}"."{name}"' for name in list_archived(connection, table)
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}"')
+        cursor.execute(f'DROP VIEW IF EXISTS "{ARCHIVE_SCHEMA}"."{history_view_name(table)}"')
+        cursor.execute(f'CREATE VIEW "{ARCHIVE_SCHEMA}"."{history_view_name(table)}" AS ' + ' UNION ALL '.join(selects))
+
+
+def copy_to(cursor, sql, handle):
+    """Stream a COPY ... TO STDOUT into `handle` with psycopg 3, or psycopg2 as a fallback."""
+    raw = cursor.cursor
+    if hasattr(raw, 'copy_expert'):
+        raw.copy_expert(sql, handle)
+        return
+    with raw.copy(sql) as copy:
+        for data in copy:
+            handle.write(data)
+
+
+def archive_partition(connection, table, name, export_path=None, drop=False):
+    """
+    Detach partition `name` from `table` and move it to the archive schema,
+    optionally exporting it to a gzip-compressed CSV at `export_path` and
+    dropping it once exported.
+    """
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f'CREATE SCHEMA IF NOT EXISTS "{ARCHIVE_SCHEMA}"')
+        cursor.execute(f'DROP VIEW IF EXISTS "{ARCHIVE_SCHEMA}"."{history_view_name(table)}"')
+        cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{name}"')
+        cursor.execute(f'ALTER TABLE "{name}" SET SCHEMA "{ARCHIVE_SCHEMA}"')
+        if export_path:
+            with gzip.open(export_path, 'wb') as handle:
+                copy_to(cursor, f'COPY "{ARCHIVE_SCHEMA}"."{name}" TO STDOUT WITH (FORMAT csv, HEADER)', handle)
+            if drop:
+                cursor.execute(f'DROP TABLE "{ARCHIVE_SCHEMA}"."{name}"')
+        refresh_history_view(connection, table)
@@ -0,0 +1,91 @@
+import random
+from datetime import date, timedelta
+from functools import cache
+
+from django.conf import settings
+
+from benchmarks.generator import CITIES, FIRST_NAMES, LAST_NAMES
+from benchmarks.registry import benchmark
+from patients.chart import build_chart, get_chart
+from patients.dedup import PatientRecord, find_duplicates
+from patients.models import Patient
+
+DEDUP_PATIENTS = 500_000
+DEDUP_DUPLICATE_SHARE = 0.02
+
+
+def pick_name_prefix(ctx):
+    patient = ctx.pick(Patient.objects.all())
+    return (patient.last_name[:3], patient.first_name[:2])
+
+
+@benchmark('patients.search', setup=pick_name_prefix)
+def search(ctx, last_name, first_name):
+    list(
+        Patient.objects.filter(last_name__startswith=last_name, first_name__startswith=first_name)
+        .order_by('last_name', 'first_name')[:25]
+    )
+
+
+def pick_patient_id(ctx):
+    return (ctx.pick_pk(Patient.objects.all()),)
+
+
+def pick_cached_patient_id(ctx):
+    patient_id = ctx.pick_pk(Patient.objects.all())
+    get_chart(patient_id)
+    return (patient_id,)
+
+
+@benchmark('patients.chart_build', setup=pick_patient_id)
+def chart_build(ctx, patient_id):
+    build_chart(patient_id)
+
+
+@benchmark('patients.chart_cached', setup=pick_cached_patient_id)
+def chart_cached(ctx, patient_id):
+    get_chart(patient_id)
+
+
+def misspell(rng, name):
+    i = rng.randrange(len(name) - 1)
+    return rng.choice([
+        name[:i] + name[i + 1:],
+        name[:i] + name[i] + name[i:],
+        name[:i] + name[i + 1] + name[i] + name[i + 2:],
+    ])
+
+
+@cache
+def synthetic_records(count=DEDUP_PATIENTS, seed=0):
+    """
+    `count` in-memory patients drawn like generate_synthetic_data's, a share
+    of whom are registered a second time with a misspelled name.
+    """
+    rng = random.Random(seed)
+    sexes, regions = list(Patient.SexEnum), list(Patient.RegionEnum)
+    records = []
+    while len(records) < count:
+        record = PatientRecord(
+            len(records) + 1, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+            date(2026, 1, 1) - timedelta(days=rng.randint(365, 90 * 365)),
+            rng.choice(sexes), rng.choice(regions), rng.choice(CITIES),
+        )
+        records.append(record)
+        if rng.random() < DEDUP_DUPLICATE_SHARE:
+            records.append(record._replace(
+                id=len(records) + 1,
+                first_name=misspell(rng, record.first_name),
+                last_name=misspell(rng, record.last_name) if rng.random() < 0.5 else record.last_name,
+            ))
+    return records
+
+
+@benchmark('patients.dedup_500k', repeat=3)
+def dedup(ctx):
+    find_duplicates(synthetic_records(), workers=settings.DEDUP_WORKERS)
+
+
+@benchmark('patients.dedup_500k_serial', repeat=3)
+def dedup_serial(ctx):
+    find_duplicates(synthetic_records(), workers=1)
@@ -0,0 +1,125 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from lab_results.models import Result
+from monitoring.metrics import PATIENT_CHART_CACHE
+from patients.models import Patient
+from physical_exams.models import PhysicalExam
+from prescriptions.models import Medication
+from visits.models import Visit
+from vital_signs.models import VitalSign
+
+PATIENT_FIELDS = ['id', 'first_name', 'last_name', 'date_of_birth', 'sex', 'weight', 'height', 'region', 'city']
+VISIT_FIELDS = ['id', 'created_at', 'visit_category', 'visit_status', 'chief_complaint']
+VITAL_SIGN_FIELDS = [
+    'visit_id', 'created_at', 'bp_systolic', 'bp_diastolic', 'pulse_rate', 'respiratory_rate',
+    'temperature', 'temperature_unit', 'weight', 'weight_unit', 'height', 'height_unit', 'spo2', 'notes',
+]
+PHYSICAL_EXAM_FIELDS = [
+    'visit_id', 'created_at', 'heent', 'chest', 'cardiovascular', 'abdomen', 'musculoskeletal',
+    'genitourinary', 'cns', 'miscellaneous',
+]
+RESULT_FIELDS = [
+    'lab_result__visit_id', 'lab_result_id', 'created_at', 'test__name', 'test__test_type',
+    'test__unit_of_measurement', 'test__reference_min', 'test__reference_max', 'value_numeric',
+    'value_categorical', 'notes',
+]
+MEDICATION_FIELDS = [
+    'prescription__visit_id', 'prescription_id', 'created_at', 'name', 'strength', 'route', 'frequency', 'days', 'notes',
+]
+
+
+def version_key(patient_id):
+    return f'patient-chart:version:{patient_id}'
+
+
+def chart_key(patient_id, version):
+    return f'patient-chart:{patient_id}:{version}'
+
+
+def build_chart(patient_id, visits=None):
+    """
+    Read a patient's chart with one values() query per clinical table: the
+    patient, their latest `visits` visits and the active vital signs,
+    physical exams, lab results and medications of those visits. Returns
+    None for an unknown or inactive patient.
+    """
+    patient = Patient.objects.filter(pk=patient_id).values(*PATIENT_FIELDS).first()
+    if patient is None:
+        return None
+    chart_visits = list(
+        Visit.objects.filter(patient_id=patient_id)
+        .order_by('-created_at')
+        .values(*VISIT_FIELDS)[:visits or settings.PATIENT_CHART_VISITS]
+    )
+    by_visit = {visit['id']: visit for visit in chart_visits}
+    for visit in chart_visits:
+        visit.update(vital_signs=[], physical_exams=[], results=[], medications=[])
+
+    sections = [
+        ('vital_signs', 'visit_id', VitalSign.objects.filter(visit_id__in=by_visit), VITAL_SIGN_FIELDS),
+        ('physical_exams', 'visit_id', PhysicalExam.objects.filter(visit_id__in=by_visit), PHYSICAL_EXAM_FIELDS),
+        (
+            'results', 'lab_result__visit_id',
+            Result.objects.filter(lab_result__visit_id__in=by_visit, lab_result__is_active=True),
+            RESULT_FIELDS,
+        ),
+        (
+            'medications', 'prescription__visit_id',
+            Medication.objects.filter(prescription__visit_id__in=by_visit, prescription__is_active=True),
+            MEDICATION_FIELDS,
+        ),
+    ]
+    for section, visit_field, queryset, fields in sections:
+        for row in queryset.order_by('created_at').values(*fields):
+            by_visit[row.pop(visit_field)][section].append(row)
+
+    patient['visits'] = chart_visits
+    return patient
+
+
+def get_chart(patient_id):
+    """
+    Return the patient's chart from the cache, building and storing it on a
+    miss. The chart is stored under the patient's current chart version, so a
+    rebuild that races an invalidation lands under the superseded version
+    and is never served.
+    """
+    version = cache.get_or_set(version_key(patient_id), time.time_ns, timeout=None)
+    key = chart_key(patient_id, version)
+    payload = cache.get(key)
+    if payload is not None:
+        PATIENT_CHART_CACHE.inc(result='hit')
+        return json.loads(payload)
+
+    PATIENT_CHART_CACHE.inc(result='miss')
+    chart = build_chart(patient_id)
+    if chart is None:
+        return None
+    payload = json.dumps(chart, cls=DjangoJSONEncoder, separators=(',', ':'))
+    cache.set(key, payload, settings.PATIENT_CHART_CACHE_TIMEOUT)
+    return json.loads(payload)
+
+
+def bump_chart_versions(patient_ids):
+    for patient_id in patient_ids:
+        try:
+            cache.incr(version_key(patient_id))
+        except ValueError:
+            cache.set(version_key(patient_id), time.time_ns(), timeout=None)
+
+
+def invalidate_patient_charts(patient_ids):
+    """
+    Retire the cached charts of `patient_ids` once the current transaction
+    commits, so no reader can rebuild a chart from data that is about to
+    change. Bulk writes that skip model signals must call this themselves.
+    """
+    patient_ids = {patient_id for patient_id in patient_ids if patient_id is not None}
+    if patient_ids:
+        transaction.on_commit(lambda: bump_chart_versions(patient_ids))
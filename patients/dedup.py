@@ -0,0 +1,215 @@
+"""
+Duplicate patient detection.
+
+Registration is done by hand, so the same person can be registered twice
+with spelling variants of their name. Comparing every pair of patients is
+quadratic, so candidates are blocked on (date_of_birth, sex, region); only
+patients sharing a block are compared. Blocks larger than MAX_BLOCK_SIZE
+are split further on the Soundex code of the last name.
+
+Blocks are packed into batches of roughly PAIRS_PER_BATCH comparisons
+and scored in worker processes. Only patients that share a block are
+normalized. Names repeat a lot, so the normalized forms, phonetic codes
+and name similarities are memoized in each worker. A pair scores between
+0 and 1 from the Jaro-Winkler similarity of the names (either order),
+agreement of their Soundex codes, and the city.
+"""
+import re
+import unicodedata
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, combinations, repeat
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from app.rows import iter_rows
+from appointments.models import Appointment
+from audit.tracking import record_update
+from patients.chart import invalidate_patient_charts
+from patients.models import Patient
+from visits.models import Visit
+
+PAIRS_PER_BATCH = 50_000
+MAX_BLOCK_SIZE = 500
+
+RECORD_FIELDS = ['id', 'first_name', 'last_name', 'date_of_birth', 'sex', 'region', 'city']
+
+PatientRecord = namedtuple('PatientRecord', RECORD_FIELDS)
+PatientFeatures = namedtuple('PatientFeatures', ['id', 'first_name', 'last_name', 'first_code', 'last_code', 'city'])
+MergeCandidate = namedtuple('MergeCandidate', ['patient_id', 'duplicate_id', 'score'])
+MergeResult = namedtuple('MergeResult', ['patient_id', 'merged', 'visits', 'appointments'])
+
+_NOT_LETTERS = re.compile('[^a-z]')
+_SOUNDEX_CODES = {
+    letter: str(code)
+    for code, letters in enumerate(['aeiouy', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'])
+    for letter in letters
+}
+
+
+@lru_cache(maxsize=65536)
+def normalize_name(name):
+    """Lower case ASCII letters only: accents are stripped, spaces, hyphens and apostrophes dropped."""
+    return _NOT_LETTERS.sub('', unicodedata.normalize('NFKD', name or '').lower())
+
+
+@lru_cache(maxsize=65536)
+def soundex(name):
+    if not name:
+        return ''
+    codes, previous = [], _SOUNDEX_CODES.get(name[0])
+    for char in name[1:]:
+        if char in 'hw':
+            continue
+        code = _SOUNDEX_CODES.get(char)
+        if code != '0' and code != previous:
+            codes.append(code)
+        previous = code
+    return (name[0].upper() + ''.join(codes) + '000')[:4]
+
+
+@lru_cache(maxsize=262144)
+def jaro_winkler(a, b, prefix_scale=0.1):
+    if a == b:
+        return 1.0
+    if not a or not b:
+        return 0.0
+    window = max(max(len(a), len(b)) // 2 - 1, 0)
+    a_matched, b_matched = [False] * len(a), [False] * len(b)
+    matches = 0
+    for i, char in enumerate(a):
+        for j in range(max(0, i - window), min(i + window + 1, len(b))):
+            if not b_matched[j] and b[j] == char:
+                a_matched[i] = b_matched[j] = True
+                matches += 1
+                break
+    if not matches:
+        return 0.0
+
+    transpositions, j = 0, 0
+    for i, char in enumerate(a):
+        if a_matched[i]:
+            while not b_matched[j]:
+                j += 1
+            transpositions += char != b[j]
+            j += 1
+    jaro = (matches / len(a) + matches / len(b) + (matches - transpositions / 2) / matches) / 3
+
+    prefix = 0
+    for char_a, char_b in zip(a[:4], b[:4]):
+        if char_a != char_b:
+            break
+        prefix += 1
+    return jaro + prefix * prefix_scale * (1 - jaro)
+
+
+def features(record):
+    first_name, last_name = normalize_name(record.first_name), normalize_name(record.last_name)
+    return PatientFeatures(
+        record.id, first_name, last_name, soundex(first_name), soundex(last_name), normalize_name(record.city),
+    )
+
+
+def score_pair(a, b):
+    names = (jaro_winkler(a.first_name, b.first_name) + jaro_winkler(a.last_name, b.last_name)) / 2
+    swapped = (jaro_winkler(a.first_name, b.last_name) + jaro_winkler(a.last_name, b.first_name)) / 2
+    phonetic = ((a.first_code == b.first_code) + (a.last_code == b.last_code)) / 2
+    return 0.7 * max(names, swapped) + 0.2 * phonetic + 0.1 * (a.city == b.city)
+
+
+def build_blocks(records):
+    """Group records on (date_of_birth, sex, region) and return the blocks with more than one patient."""
+    blocks = defaultdict(list)
+    for record in records:
+        blocks[(record.date_of_birth, record.sex, record.region)].append(record)
+    return [block for block in blocks.values() if len(block) > 1]
+
+
+def batch_blocks(blocks, pairs_per_batch=PAIRS_PER_BATCH):
+    batch, pairs = [], 0
+    for block in blocks:
+        batch.append(block)
+        pairs += len(block) * (len(block) - 1) // 2
+        if pairs >= pairs_per_batch:
+            yield batch
+            batch, pairs = [], 0
+    if batch:
+        yield batch
+
+
+def split_block(block):
+    """Split an oversized block on the Soundex code of the last name."""
+    if len(block) <= MAX_BLOCK_SIZE:
+        return [block]
+    by_last_name = defaultdict(list)
+    for patient in block:
+        by_last_name[patient.last_code].append(patient)
+    return [sub_block for sub_block in by_last_name.values() if len(sub_block) > 1]
+
+
+def score_blocks(blocks, threshold):
+    """Score every pair within each block of PatientRecords; runs in the worker processes."""
+    candidates = []
+    for block in blocks:
+        for sub_block in split_block([features(record) for record in block]):
+            for a, b in combinations(sub_block, 2):
+                score = score_pair(a, b)
+                if score >= threshold:
+                    low, high = sorted((a.id, b.id))
+                    candidates.append(MergeCandidate(low, high, round(score, 3)))
+    return candidates
+
+
+def find_duplicates(records, workers=1, threshold=None, pairs_per_batch=PAIRS_PER_BATCH):
+    """
+    Return the merge candidates among `records` (PatientRecord tuples), best
+    match first. The older patient of each pair comes first. With
+    workers > 1 the batches are scored in that many processes.
+    """
+    threshold = settings.DEDUP_MATCH_THRESHOLD if threshold is None else threshold
+    batches = batch_blocks(build_blocks(records), pairs_per_batch)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            candidates = list(chain.from_iterable(pool.map(score_blocks, batches, repeat(threshold))))
+    else:
+        candidates = [candidate for batch in batches for candidate in score_blocks(batch, threshold)]
+    return sorted(candidates, key=lambda candidate: (-candidate.score, candidate.patient_id, candidate.duplicate_id))
+
+
+def load_records(queryset=None, chunk_size=5000):
+    queryset = Patient.objects.all() if queryset is None else queryset
+    return iter_rows(queryset, RECORD_FIELDS, row=PatientRecord, chunk_size=chunk_size)
+
+
+@transaction.atomic
+def merge_patients(patient_id, duplicate_ids):
+    """
+    Merge `duplicate_ids` into `patient_id`: their visits and appointments
+    are re-pointed in one UPDATE each and the duplicates are soft-deleted.
+    updated_at is set explicitly so the moved rows reach the sync feeds.
+    """
+    duplicate_ids = set(duplicate_ids) - {patient_id}
+    if not duplicate_ids:
+        raise ValidationError("Choose at least one other patient to merge.")
+    patient = Patient.objects.select_for_update().filter(pk=patient_id).first()
+    if patient is None:
+        raise ValidationError(f"Patient {patient_id} does not exist or is inactive.")
+    found = set(Patient.objects.select_for_update().filter(pk__in=duplicate_ids).values_list('pk', flat=True))
+    if found != duplicate_ids:
+        raise ValidationError(f"Unknown or inactive patients: {', '.join(map(str, sorted(duplicate_ids - found)))}.")
+
+    now = timezone.now()
+    # Bumping version makes a visit read before the merge fail to save over it.
+    visits = Visit.objects.filter(patient_id__in=duplicate_ids).update(
+        patient_id=patient_id, updated_at=now, version=F('version') + 1,
+    )
+    appointments = Appointment.all_objects.filter(patient_id__in=duplicate_ids).update(patient_id=patient_id, updated_at=now)
+    Patient.objects.filter(pk__in=duplicate_ids).update(is_active=False, updated_at=now)
+    record_update(Patient, sorted(duplicate_ids), {'is_active': [True, False]})
+    invalidate_patient_charts([patient_id, *duplicate_ids])
+    return MergeResult(patient_id, sorted(duplicate_ids), visits, appointments)
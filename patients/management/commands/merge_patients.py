@@ -0,0 +1,22 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from patients.dedup import merge_patients
+
+
+class Command(BaseCommand):
+    help = "Merge duplicate patients into one: their visits and appointments move to it and the duplicates are deactivated."
+
+    def add_arguments(self, parser):
+        parser.add_argument('patient_id', type=int, help="Patient to keep.")
+        parser.add_argument('duplicate_ids', type=int, nargs='+', help="Patients to merge into it.")
+
+    def handle(self, *args, **options):
+        try:
+            result = merge_patients(options['patient_id'], options['duplicate_ids'])
+        except ValidationError as error:
+            raise CommandError(' '.join(error.messages))
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged patients {', '.join(map(str, result.merged))} into {result.patient_id}: "
+            f"moved {result.visits} visits and {result.appointments} appointments."
+        ))
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['created_at'], name='patient_created_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['last_name', 'first_name'], name='patient_name_active_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='patient',
+            index=models.Index(fields=['updated_at', 'id'], name='patient_updated_idx'),
+        ),
+    ]
@@ -1,11 +1,15 @@
 from django.db import models
+from django.db.models import Q
 from django_enum import EnumField
 from django.utils import timezone
 from datetime import datetime
 
+from app.managers import ActiveManager
+from audit.tracking import Audited
+
 
 # Create your models here.
-class Patient(models.Model):
+class Patient(Audited, models.Model):
     class SexEnum(models.TextChoices):
         MALE = 'M', 'Male'
         FEMALE = 'F', 'Female'
@@ -39,6 +43,16 @@ class Patient(models.Model):
     city = models.CharField(max_length=100, help_text="City where the patient resides")
     is_active = models.BooleanField(default=True, help_text="Whether the patient is active. Used for soft deletes ")
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='patient_created_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['last_name', 'first_name'], name='patient_name_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='patient_updated_idx'),
+        ]
+
     @property
     def fullname(self):
         return f'{self.first_name} {self.last_name}'
@@ -0,0 +1,58 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from lab_results.models import LabResult, Result
+from patients.chart import invalidate_patient_charts
+from patients.models import Patient
+from physical_exams.models import PhysicalExam
+from prescriptions.models import Medication, Prescription
+from visits.models import Visit
+from vital_signs.models import VitalSign
+
+
+def patient_id_for_visit(visit_id, instance=None):
+    if visit_id is None:
+        return None
+    if instance is not None and type(instance).visit.is_cached(instance):
+        return instance.visit.patient_id
+    return Visit.objects.filter(pk=visit_id).values_list('patient_id', flat=True).first()
+
+
+@receiver(post_save, sender=Patient)
+@receiver(post_delete, sender=Patient)
+def invalidate_patient(sender, instance, **kwargs):
+    invalidate_patient_charts([instance.pk])
+
+
+@receiver(post_save, sender=Visit)
+@receiver(post_delete, sender=Visit)
+def invalidate_visit(sender, instance, **kwargs):
+    invalidate_patient_charts([instance.patient_id])
+
+
+@receiver(post_save, sender=VitalSign)
+@receiver(post_delete, sender=VitalSign)
+@receiver(post_save, sender=PhysicalExam)
+@receiver(post_delete, sender=PhysicalExam)
+@receiver(post_save, sender=LabResult)
+@receiver(post_delete, sender=LabResult)
+@receiver(post_save, sender=Prescription)
+@receiver(post_delete, sender=Prescription)
+def invalidate_visit_record(sender, instance, **kwargs):
+    invalidate_patient_charts([patient_id_for_visit(instance.visit_id, instance)])
+
+
+@receiver(post_save, sender=Result)
+@receiver(post_delete, sender=Result)
+def invalidate_result(sender, instance, **kwargs):
+    invalidate_patient_charts(
+        LabResult.all_objects.filter(pk=instance.lab_result_id).values_list('visit__patient_id', flat=True)
+    )
+
+
+@receiver(post_save, sender=Medication)
+@receiver(post_delete, sender=Medication)
+def invalidate_medication(sender, instance, **kwargs):
+    invalidate_patient_charts(
+        Prescription.all_objects.filter(pk=instance.prescription_id).values_list('visit__patient_id', flat=True)
+    )
@@ -1,3 +1,39 @@
+from datetime import date
+
 from django.test import TestCase
 
+from patients.dedup import merge_patients
+from patients.models import Patient
+from visits.models import Visit, VisitStatusConflict
+
 # Create your tests here.
+
+
+def create_patient(first_name='Test'):
+    return Patient.objects.create(
+        first_name=first_name,
+        last_name='Patient',
+        date_of_birth=date(1990, 1, 1),
+        sex=Patient.SexEnum.FEMALE,
+        region=Patient.RegionEnum.ADDIS_ABABA,
+        city='Addis Ababa',
+    )
+
+
+class MergePatientsTests(TestCase):
+    def test_moved_visits_cannot_be_saved_back_by_a_stale_copy(self):
+        patient, duplicate = create_patient(), create_patient('Tset')
+        visit = Visit.objects.create(
+            patient=duplicate, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.AWAITING_VITALS,
+        )
+        result = merge_patients(patient.pk, [duplicate.pk])
+        self.assertEqual(result.visits, 1)
+        self.assertFalse(Patient.objects.filter(pk=duplicate.pk).exists())
+
+        moved = Visit.objects.get(pk=visit.pk)
+        self.assertEqual((moved.patient_id, moved.version), (patient.pk, 2))
+        visit.chief_complaint = 'Headache'
+        with self.assertRaises(VisitStatusConflict):
+            visit.save()
+        self.assertEqual(Visit.objects.get(pk=visit.pk).patient_id, patient.pk)
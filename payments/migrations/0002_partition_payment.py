@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from partitions.postgres import partition_table, unpartition_table
+
+
+def partition_payment(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Payment = apps.get_model('payments', 'Payment')
+    partition_table(schema_editor.connection, Payment._meta.db_table, 'created_at')
+
+
+def unpartition_payment(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    Payment = apps.get_model('payments', 'Payment')
+    unpartition_table(schema_editor.connection, Payment._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_payment, unpartition_payment),
+    ]
@@ -23,4 +23,9 @@ class Payment(models.Model):
     payment_method = EnumField(PaymentMethodEnum, default=PaymentMethodEnum.CASH)
 
     visit = models.ForeignKey(Visit, on_delete=models.PROTECT, related_name='payments')
-    recorded_by = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name='recorded_payments')
\ No newline at end of file
+    recorded_by = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name='recorded_payments')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='payment_updated_idx'),
+        ]
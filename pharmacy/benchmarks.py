@@ -0,0 +1,31 @@
+from benchmarks.registry import benchmark
+from pharmacy.services import dispense, low_stock_report, on_hand, receive_stock
+from prescriptions.models import FormularyItem, Medication
+from staff.models import Staff
+
+
+def pick_stocked_medication(ctx):
+    medication = ctx.pick(Medication.objects.filter(formulary_item__isnull=False))
+    staff = ctx.pick(Staff.objects.all())
+    if on_hand(medication.formulary_item) < 100:
+        receive_stock(medication.formulary_item, 1000, staff)
+    return medication, staff
+
+
+def pick_item(ctx):
+    return (ctx.pick(FormularyItem.objects.all()),)
+
+
+@benchmark('pharmacy.dispense', setup=pick_stocked_medication)
+def dispense_medication(ctx, medication, staff):
+    dispense(medication, 10, staff)
+
+
+@benchmark('pharmacy.on_hand', setup=pick_item)
+def item_on_hand(ctx, item):
+    on_hand(item)
+
+
+@benchmark('pharmacy.low_stock')
+def low_stock(ctx):
+    low_stock_report()
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from pharmacy.services import low_stock_report
+
+
+class Command(BaseCommand):
+    help = "List active formulary items at or below their reorder level."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help="Dispensing window to report (default PHARMACY_USAGE_DAYS)")
+
+    def handle(self, *args, **options):
+        rows = low_stock_report(days=options['days'])
+        self.stdout.write(f"{'item':<40} {'on_hand':>8} {'reorder':>8} {'dispensed':>9}")
+        for row in rows:
+            name = f"{row['item__name']} {row['item__strength']}"
+            self.stdout.write(f"{name[:40]:<40} {row['on_hand']:>8} {row['reorder_level']:>8} {row['dispensed']:>9}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from pharmacy.services import take_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Checkpoint the ledger balance of every item whose stock moved since its last "
+        "snapshot, correcting stock levels that drifted from the ledger. Run periodically."
+    )
+
+    def handle(self, *args, **options):
+        report = take_snapshots()
+        self.stdout.write(f"{report.snapshots} snapshots written for {report.items} stocked items.")
+        if report.drifted:
+            self.stderr.write(f"Stock levels reset to the ledger for items: {', '.join(map(str, report.drifted))}.")
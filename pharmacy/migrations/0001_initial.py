@@ -0,0 +1,65 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:24
+
+import django.db.models.deletion
+import django_enum.fields
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('prescriptions', '0005_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockLevel',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('on_hand', models.IntegerField(default=0, help_text='Units in the dispensary; kept in step with the movement ledger')),
+                ('reorder_level', models.PositiveIntegerField(default=0, help_text='Report the item as low on stock at or below this many units')),
+                ('item', models.OneToOneField(on_delete=django.db.models.deletion.PROTECT, related_name='stock_level', to='prescriptions.formularyitem')),
+            ],
+            options={
+                'constraints': [models.CheckConstraint(condition=models.Q(('on_hand__gte', 0)), name='stocklevel_on_hand_gte_0')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('kind', django_enum.fields.EnumCharField(choices=[('RECEIPT', 'Received'), ('DISPENSE', 'Dispensed'), ('ADJUSTMENT', 'Stock count adjustment')], max_length=10)),
+                ('quantity', models.IntegerField(help_text='Units moved; negative when stock leaves the dispensary')),
+                ('note', models.TextField(blank=True)),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='prescriptions.formularyitem')),
+                ('medication', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='prescriptions.medication')),
+                ('prescription', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to='prescriptions.prescription')),
+                ('recorded_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_movements', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['item', 'id'], name='stockmovement_item_idx'), models.Index(condition=models.Q(('medication__isnull', False)), fields=['medication'], name='stockmovement_med_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('kind__in', ['RECEIPT', 'DISPENSE', 'ADJUSTMENT'])), name='pharmacy_StockMovement_kind_KindEnum')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('on_hand', models.IntegerField(help_text='Ledger balance of the item up to and including movement_id')),
+                ('movement_id', models.BigIntegerField(help_text='Last stock movement, across all items, the snapshot covers')),
+                ('item', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='stock_snapshots', to='prescriptions.formularyitem')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['movement_id'], name='stocksnapshot_movement_idx')],
+                'constraints': [models.UniqueConstraint(fields=('item', 'movement_id'), name='stocksnapshot_item_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,72 @@
+from django.db import models
+from django.db.models import Q
+from django_enum import EnumField
+
+from prescriptions.models import FormularyItem, Medication, Prescription
+from staff.models import Staff
+
+
+# Create your models here.
+class StockMovement(models.Model):
+    class KindEnum(models.TextChoices):
+        RECEIPT = 'RECEIPT', 'Received'
+        DISPENSE = 'DISPENSE', 'Dispensed'
+        ADJUSTMENT = 'ADJUSTMENT', 'Stock count adjustment'
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    kind = EnumField(KindEnum)
+    quantity = models.IntegerField(help_text="Units moved; negative when stock leaves the dispensary")
+    note = models.TextField(blank=True)
+
+    item = models.ForeignKey(FormularyItem, on_delete=models.PROTECT, related_name='stock_movements')
+    medication = models.ForeignKey(Medication, on_delete=models.PROTECT, null=True, blank=True, related_name='stock_movements')
+    prescription = models.ForeignKey(Prescription, on_delete=models.PROTECT, null=True, blank=True, related_name='stock_movements')
+    recorded_by = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name='stock_movements')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['item', 'id'], name='stockmovement_item_idx'),
+            models.Index(fields=['medication'], name='stockmovement_med_idx', condition=Q(medication__isnull=False)),
+        ]
+
+    def __str__(self):
+        return f"{self.kind.label} {self.quantity} x {self.item_id}"
+
+
+class StockLevel(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    on_hand = models.IntegerField(default=0, help_text="Units in the dispensary; kept in step with the movement ledger")
+    reorder_level = models.PositiveIntegerField(default=0, help_text="Report the item as low on stock at or below this many units")
+
+    item = models.OneToOneField(FormularyItem, on_delete=models.PROTECT, related_name='stock_level')
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=Q(on_hand__gte=0), name='stocklevel_on_hand_gte_0'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.on_hand} on hand"
+
+
+class StockSnapshot(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    on_hand = models.IntegerField(help_text="Ledger balance of the item up to and including movement_id")
+    movement_id = models.BigIntegerField(help_text="Last stock movement, across all items, the snapshot covers")
+
+    item = models.ForeignKey(FormularyItem, on_delete=models.PROTECT, related_name='stock_snapshots')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['item', 'movement_id'], name='stocksnapshot_item_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['movement_id'], name='stocksnapshot_movement_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.item_id}: {self.on_hand} at movement {self.movement_id}"
@@ -0,0 +1,157 @@
+"""
+Dispensary stock.
+
+StockMovement is the append-only ledger and the source of truth. Every
+movement also adjusts the item's StockLevel row in the same transaction,
+so the quantity on hand is read from one row. Dispensing decrements that
+row with a conditional UPDATE that only matches while enough stock is
+left. Two pharmacists dispensing the last units concurrently therefore
+cannot both succeed, and no lock is taken before the write.
+
+take_snapshots() checkpoints the ledger balance of every item. Checking
+or rebuilding a StockLevel from the ledger then reads one snapshot and
+the movements after it, not the item's whole history.
+"""
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from pharmacy.models import StockLevel, StockMovement, StockSnapshot
+
+SnapshotReport = namedtuple('SnapshotReport', ['items', 'snapshots', 'drifted'])
+
+
+def change_level(item_id, quantity):
+    levels = StockLevel.objects.filter(item_id=item_id)
+    if quantity < 0:
+        levels = levels.filter(on_hand__gte=-quantity)
+    return levels.update(on_hand=F('on_hand') + quantity, updated_at=timezone.now())
+
+
+def on_hand(item):
+    return StockLevel.objects.filter(item=item).values_list('on_hand', flat=True).first() or 0
+
+
+def receive_stock(item, quantity, recorded_by, note=''):
+    if quantity <= 0:
+        raise ValidationError("Received quantity must be positive.")
+    # The level row is committed before the movement is written, so a
+    # concurrent take_snapshots() always sees and locks it.
+    StockLevel.objects.get_or_create(item=item)
+    with transaction.atomic():
+        change_level(item.pk, quantity)
+        return StockMovement.objects.create(
+            item=item, kind=StockMovement.KindEnum.RECEIPT, quantity=quantity, recorded_by=recorded_by, note=note,
+        )
+
+
+def dispense(medication, quantity, dispensed_by, note=''):
+    """
+    Dispense `quantity` units of a prescribed medication from the stock of
+    its formulary item. Raises ValidationError when the medication is not
+    on the formulary or fewer than `quantity` units are on hand.
+    """
+    if quantity <= 0:
+        raise ValidationError("Dispensed quantity must be positive.")
+    if medication.formulary_item_id is None:
+        raise ValidationError(f"{medication.name} is not on the formulary; there is no stock to dispense from.")
+    with transaction.atomic():
+        if not change_level(medication.formulary_item_id, -quantity):
+            raise ValidationError(f"Not enough {medication.name} {medication.strength} on hand to dispense {quantity}.")
+        return StockMovement.objects.create(
+            item_id=medication.formulary_item_id,
+            kind=StockMovement.KindEnum.DISPENSE,
+            quantity=-quantity,
+            medication=medication,
+            prescription_id=medication.prescription_id,
+            recorded_by=dispensed_by,
+            note=note,
+        )
+
+
+def adjust_stock(item, counted, recorded_by, note=''):
+    """Record a stock count of `item`; returns the adjusting movement, or None when the count matched."""
+    if counted < 0:
+        raise ValidationError("Counted quantity cannot be negative.")
+    StockLevel.objects.get_or_create(item=item)
+    with transaction.atomic():
+        level = StockLevel.objects.select_for_update().get(item=item)
+        difference = counted - level.on_hand
+        if not difference:
+            return None
+        change_level(item.pk, difference)
+        return StockMovement.objects.create(
+            item=item, kind=StockMovement.KindEnum.ADJUSTMENT, quantity=difference, recorded_by=recorded_by, note=note,
+        )
+
+
+def latest_snapshot_id():
+    return StockSnapshot.objects.filter(item=OuterRef('item')).order_by('-movement_id').values('movement_id')[:1]
+
+
+def ledger_balance(item):
+    """On-hand quantity of `item` according to the ledger: its latest snapshot plus the movements after it."""
+    snapshot = StockSnapshot.objects.filter(item=item).order_by('-movement_id').first()
+    start, balance = (snapshot.movement_id, snapshot.on_hand) if snapshot else (0, 0)
+    tail = StockMovement.objects.filter(item=item, id__gt=start).aggregate(total=Sum('quantity'))['total']
+    return balance + (tail or 0)
+
+
+@transaction.atomic
+def take_snapshots():
+    """
+    Checkpoint the ledger balance of every stocked item whose stock moved
+    since its last snapshot. The StockLevel rows are locked first, so no
+    movement of those items is in flight while their tails are summed.
+    A level that disagrees with the ledger is reset to the ledger balance
+    and reported as drifted.
+    """
+    levels = {level.item_id: level.on_hand for level in StockLevel.objects.select_for_update().order_by('item_id')}
+    previous = {
+        snapshot.item_id: snapshot
+        for snapshot in StockSnapshot.objects.filter(movement_id=Subquery(latest_snapshot_id()))
+    }
+    since = min((snapshot.movement_id for snapshot in previous.values()), default=0)
+    tails = {
+        row['item']: row
+        for row in StockMovement.objects.filter(id__gt=since, item__in=levels)
+        .filter(id__gt=Coalesce(Subquery(latest_snapshot_id()), Value(0)))
+        .values('item').annotate(total=Sum('quantity'), last=Max('id'))
+    }
+
+    snapshots, drifted = [], []
+    for item_id, level_on_hand in levels.items():
+        snapshot, tail = previous.get(item_id), tails.get(item_id)
+        if tail is None:
+            continue
+        balance = (snapshot.on_hand if snapshot else 0) + tail['total']
+        snapshots.append(StockSnapshot(item_id=item_id, on_hand=balance, movement_id=tail['last']))
+        if balance != level_on_hand:
+            drifted.append(item_id)
+            StockLevel.objects.filter(item_id=item_id).update(on_hand=balance, updated_at=timezone.now())
+    StockSnapshot.objects.bulk_create(snapshots)
+    return SnapshotReport(len(levels), len(snapshots), drifted)
+
+
+def low_stock_report(days=None):
+    """
+    Active formulary items at or below their reorder level, emptiest first,
+    with the units dispensed over the last `days` days; one query.
+    """
+    since = timezone.now() - timedelta(days=days or settings.PHARMACY_USAGE_DAYS)
+    dispensed = (
+        StockMovement.objects.filter(item=OuterRef('item'), kind=StockMovement.KindEnum.DISPENSE, created_at__gte=since)
+        .values('item').annotate(total=Sum(-F('quantity'))).values('total')
+    )
+    return list(
+        StockLevel.objects.filter(on_hand__lte=F('reorder_level'), item__is_active=True)
+        .annotate(dispensed=Coalesce(Subquery(dispensed), Value(0)))
+        .order_by('on_hand', 'item__name')
+        .values('item_id', 'item__name', 'item__strength', 'on_hand', 'reorder_level', 'dispensed')
+    )
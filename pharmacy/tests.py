@@ -0,0 +1,131 @@
+import threading
+from datetime import date
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from patients.models import Patient
+from pharmacy.models import StockLevel, StockMovement, StockSnapshot
+from pharmacy.services import adjust_stock, dispense, ledger_balance, on_hand, receive_stock, take_snapshots
+from prescriptions.models import FormularyItem, Medication, Prescription
+from staff.models import Staff
+from visits.models import Visit
+
+# Create your tests here.
+
+
+def create_stock(quantity):
+    """A staff member, a formulary item with `quantity` units received and a medication prescribed from it."""
+    staff = Staff.objects.create_user(username='pharmacy', role=Staff.RoleEnum.NURSE)
+    patient = Patient.objects.create(
+        first_name='Test',
+        last_name='Patient',
+        date_of_birth=date(1990, 1, 1),
+        sex=Patient.SexEnum.FEMALE,
+        region=Patient.RegionEnum.ADDIS_ABABA,
+        city='Addis Ababa',
+    )
+    visit = Visit.objects.create(
+        patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=Visit.VisitStatusEnum.COMPLETED,
+    )
+    item = FormularyItem.objects.create(name='Amoxicillin', strength='500mg capsule')
+    prescription = Prescription.objects.create(prescribed_by=staff, visit=visit)
+    medication = Medication.objects.create(
+        name=item.name, strength=item.strength, route=Medication.RouteEnum.ORAL, frequency=Medication.FrequencyEnum.TID,
+        days=5, prescribed_by=staff, prescription=prescription, formulary_item=item,
+    )
+    receive_stock(item, quantity, staff)
+    return staff, item, medication
+
+
+class StockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff, cls.item, cls.medication = create_stock(20)
+
+    def test_dispense_needs_enough_stock(self):
+        dispense(self.medication, 15, self.staff)
+        with self.assertRaises(ValidationError):
+            dispense(self.medication, 6, self.staff)
+        self.assertEqual(on_hand(self.item), 5)
+        self.assertEqual(StockMovement.objects.filter(kind=StockMovement.KindEnum.DISPENSE).count(), 1)
+        dispense(self.medication, 5, self.staff)
+        self.assertEqual(on_hand(self.item), 0)
+
+    def test_level_cannot_go_negative(self):
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            StockLevel.objects.filter(item=self.item).update(on_hand=-1)
+
+    def test_adjust_stock_records_the_difference(self):
+        self.assertEqual(adjust_stock(self.item, 17, self.staff).quantity, -3)
+        self.assertIsNone(adjust_stock(self.item, 17, self.staff))
+        self.assertEqual((on_hand(self.item), ledger_balance(self.item)), (17, 17))
+
+    def test_snapshot_matches_the_level(self):
+        dispense(self.medication, 4, self.staff)
+        report = take_snapshots()
+        self.assertEqual((report.snapshots, report.drifted), (1, []))
+        self.assertEqual(StockSnapshot.objects.get(item=self.item).on_hand, 16)
+
+        dispense(self.medication, 6, self.staff)
+        receive_stock(self.item, 2, self.staff)
+        self.assertEqual(ledger_balance(self.item), on_hand(self.item))
+        self.assertEqual(ledger_balance(self.item), 12)
+        # Nothing moved since the last snapshot.
+        take_snapshots()
+        self.assertEqual(take_snapshots().snapshots, 0)
+
+    def test_snapshot_resets_a_drifted_level(self):
+        StockLevel.objects.filter(item=self.item).update(on_hand=50)
+        dispense(self.medication, 5, self.staff)
+        report = take_snapshots()
+        self.assertEqual(report.drifted, [self.item.pk])
+        self.assertEqual(on_hand(self.item), 15)
+        self.assertEqual(ledger_balance(self.item), 15)
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class StockContentionTests(TransactionTestCase):
+    """Pharmacists changing the stock of one item at the same time."""
+    threads = 8
+
+    def race(self, *attempts):
+        barrier = threading.Barrier(len(attempts))
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker(attempt):
+            try:
+                barrier.wait()
+                try:
+                    attempt()
+                    outcome = 'applied'
+                except ValidationError:
+                    outcome = 'rejected'
+                except Exception as exc:
+                    outcome = repr(exc)
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker, args=(attempt,)) for attempt in attempts]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return sorted(outcomes)
+
+    def test_last_units_are_dispensed_once(self):
+        staff, item, medication = create_stock(3)
+        outcomes = self.race(*[lambda: dispense(medication, 2, staff)] * self.threads)
+        self.assertEqual(outcomes, ['applied'] + ['rejected'] * (self.threads - 1))
+        self.assertEqual((on_hand(item), ledger_balance(item)), (1, 1))
+
+    def test_count_and_dispensing_agree_with_the_ledger(self):
+        staff, item, medication = create_stock(40)
+        attempts = [lambda: dispense(medication, 1, staff)] * (self.threads - 1) + [lambda: adjust_stock(item, 30, staff)]
+        self.assertEqual(self.race(*attempts), ['applied'] * self.threads)
+        self.assertEqual(on_hand(item), ledger_balance(item))
+        self.assertEqual(take_snapshots().drifted, [])
@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('physical_exams', '0003_active_partial_indexes'),
+        ('visits', '0006_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='physicalexam',
+            index=models.Index(fields=['updated_at', 'id'], name='physexam_updated_idx'),
+        ),
+    ]
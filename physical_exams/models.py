@@ -1,4 +1,7 @@
 from django.db import models
+from django.db.models import Q
+
+from app.managers import ActiveManager
 
 from patients.models import Patient
 from staff.models import Staff
@@ -32,5 +35,14 @@ class PhysicalExam(models.Model):
         related_name="physical_exams"
     )
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['visit', 'created_at'], name='physexam_visit_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='physexam_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Patient {self.visit.patient.fullname} physical exam: {self.examined_by.username}"
\ No newline at end of file
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PrescriptionsConfig(AppConfig):
     name = 'prescriptions'
+
+    def ready(self):
+        from prescriptions import signals  # noqa: F401
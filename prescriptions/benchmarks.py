@@ -0,0 +1,21 @@
+from benchmarks.registry import benchmark
+from prescriptions.models import FormularyItem, Medication, Prescription
+from prescriptions.services import patients_on_medication
+
+
+def pick_formulary_name(ctx):
+    return (ctx.pick(FormularyItem.objects.all()).name,)
+
+
+def pick_prescription(ctx):
+    return (ctx.pick_pk(Prescription.objects.all()),)
+
+
+@benchmark('prescriptions.patients_on_medication', setup=pick_formulary_name)
+def on_medication(ctx, name):
+    list(patients_on_medication(name))
+
+
+@benchmark('prescriptions.dosage', setup=pick_prescription)
+def dosage(ctx, prescription_id):
+    list(Medication.objects.with_dosage().filter(prescription_id=prescription_id))
@@ -0,0 +1,97 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import namedtuple
+
+from django.core.cache import cache
+
+FormularyEntry = namedtuple('FormularyEntry', ['id', 'name', 'strength', 'route'])
+
+VERSION_CACHE_KEY = 'formulary:version'
+
+
+def normalize(text):
+    return ' '.join(text.casefold().split())
+
+
+class FormularyIndex:
+    """
+    Sorted in-memory prefix index over the formulary.
+
+    Every word of an item's name is a key, so "amox" finds both "Amoxicillin"
+    and "Co-amoxiclav"; a lookup is two binary searches plus a slice of the
+    matching range.
+    """
+
+    def __init__(self, entries):
+        keyed = []
+        for entry in entries:
+            name = normalize(entry.name)
+            tokens = {name, *name.replace('-', ' ').split()}
+            keyed.extend((token, name, normalize(entry.strength), entry) for token in tokens)
+        keyed.sort(key=lambda row: row[:3])
+        self._keys = [row[0] for row in keyed]
+        self._entries = [row[3] for row in keyed]
+
+    def __len__(self):
+        return len(set(entry.id for entry in self._entries))
+
+    def search(self, prefix, limit=10):
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + '\uffff', lo=start)
+        results = []
+        seen = set()
+        for position in range(start, end):
+            entry = self._entries[position]
+            if entry.id in seen:
+                continue
+            seen.add(entry.id)
+            results.append(entry)
+            if len(results) == limit:
+                break
+        return results
+
+
+_lock = threading.Lock()
+_index = None
+_index_version = None
+
+
+def load_entries():
+    from prescriptions.models import FormularyItem
+
+    return [
+        FormularyEntry(*row)
+        for row in FormularyItem.objects.values_list('id', 'name', 'strength', 'route').iterator()
+    ]
+
+
+def get_index():
+    """
+    Return this process's formulary index, rebuilding it when the formulary
+    version in the cache has been bumped. Other processes only see the bump
+    through a shared cache (REDIS_URL); with the default local-memory cache
+    an edit only reaches the index of the process that made it.
+    """
+    global _index, _index_version
+    version = cache.get_or_set(VERSION_CACHE_KEY, time.time_ns, timeout=None)
+    if _index is None or _index_version != version:
+        with _lock:
+            if _index is None or _index_version != version:
+                _index = FormularyIndex(load_entries())
+                _index_version = version
+    return _index
+
+
+def invalidate():
+    try:
+        cache.incr(VERSION_CACHE_KEY)
+    except ValueError:
+        cache.set(VERSION_CACHE_KEY, time.time_ns(), timeout=None)
+
+
+def autocomplete(prefix, limit=10):
+    return get_index().search(prefix, limit=limit)
@@ -0,0 +1,55 @@
+import random
+import statistics
+import string
+import time
+
+from django.core.management.base import BaseCommand
+
+from prescriptions.formulary import FormularyEntry, FormularyIndex
+
+
+STEMS = ['amox', 'cipro', 'metro', 'para', 'ibu', 'azithro', 'doxy', 'ceft', 'omep', 'metf', 'amlo', 'losar']
+SUFFIXES = ['icillin', 'floxacin', 'nidazole', 'cetamol', 'profen', 'mycin', 'cycline', 'riaxone', 'razole', 'ormin', 'dipine', 'tan']
+STRENGTHS = ['5mg', '10mg', '25mg', '50mg', '100mg', '250mg', '500mg', '1g', '125mg/5ml', '250mg/5ml']
+ROUTES = ['PO', 'IV', 'IM', 'TOP']
+
+
+class Command(BaseCommand):
+    help = "Benchmark formulary autocomplete over a synthetic in-memory formulary."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=50_000)
+        parser.add_argument('--lookups', type=int, default=10_000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        entries = [
+            FormularyEntry(
+                i,
+                f"{rng.choice(STEMS)}{rng.choice(SUFFIXES)} {''.join(rng.choices(string.ascii_lowercase, k=4))}",
+                rng.choice(STRENGTHS),
+                rng.choice(ROUTES),
+            )
+            for i in range(options['items'])
+        ]
+
+        started = time.perf_counter()
+        index = FormularyIndex(entries)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        prefixes = [entry.name[:rng.randint(1, 6)] for entry in rng.choices(entries, k=options['lookups'])]
+        timings = []
+        for prefix in prefixes:
+            started = time.perf_counter()
+            index.search(prefix)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+
+        self.stdout.write(f"items: {options['items']}  build: {build_ms:.1f} ms")
+        self.stdout.write(
+            f"autocomplete over {len(timings)} lookups: "
+            f"mean {statistics.fmean(timings):.1f} us | "
+            f"p50 {timings[len(timings) // 2]:.1f} us | "
+            f"p99 {timings[int(len(timings) * 0.99)]:.1f} us"
+        )
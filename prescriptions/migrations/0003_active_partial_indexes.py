@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prescriptions', '0002_remove_medication_patient_and_more'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['prescription', 'created_at'], name='medication_rx_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='prescription',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['visit', 'created_at'], name='prescription_visit_active_idx'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:41
+
+import django.db.models.deletion
+import django_enum.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prescriptions', '0003_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FormularyItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(help_text='Generic or brand name of the drug', max_length=200)),
+                ('strength', models.CharField(help_text='Strength and dosage form, e.g. 500mg tablet', max_length=200)),
+                ('route', django_enum.fields.EnumCharField(choices=[('PO', 'Orally'), ('IV', 'Intravenous'), ('IM', 'Intramuscular'), ('SUBC', 'Subcutaneous'), ('TOP', 'Topical'), ('INHALATION', 'Inhalation'), ('OPH', 'Ophthalmic'), ('OTIC', 'Otic'), ('RECTAL', 'Rectal'), ('SUBLINGUAL', 'Sublingual'), ('OTHER', 'Other')], default='PO', max_length=10)),
+                ('is_active', models.BooleanField(default=True, help_text='Whether the item can still be prescribed')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['name', 'strength'], name='formulary_name_active_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('route__in', ['PO', 'IV', 'IM', 'SUBC', 'TOP', 'INHALATION', 'OPH', 'OTIC', 'RECTAL', 'SUBLINGUAL', 'OTHER'])), name='prescriptions_FormularyItem_route_RouteEnum')],
+            },
+        ),
+        migrations.AddField(
+            model_name='medication',
+            name='formulary_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='medications', to='prescriptions.formularyitem'),
+        ),
+    ]
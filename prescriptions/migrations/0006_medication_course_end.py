@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:26
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_course_end_date(apps, schema_editor):
+    Medication = apps.get_model('prescriptions', 'Medication')
+    medications = Medication.objects.using(schema_editor.connection.alias)
+    batch = []
+    for pk, created_at, frequency, days in medications.values_list('pk', 'created_at', 'frequency', 'days').iterator(chunk_size=2000):
+        start = timezone.localdate(created_at)
+        end = start if frequency == 'STAT' or days < 1 else start + timedelta(days=days - 1)
+        batch.append(Medication(pk=pk, course_end_date=end))
+        if len(batch) == 2000:
+            medications.bulk_update(batch, ['course_end_date'])
+            batch = []
+    medications.bulk_update(batch, ['course_end_date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('prescriptions', '0005_sync_feed_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='medication',
+            name='course_end_date',
+            field=models.DateField(blank=True, editable=False, help_text='Last day of the course, derived from created_at, frequency and days', null=True),
+        ),
+        migrations.RunPython(backfill_course_end_date, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='medication',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'course_end_date'], name='medication_course_end_idx'),
+        ),
+    ]
@@ -1,14 +1,21 @@
+from datetime import timedelta
+
 from django.contrib.auth.models import User
 from django.db import models
+from django.db.models import Case, F, FloatField, IntegerField, Q, Value, When
+from django.utils import timezone
 from django_enum import EnumField
 
+from app.managers import ActiveManager, ActiveQuerySet
+from audit.tracking import Action, Audited, record_bulk
+
 from patients.models import Patient
 from staff.models import Staff
 from visits.models import Visit
 
 
 # Create your models here.
-class Prescription(models.Model):
+class Prescription(Audited, models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -18,10 +25,52 @@ class Prescription(models.Model):
     prescribed_by = models.ForeignKey(Staff, on_delete=models.PROTECT)
     visit = models.ForeignKey(Visit, on_delete=models.PROTECT)
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['visit', 'created_at'], name='prescription_visit_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='prescription_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Patient {self.visit.patient.fullname} prescription {self.id}: prescribed by: {self.prescribed_by.username}"
 
-class Medication(models.Model):
+class MedicationQuerySet(ActiveQuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for medication in objs:
+            medication.set_course_end_date()
+        created = super().bulk_create(objs, *args, **kwargs)
+        record_bulk(created, Action.UPSERT if kwargs.get('update_conflicts') else Action.CREATE, using=self.db)
+        return created
+
+    def with_dosage(self):
+        """
+        Annotate doses_per_day and total_units, the units to dispense for the
+        whole course, computed in SQL from frequency and days. Both are NULL
+        for PRN medications; a STAT order is a single unit.
+        """
+        return self.annotate(
+            doses_per_day=Case(
+                *[When(frequency=frequency, then=Value(doses_per_week / 7)) for frequency, doses_per_week in DOSES_PER_WEEK.items()],
+                output_field=FloatField(),
+            ),
+            # Integer ceil(days * doses_per_week / 7), exact on every database.
+            total_units=Case(
+                *[When(frequency=frequency, then=(F('days') * doses_per_week + 6) / 7) for frequency, doses_per_week in DOSES_PER_WEEK.items()],
+                When(frequency=Medication.FrequencyEnum.STAT, then=Value(1)),
+                output_field=IntegerField(),
+            ),
+        )
+
+    def current(self, on=None):
+        """Medications whose course has not ended on `on` (today by default)."""
+        return self.filter(course_end_date__gte=on or timezone.localdate())
+
+
+class Medication(Audited, models.Model):
     class RouteEnum(models.TextChoices):
         ORAL = 'PO', 'Orally'
         INTRAVENOUS = 'IV', 'Intravenous'
@@ -52,11 +101,73 @@ class Medication(models.Model):
     route = EnumField(RouteEnum)
     frequency = EnumField(FrequencyEnum)
     days = models.IntegerField()
+    course_end_date = models.DateField(null=True, blank=True, editable=False, help_text="Last day of the course, derived from created_at, frequency and days")
     notes = models.TextField(blank=True, null=True)
     is_active = models.BooleanField(default=True)
 
     prescribed_by = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name="prescribed_medications")
     prescription = models.ForeignKey(Prescription, on_delete=models.PROTECT, related_name="medications")
+    formulary_item = models.ForeignKey('FormularyItem', on_delete=models.PROTECT, null=True, blank=True, related_name="medications")
+
+    objects = ActiveManager.from_queryset(MedicationQuerySet)()
+    all_objects = MedicationQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['prescription', 'created_at'], name='medication_rx_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['name', 'course_end_date'], name='medication_course_end_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='medication_updated_idx'),
+        ]
+
+    def set_course_end_date(self):
+        self.course_end_date = compute_course_end(timezone.localdate(self.created_at or timezone.now()), self.frequency, self.days)
+
+    def save(self, *args, **kwargs):
+        self.set_course_end_date()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'course_end_date'}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"Patient {self.prescription.visit.patient.fullname} medication {self.name}: prescribed by: {self.prescribed_by.username}"
+
+
+# Scheduled frequencies; PRN has no fixed count and STAT is a single dose.
+DOSES_PER_WEEK = {
+    Medication.FrequencyEnum.QD: 7,
+    Medication.FrequencyEnum.BID: 14,
+    Medication.FrequencyEnum.TID: 21,
+    Medication.FrequencyEnum.QID: 28,
+    Medication.FrequencyEnum.WEEKLY: 1,
+    Medication.FrequencyEnum.BIWEEKLY: 2,
+}
+
+
+def compute_course_end(start, frequency, days):
+    """Last day of a course started on `start`: a STAT dose ends the day it is given."""
+    if frequency == Medication.FrequencyEnum.STAT or days < 1:
+        return start
+    return start + timedelta(days=days - 1)
+
+
+class FormularyItem(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    name = models.CharField(max_length=200, help_text="Generic or brand name of the drug")
+    strength = models.CharField(max_length=200, help_text="Strength and dosage form, e.g. 500mg tablet")
+    route = EnumField(Medication.RouteEnum, default=Medication.RouteEnum.ORAL)
+    is_active = models.BooleanField(default=True, help_text="Whether the item can still be prescribed")
+
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['name', 'strength'], name='formulary_name_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='formulary_updated_idx'),
+        ]
 
     def __str__(self):
-        return f"Patient {self.prescription.visit.patient.fullname} medication {self.name}: prescribed by: {self.prescribed_by.username}"
\ No newline at end of file
+        return f"{self.name} {self.strength} ({self.route})"
@@ -0,0 +1,45 @@
+from django.db import transaction
+
+from patients.models import Patient
+from prescriptions.models import Medication, Prescription
+
+
+def create_prescription(visit, prescribed_by, medications, notes=None):
+    """
+    Create a prescription with all of its medications in one transaction.
+
+    `medications` is a list of dicts with the Medication fields (name,
+    strength, route, frequency, days and optionally notes and
+    formulary_item); name, strength and route default to the formulary
+    item's when one is given. The items are written with a single
+    bulk_create.
+    """
+    with transaction.atomic():
+        prescription = Prescription.objects.create(visit=visit, prescribed_by=prescribed_by, notes=notes)
+        items = []
+        for medication in medications:
+            item = medication.get('formulary_item')
+            items.append(Medication(
+                prescription=prescription,
+                prescribed_by=prescribed_by,
+                formulary_item=item,
+                name=medication.get('name') or item.name,
+                strength=medication.get('strength') or item.strength,
+                route=medication.get('route') or item.route,
+                frequency=medication['frequency'],
+                days=medication['days'],
+                notes=medication.get('notes'),
+            ))
+        Medication.objects.bulk_create(items)
+    return prescription
+
+
+def patients_on_medication(name, on=None):
+    """
+    Patients with an active prescription of `name` whose course has not
+    ended on `on` (today by default). The medications are found through
+    medication_course_end_idx, so the cost follows the number of current
+    courses rather than the prescription history.
+    """
+    current = Medication.objects.current(on).filter(name=name, prescription__is_active=True)
+    return Patient.objects.filter(pk__in=current.values('prescription__visit__patient'))
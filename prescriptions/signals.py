@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from prescriptions import formulary
+from prescriptions.models import FormularyItem
+
+
+@receiver(post_save, sender=FormularyItem)
+@receiver(post_delete, sender=FormularyItem)
+def invalidate_formulary_index(sender, using, **kwargs):
+    # After the commit, so no process rebuilds its index before the change is visible.
+    transaction.on_commit(formulary.invalidate, using=using)
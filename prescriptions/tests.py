@@ -1,3 +1,22 @@
 from django.test import TestCase
 
+from prescriptions import formulary
+from prescriptions.models import FormularyItem
+
 # Create your tests here.
+
+
+class FormularyIndexTests(TestCase):
+    def test_index_is_invalidated_on_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            FormularyItem.objects.create(name='Amoxicillin', strength='500mg capsule')
+        self.assertEqual([entry.name for entry in formulary.autocomplete('amox')], ['Amoxicillin'])
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            FormularyItem.objects.create(name='Co-amoxiclav', strength='625mg tablet')
+            # Not before the commit: a rebuild now could miss the new item.
+            self.assertEqual(formulary.autocomplete('co-amox'), [])
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(
+            [entry.name for entry in formulary.autocomplete('amox')], ['Amoxicillin', 'Co-amoxiclav'],
+        )
@@ -0,0 +1,13 @@
+from benchmarks.registry import benchmark
+from search.index import search_notes
+
+QUERIES = ['cough', 'fever', 'abdominal pain', 'tender', 'repeat bp', 'hea']
+
+
+def pick_query(ctx):
+    return (ctx.rng.choice(QUERIES),)
+
+
+@benchmark('search.notes', setup=pick_query)
+def notes(ctx, query):
+    search_notes(query)
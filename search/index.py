@@ -0,0 +1,102 @@
+"""
+Ranked full-text search over the clinical notes kept by search.triggers.
+
+Every word of the query must match, the last one as a prefix, so results
+narrow as the user types. Hits are ranked with ts_rank_cd on PostgreSQL
+and bm25 on SQLite (higher is better on both). Each hit is then given its
+visit and patient with one query per source model among the hits.
+"""
+import re
+from collections import defaultdict, namedtuple
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+
+from search.triggers import FTS_TABLE, NOTE_TABLE, SEARCH_SOURCES, TEXT_SEARCH_CONFIG, is_supported, source_label
+
+SearchHit = namedtuple('SearchHit', [
+    'source', 'source_id', 'field', 'snippet', 'rank', 'visit_id', 'visit_created_at', 'patient_id', 'patient_name',
+])
+
+SNIPPET_WORDS = 16
+
+_WORD = re.compile(r'\w+')
+_SOURCES = {source_label(source): source for source in SEARCH_SOURCES}
+
+
+def query_terms(text):
+    return _WORD.findall(text.lower())
+
+
+def postgresql_hits(cursor, terms, limit):
+    tsquery = ' & '.join([*terms[:-1], f'{terms[-1]}:*'])
+    cursor.execute(
+        f"SELECT hit.source, hit.source_id, hit.field, "
+        f"ts_headline(%s, hit.body, query, %s), hit.rank "
+        f"FROM ("
+        f"  SELECT note.source, note.source_id, note.field, note.body, ts_rank_cd(note.document, query) AS rank, query "
+        f"  FROM {NOTE_TABLE} note, to_tsquery(%s, %s) query "
+        f"  WHERE note.document @@ query ORDER BY rank DESC, note.id LIMIT %s"
+        f") hit ORDER BY hit.rank DESC",
+        [
+            TEXT_SEARCH_CONFIG, f'StartSel=[, StopSel=], MaxWords={SNIPPET_WORDS}, MinWords=5',
+            TEXT_SEARCH_CONFIG, tsquery, limit,
+        ],
+    )
+    return cursor.fetchall()
+
+
+def sqlite_hits(cursor, terms, limit):
+    match = ' '.join([*(f'"{term}"' for term in terms[:-1]), f'"{terms[-1]}"*'])
+    cursor.execute(
+        f"SELECT note.source, note.source_id, note.field, "
+        f"snippet({FTS_TABLE}, 0, '[', ']', '…', %s), -bm25({FTS_TABLE}) AS rank "
+        f"FROM {FTS_TABLE} JOIN {NOTE_TABLE} note ON note.id = {FTS_TABLE}.rowid "
+        f"WHERE {FTS_TABLE} MATCH %s ORDER BY rank DESC LIMIT %s",
+        [SNIPPET_WORDS, match, limit],
+    )
+    return cursor.fetchall()
+
+
+def visit_context(source, source_ids, using):
+    """Map source_id -> (visit id, visit created_at, patient id, patient name) for hits of one source."""
+    model = apps.get_model(source.label)
+    prefix = f'{source.visit_path}__' if source.visit_path else ''
+    rows = model._base_manager.using(using).filter(pk__in=source_ids).values_list(
+        'pk', f'{prefix}id', f'{prefix}created_at', f'{prefix}patient_id',
+        f'{prefix}patient__first_name', f'{prefix}patient__last_name',
+    )
+    return {
+        pk: (visit_id, created_at, patient_id, f'{first_name} {last_name}' if patient_id else None)
+        for pk, visit_id, created_at, patient_id, first_name, last_name in rows
+    }
+
+
+def search_notes(text, limit=20, using='default'):
+    """
+    Return up to `limit` SearchHits for `text`, best first. Hits whose
+    record no longer exists (an archived partition, say) are dropped.
+    """
+    connection = connections[using]
+    if not is_supported(connection):
+        raise ImproperlyConfigured(f"Clinical note search is not available on {connection.vendor}.")
+    terms = query_terms(text)
+    if not terms:
+        return []
+    with connection.cursor() as cursor:
+        rows = postgresql_hits(cursor, terms, limit) if connection.vendor == 'postgresql' else sqlite_hits(cursor, terms, limit)
+
+    ids_by_source = defaultdict(set)
+    for source, source_id, *_ in rows:
+        ids_by_source[source].add(source_id)
+    contexts = {
+        source: visit_context(_SOURCES[source], source_ids, using)
+        for source, source_ids in ids_by_source.items()
+    }
+    hits = []
+    for source, source_id, field, snippet, rank in rows:
+        context = contexts[source].get(source_id)
+        if context is not None:
+            hits.append(SearchHit(source, source_id, field, snippet, rank, *context))
+    return hits
@@ -0,0 +1,76 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from search import triggers
+from search.index import search_notes
+from staff.models import Staff
+from visits.models import Visit
+from vital_signs.models import VitalSign
+
+FINDINGS = [
+    'cough', 'fever', 'headache', 'wheeze', 'crackles', 'tenderness', 'rash', 'oedema', 'pallor', 'jaundice',
+    'tachycardia', 'murmur', 'dyspnoea', 'vomiting', 'diarrhoea', 'dizziness', 'photophobia', 'palpitations',
+]
+QUALIFIERS = ['mild', 'moderate', 'severe', 'intermittent', 'persistent', 'worsening', 'improving', 'bilateral', 'left', 'right']
+SITES = ['chest', 'abdomen', 'epigastric', 'lower limbs', 'upper limbs', 'neck', 'back', 'flank', 'scalp']
+QUERIES = ['cough', 'severe headache', 'bilateral oedema lower', 'palp', 'epigastric tenderness', 'jaundice pallor']
+
+
+def make_note(rng):
+    return ' '.join(
+        f"{rng.choice(QUALIFIERS)} {rng.choice(FINDINGS)} {rng.choice(['in the', 'over the', 'of the'])} {rng.choice(SITES)}."
+        for _ in range(rng.randint(1, 3))
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert --notes vital sign notes through the search triggers, timing indexing, then time "
+        "ranked searches against the grown index. Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--notes', type=int, default=1_000_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--searches', type=int, default=50, help="Searches timed per query")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not triggers.is_supported(connection):
+            raise CommandError(f"Clinical note search is not available on {connection.vendor}.")
+        visit_ids = list(Visit.objects.values_list('pk', flat=True)[:5000])
+        staff = Staff.objects.first()
+        if not visit_ids or staff is None:
+            raise CommandError("No visits to attach notes to; generate synthetic data first.")
+        rng = random.Random(options['seed'])
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            remaining = options['notes']
+            while remaining:
+                size = min(remaining, options['batch_size'])
+                VitalSign.objects.bulk_create([
+                    VitalSign(visit_id=rng.choice(visit_ids), recorded_by=staff, pulse_rate=72, notes=make_note(rng))
+                    for _ in range(size)
+                ])
+                remaining -= size
+            seconds = time.perf_counter() - started
+            self.stdout.write(f"indexed {options['notes']} notes in {seconds:.1f}s ({options['notes'] / seconds:,.0f} notes/s)")
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+            self.stdout.write(f"{'query':<26} {'hits':>5} {'p50 ms':>8} {'p95 ms':>8}")
+            for query in QUERIES:
+                timings = []
+                for _ in range(options['searches']):
+                    started = time.perf_counter()
+                    hits = search_notes(query)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(f"{query:<26} {len(hits):>5} {statistics.median(timings):>8.2f} {p95:>8.2f}")
+            transaction.set_rollback(True)
@@ -0,0 +1,25 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+
+from search import triggers
+
+
+class Command(BaseCommand):
+    help = (
+        "Reinstall the clinical note search triggers and re-index every note from the source "
+        "tables. The triggers keep the index current; this is for recovery, e.g. after a "
+        "table was rebuilt or partitioned."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if not triggers.is_supported(connection):
+            raise CommandError(f"Clinical note search is not available on {connection.vendor}.")
+        with transaction.atomic(using=options['database']):
+            triggers.install(connection, apps)
+            notes = triggers.rebuild(connection, apps)
+        self.stdout.write(f"Indexed {notes} notes.")
@@ -0,0 +1,23 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from search.index import search_notes
+
+
+class Command(BaseCommand):
+    help = "Search the free-text clinical notes; every word must match, the last as a prefix."
+
+    def add_arguments(self, parser):
+        parser.add_argument('query', nargs='+')
+        parser.add_argument('--limit', type=int, default=20)
+
+    def handle(self, *args, **options):
+        try:
+            hits = search_notes(' '.join(options['query']), limit=options['limit'])
+        except ImproperlyConfigured as e:
+            raise CommandError(str(e)) from e
+        for hit in hits:
+            self.stdout.write(
+                f"{hit.rank:7.3f}  {hit.patient_name or '-'} (patient {hit.patient_id}, visit {hit.visit_id})  "
+                f"{hit.source}.{hit.field} {hit.source_id}: {hit.snippet}"
+            )
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClinicalNote',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(help_text='Model label of the record the text belongs to', max_length=100)),
+                ('source_id', models.IntegerField(help_text='Primary key of that record')),
+                ('field', models.CharField(help_text='Field of the record holding the text', max_length=50)),
+                ('body', models.TextField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['source', 'source_id'], name='clinicalnote_source_idx')],
+            },
+        ),
+    ]
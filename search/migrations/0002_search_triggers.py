@@ -0,0 +1,33 @@
+from django.db import migrations
+
+from search import triggers
+
+
+def install_triggers(apps, schema_editor):
+    if not triggers.is_supported(schema_editor.connection):
+        return
+    triggers.install(schema_editor.connection, apps)
+    triggers.rebuild(schema_editor.connection, apps)
+
+
+def remove_triggers(apps, schema_editor):
+    if not triggers.is_supported(schema_editor.connection):
+        return
+    triggers.uninstall(schema_editor.connection, apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        ('lab_requests', '0004_sync_feed_index'),
+        ('lab_results', '0006_sync_feed_index'),
+        ('physical_exams', '0004_sync_feed_index'),
+        ('prescriptions', '0006_medication_course_end'),
+        ('visits', '0007_visit_version'),
+        ('vital_signs', '0005_sync_feed_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_triggers, remove_triggers),
+    ]
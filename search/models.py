@@ -0,0 +1,22 @@
+from django.db import models
+
+
+# Create your models here.
+class ClinicalNote(models.Model):
+    """
+    One non-empty free-text field of a clinical record. Rows are written by
+    database triggers on the source tables (see search.triggers), never by
+    the ORM; the full-text index over `body` lives beside this table.
+    """
+    source = models.CharField(max_length=100, help_text="Model label of the record the text belongs to")
+    source_id = models.IntegerField(help_text="Primary key of that record")
+    field = models.CharField(max_length=50, help_text="Field of the record holding the text")
+    body = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['source', 'source_id'], name='clinicalnote_source_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.source_id} {self.field}"
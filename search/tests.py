@@ -0,0 +1,63 @@
+import io
+from datetime import date
+
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+
+from patients.models import Patient
+from physical_exams.models import PhysicalExam
+from search import triggers
+from search.index import search_notes
+from staff.models import Staff
+from visits.models import Visit
+
+# Create your tests here.
+
+
+class SearchNotesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = Staff.objects.create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        patient = Patient.objects.create(
+            first_name='Test',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        cls.visit = Visit.objects.create(
+            patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Visit.VisitStatusEnum.AWAITING_CONSULTATION, chief_complaint='Persistent cough',
+        )
+        cls.exam = PhysicalExam.objects.create(visit=cls.visit, examined_by=cls.doctor, chest='Bilateral wheezing')
+
+    def found(self, text):
+        return [(hit.source, hit.source_id, hit.field) for hit in search_notes(text)]
+
+    def test_finds_notes_by_prefix(self):
+        self.assertEqual(self.found('persistent cou'), [('visits.visit', self.visit.pk, 'chief_complaint')])
+        hit = search_notes('wheez')[0]
+        self.assertEqual((hit.visit_id, hit.patient_name), (self.visit.pk, 'Test Patient'))
+
+    def test_queryset_update_is_indexed(self):
+        PhysicalExam.objects.filter(pk=self.exam.pk).update(chest='Clear', abdomen='Tender epigastrium')
+        self.assertEqual(self.found('wheezing'), [])
+        self.assertEqual(self.found('epigastrium'), [('physical_exams.physicalexam', self.exam.pk, 'abdomen')])
+
+    def test_soft_deleted_rows_are_dropped(self):
+        PhysicalExam.objects.filter(pk=self.exam.pk).update(is_active=False)
+        self.assertEqual(self.found('wheezing'), [])
+        PhysicalExam.all_objects.filter(pk=self.exam.pk).update(is_active=True)
+        self.assertEqual(len(self.found('wheezing')), 1)
+
+    def test_rebuild_reinstalls_the_triggers(self):
+        triggers.uninstall(connection, apps)
+        call_command('rebuild_search_index', stdout=io.StringIO())
+        self.assertEqual(len(self.found('wheezing')), 1)
+
+        Visit.objects.filter(pk=self.visit.pk).update(chief_complaint='Fever and chills')
+        self.assertEqual(self.found('cough'), [])
+        self.assertEqual(self.found('chills'), [('visits.visit', self.visit.pk, 'chief_complaint')])
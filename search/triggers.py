@@ -0,0 +1,173 @@
+"""
+Database triggers that keep ClinicalNote, and the full-text index beside it,
+in step with the free-text fields of the clinical tables.
+
+Every insert, update and delete of a source row rewrites that row's notes
+in the same statement, so bulk_create, update(), sync and raw SQL are all
+indexed without any application code. Updates that leave the text and
+is_active untouched (status changes, mostly) do not touch the index.
+Soft-deleted rows have no notes.
+
+PostgreSQL keeps a generated tsvector column with a GIN index on the note
+table. SQLite keeps an FTS5 table whose content is the note table.
+"""
+from collections import namedtuple
+
+SearchSource = namedtuple('SearchSource', ['label', 'fields', 'visit_path'])
+
+# Free-text fields indexed per model, with the lookup from the model to its visit.
+SEARCH_SOURCES = [
+    SearchSource('visits.Visit', ['chief_complaint'], ''),
+    SearchSource(
+        'physical_exams.PhysicalExam',
+        ['heent', 'chest', 'cardiovascular', 'abdomen', 'musculoskeletal', 'genitourinary', 'cns', 'miscellaneous'],
+        'visit',
+    ),
+    SearchSource('vital_signs.VitalSign', ['notes'], 'visit'),
+    SearchSource('lab_results.Result', ['notes'], 'lab_result__visit'),
+    SearchSource('lab_requests.LabRequestTest', ['notes'], 'lab_request__visit'),
+    SearchSource('prescriptions.Medication', ['notes'], 'prescription__visit'),
+]
+
+# Text search configuration of the PostgreSQL index; queries must use the same one.
+TEXT_SEARCH_CONFIG = 'english'
+
+NOTE_TABLE = 'search_clinicalnote'
+FTS_TABLE = f'{NOTE_TABLE}_fts'
+
+
+def source_label(source):
+    return source.label.lower()
+
+
+def source_tables(apps):
+    """Yield (source, db_table, has is_active) for every search source."""
+    for source in SEARCH_SOURCES:
+        model = apps.get_model(source.label)
+        has_active = any(field.name == 'is_active' for field in model._meta.concrete_fields)
+        yield source, model._meta.db_table, has_active
+
+
+def insert_notes_sql(source, pairs_sql, extra_condition=''):
+    """INSERT of the NEW row's non-empty fields, given `pairs_sql` producing (field, body) rows named `note`."""
+    return (
+        f"INSERT INTO {NOTE_TABLE} (source, source_id, field, body) "
+        f"SELECT '{source_label(source)}', NEW.id, note.field, note.body FROM {pairs_sql} "
+        f"WHERE note.body <> ''{extra_condition}"
+    )
+
+
+def postgresql_statements(source, table, has_active):
+    function = f'search_index_{table}'
+    pairs = ', '.join(f"('{field}', NEW.{field})" for field in source.fields)
+    watched = [*source.fields, 'is_active'] if has_active else source.fields
+    changed = ' OR '.join(f'NEW.{field} IS DISTINCT FROM OLD.{field}' for field in watched)
+    insert = insert_notes_sql(source, f'(VALUES {pairs}) AS note (field, body)')
+    insert_when = f"IF NEW.is_active THEN {insert}; END IF;" if has_active else f"{insert};"
+    return [
+        f"""
+        CREATE OR REPLACE FUNCTION {function}() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND NOT ({changed}) THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP <> 'INSERT' THEN
+                DELETE FROM {NOTE_TABLE} WHERE source = '{source_label(source)}' AND source_id = OLD.id;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                {insert_when}
+            END IF;
+            RETURN NULL;
+        END
+        $$
+        """,
+        f'DROP TRIGGER IF EXISTS search_index ON {table}',
+        f'CREATE TRIGGER search_index AFTER INSERT OR UPDATE OR DELETE ON {table} FOR EACH ROW EXECUTE FUNCTION {function}()',
+    ]
+
+
+def sqlite_statements(source, table, has_active):
+    pairs = ' UNION ALL '.join(f"SELECT '{field}' AS field, NEW.{field} AS body" for field in source.fields)
+    active = ' AND NEW.is_active' if has_active else ''
+    insert = insert_notes_sql(source, f'({pairs}) AS note', active)
+    delete = f"DELETE FROM {NOTE_TABLE} WHERE source = '{source_label(source)}' AND source_id = OLD.id"
+    watched = [*source.fields, 'is_active'] if has_active else source.fields
+    changed = ' OR '.join(f'NEW.{field} IS NOT OLD.{field}' for field in watched)
+    return [
+        f'DROP TRIGGER IF EXISTS search_{table}_ai',
+        f'DROP TRIGGER IF EXISTS search_{table}_au',
+        f'DROP TRIGGER IF EXISTS search_{table}_ad',
+        f'CREATE TRIGGER search_{table}_ai AFTER INSERT ON {table} BEGIN {insert}; END',
+        f'CREATE TRIGGER search_{table}_au AFTER UPDATE ON {table} WHEN {changed} BEGIN {delete}; {insert}; END',
+        f'CREATE TRIGGER search_{table}_ad AFTER DELETE ON {table} BEGIN {delete}; END',
+    ]
+
+
+def index_statements(vendor):
+    if vendor == 'postgresql':
+        return [
+            f"ALTER TABLE {NOTE_TABLE} ADD COLUMN IF NOT EXISTS document tsvector "
+            f"GENERATED ALWAYS AS (to_tsvector('{TEXT_SEARCH_CONFIG}', body)) STORED",
+            f'CREATE INDEX IF NOT EXISTS {NOTE_TABLE}_document_idx ON {NOTE_TABLE} USING gin (document)',
+        ]
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(body, content='{NOTE_TABLE}', content_rowid='id', tokenize='porter unicode61')",
+        f'CREATE TRIGGER IF NOT EXISTS {NOTE_TABLE}_ai AFTER INSERT ON {NOTE_TABLE} BEGIN '
+        f'INSERT INTO {FTS_TABLE} (rowid, body) VALUES (NEW.id, NEW.body); END',
+        f'CREATE TRIGGER IF NOT EXISTS {NOTE_TABLE}_ad AFTER DELETE ON {NOTE_TABLE} BEGIN '
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, body) VALUES ('delete', OLD.id, OLD.body); END",
+        f'CREATE TRIGGER IF NOT EXISTS {NOTE_TABLE}_au AFTER UPDATE ON {NOTE_TABLE} BEGIN '
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, body) VALUES ('delete', OLD.id, OLD.body); "
+        f'INSERT INTO {FTS_TABLE} (rowid, body) VALUES (NEW.id, NEW.body); END',
+        # An index created over notes already there (after uninstall(), say)
+        # starts out empty, and deleting a note it lacks corrupts it.
+        f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+    ]
+
+
+def is_supported(connection):
+    return connection.vendor in ('postgresql', 'sqlite')
+
+
+def install(connection, apps):
+    """Create the full-text index and the triggers on every source table."""
+    statements = index_statements(connection.vendor)
+    build = postgresql_statements if connection.vendor == 'postgresql' else sqlite_statements
+    for source, table, has_active in source_tables(apps):
+        statements.extend(build(source, table, has_active))
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall(connection, apps):
+    with connection.cursor() as cursor:
+        for source, table, has_active in source_tables(apps):
+            if connection.vendor == 'postgresql':
+                cursor.execute(f'DROP TRIGGER IF EXISTS search_index ON {table}')
+                cursor.execute(f'DROP FUNCTION IF EXISTS search_index_{table}()')
+            else:
+                for suffix in ('ai', 'au', 'ad'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS search_{table}_{suffix}')
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'ALTER TABLE {NOTE_TABLE} DROP COLUMN IF EXISTS document')
+        else:
+            for suffix in ('ai', 'ad', 'au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {NOTE_TABLE}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def rebuild(connection, apps):
+    """Re-index every source row with one INSERT ... SELECT per field; returns the number of notes."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {NOTE_TABLE}')
+        for source, table, has_active in source_tables(apps):
+            for field in source.fields:
+                active = ' AND is_active' if has_active else ''
+                cursor.execute(
+                    f"INSERT INTO {NOTE_TABLE} (source, source_id, field, body) "
+                    f"SELECT %s, id, %s, {field} FROM {table} WHERE {field} <> ''{active}",
+                    [source_label(source), field],
+                )
+        cursor.execute(f'SELECT COUNT(*) FROM {NOTE_TABLE}')
+        return cursor.fetchone()[0]
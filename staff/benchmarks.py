@@ -0,0 +1,31 @@
+from django.contrib.auth.backends import ModelBackend
+
+from benchmarks.registry import benchmark
+from staff.models import Staff
+
+CHECKS = [
+    'patients.view_patient',
+    'visits.change_visit',
+    'vital_signs.add_vitalsign',
+    'lab_results.add_result',
+    'prescriptions.add_medication',
+    'payments.add_payment',
+]
+
+model_backend = ModelBackend()
+
+
+def pick_staff(ctx):
+    return (ctx.pick(Staff.objects.active().exclude(role=Staff.RoleEnum.ADMIN)),)
+
+
+@benchmark('staff.has_perm', setup=pick_staff)
+def has_perm(ctx, staff):
+    for perm in CHECKS:
+        staff.has_perm(perm)
+
+
+@benchmark('staff.has_perm_model_backend', setup=pick_staff)
+def has_perm_model_backend(ctx, staff):
+    for perm in CHECKS:
+        model_backend.has_perm(staff, perm)
@@ -0,0 +1,25 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:34
+
+import app.managers
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('staff', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='staff',
+            managers=[
+                ('objects', app.managers.StaffManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['role', 'created_at'], name='staff_role_active_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('staff', '0002_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['updated_at', 'id'], name='staff_updated_idx'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import Q
 from django_enum import EnumField
 
+from app.managers import StaffManager
+
 
 # Create your models here.
 class Staff(AbstractUser):
@@ -21,5 +24,13 @@ class Staff(AbstractUser):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StaffManager()
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['role', 'created_at'], name='staff_role_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='staff_updated_idx'),
+        ]
+
     def __str__(self):
         return f"{self.username}: {self.phone} <{self.role.name}>"
@@ -0,0 +1,124 @@
+from fnmatch import fnmatchcase
+from functools import cache
+
+from django.apps import apps
+from django.contrib.auth.backends import BaseBackend
+from django.core.exceptions import PermissionDenied
+
+from staff.models import Staff
+
+# Apps whose model permissions are decided by the role matrix.
+CLINICAL_APPS = [
+    'patients', 'visits', 'vital_signs', 'physical_exams', 'lab_requests', 'lab_results',
+    'prescriptions', 'appointments', 'charges', 'payments',
+]
+
+# Role -> permission patterns ("app_label.codename", shell-style wildcards).
+ROLE_PERMISSIONS = {
+    Staff.RoleEnum.ADMIN: ['*'],
+    Staff.RoleEnum.DOCTOR: [
+        '*.view_*',
+        'visits.change_visit',
+        'physical_exams.*',
+        'vital_signs.*',
+        'lab_requests.add_labrequest', 'lab_requests.change_labrequest',
+        'lab_requests.add_labrequesttest', 'lab_requests.change_labrequesttest',
+        'prescriptions.add_*', 'prescriptions.change_*',
+        'appointments.*',
+    ],
+    Staff.RoleEnum.NURSE: [
+        'patients.*', 'visits.view_*', 'visits.change_visit', 'vital_signs.*',
+        'lab_results.view_*', 'prescriptions.view_*', 'appointments.view_*',
+    ],
+    Staff.RoleEnum.LABORATORY: [
+        'patients.view_patient', 'visits.view_*', 'visits.change_visit',
+        'lab_requests.view_*', 'lab_requests.add_test*', 'lab_requests.change_test*',
+        'lab_results.*',
+    ],
+    Staff.RoleEnum.RECEPTION: [
+        'patients.*', 'visits.view_*', 'visits.add_visit', 'visits.change_visit', 'appointments.*',
+        'charges.view_*', 'payments.view_*', 'payments.add_payment',
+    ],
+    Staff.RoleEnum.OTHER: ['patients.view_patient', 'appointments.view_appointment'],
+}
+
+
+class PermissionMatrix:
+    """
+    The role permission matrix compiled to bitmasks: each clinical permission
+    gets one bit and each role the OR of the bits it is granted, so a check
+    is a dict lookup and an AND.
+    """
+
+    def __init__(self, permissions, role_patterns):
+        self.bits = {perm: 1 << index for index, perm in enumerate(sorted(permissions))}
+        self.masks = {}
+        for role, patterns in role_patterns.items():
+            mask = 0
+            for perm, bit in self.bits.items():
+                if any(fnmatchcase(perm, pattern) for pattern in patterns):
+                    mask |= bit
+            self.masks[role] = mask
+
+    def governs(self, perm):
+        return perm in self.bits
+
+    def mask_for(self, role):
+        return self.masks.get(role, 0)
+
+    def permissions_for(self, role):
+        mask = self.mask_for(role)
+        return {perm for perm, bit in self.bits.items() if mask & bit}
+
+
+def clinical_permissions():
+    """The default add/change/delete/view permissions of every model in CLINICAL_APPS."""
+    permissions = set()
+    for app_label in CLINICAL_APPS:
+        for model in apps.get_app_config(app_label).get_models():
+            for action in model._meta.default_permissions:
+                permissions.add(f'{app_label}.{action}_{model._meta.model_name}')
+    return permissions
+
+
+@cache
+def get_matrix():
+    return PermissionMatrix(clinical_permissions(), ROLE_PERMISSIONS)
+
+
+class RoleBackend(BaseBackend):
+    """
+    Authorizes clinical permissions from the staff member's role without
+    touching the database. The resolved role mask is cached on the user
+    object, keyed by role, so it lasts for the request and a role change is
+    picked up as soon as the user is loaded again. Clinical permissions the
+    role lacks are refused outright, so later backends are not queried for
+    them; anything outside the matrix falls through to ModelBackend.
+    """
+
+    def get_role_mask(self, user_obj):
+        cached = getattr(user_obj, '_role_mask_cache', None)
+        if cached is None or cached[0] != user_obj.role:
+            cached = (user_obj.role, get_matrix().mask_for(user_obj.role))
+            user_obj._role_mask_cache = cached
+        return cached[1]
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        return get_matrix().permissions_for(user_obj.role)
+
+    def has_perm(self, user_obj, perm, obj=None):
+        matrix = get_matrix()
+        if obj is not None or not matrix.governs(perm):
+            return False
+        if user_obj.is_active and not user_obj.is_anonymous and self.get_role_mask(user_obj) & matrix.bits[perm]:
+            return True
+        raise PermissionDenied
+
+    def has_module_perms(self, user_obj, app_label):
+        if not user_obj.is_active or user_obj.is_anonymous or app_label not in CLINICAL_APPS:
+            return False
+        prefix = f'{app_label}.'
+        mask = self.get_role_mask(user_obj)
+        return any(mask & bit for perm, bit in get_matrix().bits.items() if perm.startswith(prefix))
@@ -0,0 +1,31 @@
+from django.utils import timezone
+
+from benchmarks.registry import benchmark
+from sync.models import SyncCheckpoint, SyncSite
+from sync.protocol import apply_changes, export_changes, feed_labels
+
+BATCH_SIZE = 500
+
+
+def export_batch(ctx):
+    """The first batch of every feed, as the central site would send it to a new satellite."""
+    # run_benchmarks rolls its transaction back, so a database never set up
+    # for sync is only registered as a site for the run.
+    if not SyncSite.objects.exists():
+        SyncSite.objects.create(site_id=1, name='Benchmark')
+    return export_changes('default', feed_labels(SyncCheckpoint.DirectionEnum.PULL), {}, BATCH_SIZE, until=timezone.now())
+
+
+@benchmark('sync.export', repeat=5)
+def export(ctx):
+    export_batch(ctx)
+
+
+def build_payload(ctx):
+    return (export_batch(ctx).payload,)
+
+
+@benchmark('sync.apply_unchanged', setup=build_payload, repeat=5)
+def apply_unchanged(ctx, payload):
+    # The database's own rows coming back: every row compares equal and nothing is written.
+    apply_changes(payload, 'default')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from sync.models import SyncCheckpoint, SyncIdentity, SyncSite
+
+
+class Command(BaseCommand):
+    help = "Register a database as a sync site. Every database that syncs needs its own site id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--site-id', type=int, required=True)
+        parser.add_argument('--name', required=True, help="Clinic or server the database belongs to.")
+
+    def handle(self, *args, **options):
+        using, site_id = options['database'], options['site_id']
+        site = SyncSite.objects.using(using).first()
+        if site is not None and site.site_id != site_id and (
+            SyncIdentity.objects.using(using).exists() or SyncCheckpoint.objects.using(using).exists()
+        ):
+            raise CommandError(f"Database '{using}' has already synced as site {site.site_id}; its site id cannot change.")
+
+        site = site or SyncSite(site_id=site_id)
+        site.site_id, site.name = site_id, options['name']
+        site.save(using=using)
+        self.stdout.write(self.style.SUCCESS(f"Database '{using}' is {site}."))
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from sync.protocol import sync
+
+
+class Command(BaseCommand):
+    help = "Exchange changes between a satellite database and the central one until both are up to date."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--local', default='sqlite', help="Database alias of the satellite; sync checkpoints are kept here.")
+        parser.add_argument('--remote', default='default', help="Database alias of the central site.")
+        parser.add_argument('--batch-size', type=int, default=settings.SYNC_BATCH_SIZE, help="Rows per model in each round trip.")
+        parser.add_argument('--max-rounds', type=int, default=settings.SYNC_MAX_ROUNDS)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            report = sync(options['local'], options['remote'], options['batch_size'], options['max_rounds'])
+        except ImproperlyConfigured as error:
+            raise CommandError(str(error))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Synced in {report.rounds} rounds ({time.perf_counter() - started:.2f}s): pushed {report.pushed} rows, "
+            f"pulled {report.pulled} rows, wrote {report.written}, transferred {report.bytes / 1024:.1f} KiB."
+        ))
+        if report.blocked:
+            self.stderr.write(
+                "Rows waiting on records the other side has not received: " + ", ".join(report.blocked)
+            )
@@ -0,0 +1,57 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+import django_enum.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncSite',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('site_id', models.PositiveIntegerField(help_text='Identifies this database among the sites that sync with each other', unique=True)),
+                ('name', models.CharField(help_text='Clinic or server the database belongs to', max_length=100)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('peer_site', models.PositiveIntegerField(help_text='Site on the other end of the sync')),
+                ('direction', django_enum.fields.EnumCharField(choices=[('PUSH', 'Push'), ('PULL', 'Pull')], max_length=4)),
+                ('model_label', models.CharField(max_length=100)),
+                ('position_updated_at', models.DateTimeField(blank=True, help_text='updated_at of the last row delivered', null=True)),
+                ('position_id', models.BigIntegerField(default=0, help_text='Primary key, on the sending side, of the last row delivered')),
+                ('rows_synced', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('peer_site', 'direction', 'model_label'), name='synccheckpoint_peer_unique'), models.CheckConstraint(condition=models.Q(('direction__in', ['PUSH', 'PULL'])), name='sync_SyncCheckpoint_direction_DirectionEnum')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncIdentity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('model_label', models.CharField(max_length=100)),
+                ('origin_site', models.PositiveIntegerField(help_text='Site the row was created on')),
+                ('origin_id', models.BigIntegerField(help_text='Primary key of the row on its origin site')),
+                ('local_id', models.BigIntegerField(help_text='Primary key of the row in this database')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['model_label', 'local_id'], name='syncidentity_local_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model_label', 'origin_site', 'origin_id'), name='syncidentity_origin_unique')],
+            },
+        ),
+    ]
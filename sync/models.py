@@ -0,0 +1,58 @@
+from django.db import models
+from django_enum import EnumField
+
+
+# Create your models here.
+class SyncSite(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    site_id = models.PositiveIntegerField(unique=True, help_text="Identifies this database among the sites that sync with each other")
+    name = models.CharField(max_length=100, help_text="Clinic or server the database belongs to")
+
+    def __str__(self):
+        return f"{self.name} (site {self.site_id})"
+
+
+class SyncIdentity(models.Model):
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    model_label = models.CharField(max_length=100)
+    origin_site = models.PositiveIntegerField(help_text="Site the row was created on")
+    origin_id = models.BigIntegerField(help_text="Primary key of the row on its origin site")
+    local_id = models.BigIntegerField(help_text="Primary key of the row in this database")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model_label', 'origin_site', 'origin_id'], name='syncidentity_origin_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['model_label', 'local_id'], name='syncidentity_local_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.model_label} {self.origin_site}:{self.origin_id} -> {self.local_id}"
+
+
+class SyncCheckpoint(models.Model):
+    class DirectionEnum(models.TextChoices):
+        PUSH = 'PUSH', 'Push'
+        PULL = 'PULL', 'Pull'
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    peer_site = models.PositiveIntegerField(help_text="Site on the other end of the sync")
+    direction = EnumField(DirectionEnum)
+    model_label = models.CharField(max_length=100)
+    position_updated_at = models.DateTimeField(null=True, blank=True, help_text="updated_at of the last row delivered")
+    position_id = models.BigIntegerField(default=0, help_text="Primary key, on the sending side, of the last row delivered")
+    rows_synced = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['peer_site', 'direction', 'model_label'], name='synccheckpoint_peer_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.direction.label} {self.model_label} with site {self.peer_site}"
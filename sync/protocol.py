@@ -0,0 +1,476 @@
+"""
+Delta sync between satellite clinic databases and the central one.
+
+Every synced model has a change feed ordered by (updated_at, id). For each
+peer, direction and model, the satellite records the position of the last
+row the peer received in a SyncCheckpoint. One round trip ships the next
+batch of every feed as gzip-compressed JSON lines and applies it on the
+other side with bulk inserts and updates, in foreign key order.
+
+Each database keeps allocating its own primary keys. Across sites a row is
+known by its origin site and the id it was given there. SyncIdentity maps
+the rows received from other sites to their local ids. Because of this,
+sites never have to coordinate id ranges, which SQLite cannot enforce.
+Charge.source_key embeds a primary key, so it is translated the same way.
+
+Applying a batch is idempotent. A row that equals the local copy is
+skipped. Otherwise the copy with the later updated_at wins, except that
+Visit.visit_status never moves back along the visit workflow. Visit.version
+is not synced: each database bumps its own on every write, sync included,
+so a visit read before a sync cannot be saved over it. Written rows
+get the receiving database's clock as updated_at. That puts them in its
+change feed, so other peers receive them even when the original edit is
+older than their checkpoint.
+"""
+import gzip
+import io
+import json
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from app.timestamps import preserve_timestamps
+from patients.chart import invalidate_patient_charts
+from sync.models import SyncCheckpoint, SyncIdentity, SyncSite
+from visits.models import Visit
+
+# Synced models, parents before children.
+SYNCED_MODELS = [
+    'staff.Staff',
+    'patients.Patient',
+    'lab_requests.TestGroup',
+    'lab_requests.Test',
+    'prescriptions.FormularyItem',
+    'visits.Visit',
+    'visits.VisitStatusLog',
+    'vital_signs.VitalSign',
+    'physical_exams.PhysicalExam',
+    'lab_requests.LabRequest',
+    'lab_requests.LabRequestTest',
+    'lab_results.LabResult',
+    'lab_results.Result',
+    'prescriptions.Prescription',
+    'prescriptions.Medication',
+    'appointments.Appointment',
+    'charges.Charge',
+    'payments.Payment',
+]
+
+# Reference data maintained on the central site; satellites pull it but never push it.
+CENTRAL_MODELS = {'staff.Staff', 'lab_requests.TestGroup', 'lab_requests.Test', 'prescriptions.FormularyItem'}
+
+# Unique text fields that embed another row's primary key: model -> (field, {key prefix: model of the embedded key}).
+EMBEDDED_KEYS = {
+    'charges.Charge': ('source_key', {'lab_request_test': 'lab_requests.LabRequestTest', 'consultation': 'visits.Visit'}),
+}
+
+# Unique fields that identify a row received for the first time with one the site already has.
+NATURAL_KEYS = {
+    'staff.Staff': 'username',
+    'charges.Charge': 'source_key',
+}
+
+# Fields that count the writes to a row on its own database and are not
+# synced; applying a row changed elsewhere is a local write and bumps them.
+LOCAL_FIELDS = {
+    'visits.Visit': 'version',
+}
+
+# How far along the workflow each visit status is; a sync never moves a visit back.
+VISIT_STATUS_RANK = {
+    status: rank
+    for rank, status in enumerate([
+        Visit.VisitStatusEnum.OTHER,
+        Visit.VisitStatusEnum.AWAITING_PAYMENT,
+        Visit.VisitStatusEnum.AWAITING_VITALS,
+        Visit.VisitStatusEnum.AWAITING_CONSULTATION,
+        Visit.VisitStatusEnum.IN_CONSULTATION,
+        Visit.VisitStatusEnum.AWAITING_LAB_PAYMENT,
+        Visit.VisitStatusEnum.AWAITING_LAB_SAMPLE,
+        Visit.VisitStatusEnum.AWAITING_REVIEW,
+        Visit.VisitStatusEnum.CANCELLED,
+        Visit.VisitStatusEnum.COMPLETED,
+    ])
+}
+
+# Lookup from each model to the patient whose chart shows its rows.
+CHART_PATIENT_PATHS = {
+    'patients.Patient': 'pk',
+    'visits.Visit': 'patient_id',
+    'vital_signs.VitalSign': 'visit__patient_id',
+    'physical_exams.PhysicalExam': 'visit__patient_id',
+    'lab_results.LabResult': 'visit__patient_id',
+    'lab_results.Result': 'lab_result__visit__patient_id',
+    'prescriptions.Prescription': 'visit__patient_id',
+    'prescriptions.Medication': 'prescription__visit__patient_id',
+}
+
+Batch = namedtuple('Batch', ['payload', 'cursors'])
+ApplyResult = namedtuple('ApplyResult', ['processed', 'written'])
+SyncReport = namedtuple('SyncReport', ['rounds', 'pushed', 'pulled', 'written', 'bytes', 'blocked'])
+
+
+def get_site(using):
+    site = SyncSite.objects.using(using).first()
+    if site is None:
+        raise ImproperlyConfigured(f"Database '{using}' has no sync site; run init_sync_site first.")
+    return site
+
+
+def synced_fields(model):
+    local = LOCAL_FIELDS.get(model._meta.label)
+    return [field for field in model._meta.concrete_fields if field.attname != local]
+
+
+def feed_labels(direction):
+    if direction == SyncCheckpoint.DirectionEnum.PUSH:
+        return [label for label in SYNCED_MODELS if label not in CENTRAL_MODELS]
+    return list(SYNCED_MODELS)
+
+
+def reference_columns(model):
+    """attname -> label of the model it points to, for the primary key and every foreign key."""
+    columns = {model._meta.pk.attname: model._meta.label}
+    for field in model._meta.concrete_fields:
+        if field.many_to_one:
+            columns[field.attname] = field.related_model._meta.label
+    return columns
+
+
+class IdentityMap:
+    """Translates between one database's primary keys and [origin site, origin id] references."""
+
+    def __init__(self, using, site_id):
+        self.using = using
+        self.site_id = site_id
+
+    def to_refs(self, label, local_ids):
+        refs = {local_id: [self.site_id, local_id] for local_id in local_ids}
+        received = SyncIdentity.objects.using(self.using).filter(model_label=label, local_id__in=refs)
+        for origin_site, origin_id, local_id in received.values_list('origin_site', 'origin_id', 'local_id'):
+            refs[local_id] = [origin_site, origin_id]
+        return refs
+
+    def to_local(self, label, refs):
+        """Map references to local ids; rows from other sites that were never received are left out."""
+        local = {}
+        foreign = defaultdict(set)
+        for site, origin_id in refs:
+            if site == self.site_id:
+                local[(site, origin_id)] = origin_id
+            else:
+                foreign[site].add(origin_id)
+        if foreign:
+            condition = Q()
+            for site, origin_ids in foreign.items():
+                condition |= Q(origin_site=site, origin_id__in=origin_ids)
+            received = SyncIdentity.objects.using(self.using).filter(condition, model_label=label)
+            for origin_site, origin_id, local_id in received.values_list('origin_site', 'origin_id', 'local_id'):
+                local[(origin_site, origin_id)] = local_id
+        return local
+
+    def remember(self, label, pairs):
+        SyncIdentity.objects.using(self.using).bulk_create(
+            [
+                SyncIdentity(model_label=label, origin_site=site, origin_id=origin_id, local_id=local_id)
+                for (site, origin_id), local_id in pairs
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def encode_value(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Cannot sync a value of type {type(value).__name__}")
+
+
+def read_changes(model, using, position, until, limit):
+    """The next `limit` rows of the model's change feed after `position`, an (updated_at, id) pair or None."""
+    fields = [field.attname for field in synced_fields(model)]
+    queryset = model._base_manager.using(using).filter(updated_at__lt=until)
+    if position is not None:
+        updated_at, last_id = position
+        queryset = queryset.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, pk__gt=last_id))
+    return fields, list(queryset.order_by('updated_at', 'pk').values_list(*fields)[:limit])
+
+
+def encode_rows(model, fields, rows, identities):
+    """Replace the local keys in `rows` with references that mean the same row on every site."""
+    rows = [list(row) for row in rows]
+    references = reference_columns(model)
+    columns = defaultdict(list)
+    for index, attname in enumerate(fields):
+        if attname in references:
+            columns[references[attname]].append(index)
+    for label, indexes in columns.items():
+        refs = identities.to_refs(label, {row[index] for row in rows for index in indexes if row[index] is not None})
+        for row in rows:
+            for index in indexes:
+                if row[index] is not None:
+                    row[index] = refs[row[index]]
+
+    if model._meta.label in EMBEDDED_KEYS:
+        field, prefixes = EMBEDDED_KEYS[model._meta.label]
+        index = fields.index(field)
+        keys = {}
+        for position, row in enumerate(rows):
+            prefix, _, local_id = (row[index] or '').partition(':')
+            if prefix in prefixes and local_id.isdigit():
+                keys[position] = (prefix, int(local_id))
+        refs = {
+            prefix: identities.to_refs(prefixes[prefix], {local_id for key, local_id in keys.values() if key == prefix})
+            for prefix in {prefix for prefix, _ in keys.values()}
+        }
+        for position, (prefix, local_id) in keys.items():
+            rows[position][index] = [prefix, *refs[prefix][local_id]]
+    return rows
+
+
+def load_positions(using, peer_site, direction):
+    checkpoints = SyncCheckpoint.objects.using(using).filter(peer_site=peer_site, direction=direction)
+    return {
+        label: (updated_at, position_id)
+        for label, updated_at, position_id in checkpoints.values_list('model_label', 'position_updated_at', 'position_id')
+        if updated_at is not None
+    }
+
+
+def export_changes(using, labels, positions, batch_size, until=None):
+    """
+    Read the next batch of each model's change feed from `using` and return
+    it as a gzip-compressed JSON lines payload: a header line per model
+    followed by its rows. The cursors hold the (updated_at, id) of every
+    exported row, to advance the checkpoints by what the peer applied.
+    """
+    identities = IdentityMap(using, get_site(using).site_id)
+    until = until or timezone.now() - timedelta(seconds=settings.SYNC_CHANGE_LAG_SECONDS)
+    cursors = {}
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as handle:
+        for label in labels:
+            model = apps.get_model(label)
+            fields, rows = read_changes(model, using, positions.get(label), until, batch_size)
+            if not rows:
+                continue
+            updated_index, pk_index = fields.index('updated_at'), fields.index(model._meta.pk.attname)
+            cursors[label] = [(row[updated_index], row[pk_index]) for row in rows]
+            lines = [{'model': label, 'fields': fields, 'rows': len(rows)}] + encode_rows(model, fields, rows, identities)
+            for line in lines:
+                handle.write(json.dumps(line, default=encode_value, separators=(',', ':')).encode())
+                handle.write(b'\n')
+    return Batch(buffer.getvalue(), cursors)
+
+
+def read_payload(payload):
+    """Yield (model label, fields, rows) for each section of a payload built by export_changes."""
+    with gzip.GzipFile(fileobj=io.BytesIO(payload)) as handle:
+        header = None
+        for line in handle:
+            record = json.loads(line)
+            if isinstance(record, dict):
+                header, rows = record, []
+            else:
+                rows.append(record)
+                if len(rows) == header['rows']:
+                    yield header['model'], header['fields'], rows
+
+
+def merge_visit_status(merged, *candidates):
+    furthest = max(candidates, key=lambda row: VISIT_STATUS_RANK[row['visit_status']])
+    if VISIT_STATUS_RANK[furthest['visit_status']] > VISIT_STATUS_RANK[merged['visit_status']]:
+        merged['visit_status'] = furthest['visit_status']
+        merged['current_status_since'] = furthest['current_status_since']
+
+
+def decode_row(fields, row, by_attname, columns, embedded, resolved):
+    """
+    Turn an encoded row into {attname: value} with local keys. The primary
+    key is None for a row this database has not received before. Returns
+    None when the row references a row that has not been received yet.
+    """
+    record = {}
+    embedded_field, prefixes = embedded
+    for attname, value in zip(fields, row):
+        if attname not in by_attname:
+            continue
+        if attname in columns and value is not None:
+            value = resolved[columns[attname]].get(tuple(value))
+            if value is None and not by_attname[attname].primary_key:
+                return None
+        elif attname == embedded_field and isinstance(value, list):
+            local_id = resolved[prefixes[value[0]]].get(tuple(value[1:]))
+            if local_id is None:
+                return None
+            value = f'{value[0]}:{local_id}'
+        else:
+            value = by_attname[attname].to_python(value)
+        record[attname] = value
+    return record
+
+
+def apply_rows(model, fields, rows, identities, now):
+    """
+    Upsert one model's section of a payload. Rows are applied in feed order
+    up to the first one that references a row this database has not
+    received yet; the rest are left for a later round.
+    """
+    label = model._meta.label
+    using = identities.using
+    by_attname = {field.attname: field for field in synced_fields(model)}
+    pk_name = model._meta.pk.attname
+    columns = {attname: target for attname, target in reference_columns(model).items() if attname in fields}
+    embedded = EMBEDDED_KEYS.get(label, (None, {}))
+
+    wanted = defaultdict(set)
+    for row in rows:
+        for attname, value in zip(fields, row):
+            if attname in columns and value is not None:
+                wanted[columns[attname]].add(tuple(value))
+            elif attname == embedded[0] and isinstance(value, list):
+                wanted[embedded[1][value[0]]].add(tuple(value[1:]))
+    resolved = {target: identities.to_local(target, refs) for target, refs in wanted.items()}
+
+    records, origins = [], []
+    pk_index = fields.index(pk_name)
+    for row in rows:
+        record = decode_row(fields, row, by_attname, columns, embedded, resolved)
+        if record is None:
+            break
+        records.append(record)
+        origins.append(tuple(row[pk_index]))
+
+    learned = []
+    natural_key = NATURAL_KEYS.get(label)
+    if natural_key:
+        unmatched = {
+            record[natural_key]: (record, origin)
+            for record, origin in zip(records, origins)
+            if record[pk_name] is None and record[natural_key]
+        }
+        matches = model._base_manager.using(using).filter(**{f'{natural_key}__in': unmatched}).values_list(natural_key, 'pk')
+        for key, pk in matches:
+            record, origin = unmatched[key]
+            record[pk_name] = pk
+            learned.append((origin, pk))
+
+    compared = [attname for attname in by_attname if attname not in (pk_name, 'updated_at')]
+    existing = {
+        row[pk_name]: row
+        for row in model._base_manager.using(using)
+        .filter(pk__in=[record[pk_name] for record in records if record[pk_name] is not None])
+        .values(*by_attname)
+    }
+
+    creates, updates = [], []
+    for record, origin in zip(records, origins):
+        current = existing.get(record[pk_name])
+        if current is None:
+            record['updated_at'] = now
+            creates.append((model(**record), origin))
+            continue
+        merged = dict(record) if record['updated_at'] > current['updated_at'] else dict(current)
+        if label == 'visits.Visit':
+            merge_visit_status(merged, current, record)
+        if all(merged[attname] == current[attname] for attname in compared):
+            continue
+        merged['updated_at'] = now
+        updates.append(model(**merged))
+
+    with preserve_timestamps(model):
+        model._base_manager.using(using).bulk_create([instance for instance, _ in creates])
+    if updates:
+        update_fields = [by_attname[attname].name for attname in by_attname if attname != pk_name]
+        if label in LOCAL_FIELDS:
+            counter = LOCAL_FIELDS[label]
+            for instance in updates:
+                setattr(instance, counter, F(counter) + 1)
+            update_fields.append(counter)
+        model._base_manager.using(using).bulk_update(updates, update_fields)
+    learned += [(origin, instance.pk) for instance, origin in creates if origin[0] != identities.site_id]
+    identities.remember(label, learned)
+
+    written = [instance.pk for instance, _ in creates] + [instance.pk for instance in updates]
+    if written and label in CHART_PATIENT_PATHS:
+        path = CHART_PATIENT_PATHS[label]
+        invalidate_patient_charts(
+            model._base_manager.using(using).filter(pk__in=written).values_list(path, flat=True).distinct()
+        )
+    return ApplyResult(len(records), len(written))
+
+
+def apply_changes(payload, using):
+    """Apply a payload from export_changes to `using` in one transaction; returns {model label: ApplyResult}."""
+    identities = IdentityMap(using, get_site(using).site_id)
+    now = timezone.now()
+    results = {}
+    with transaction.atomic(using=using):
+        for label, fields, rows in read_payload(payload):
+            results[label] = apply_rows(apps.get_model(label), fields, rows, identities, now)
+    return results
+
+
+def advance_checkpoints(using, peer_site, direction, cursors, results):
+    for label, cursor in cursors.items():
+        processed = results[label].processed if label in results else 0
+        if not processed:
+            continue
+        checkpoint, _ = SyncCheckpoint.objects.using(using).get_or_create(
+            peer_site=peer_site, direction=direction, model_label=label,
+        )
+        checkpoint.position_updated_at, checkpoint.position_id = cursor[processed - 1]
+        checkpoint.rows_synced += processed
+        checkpoint.save(using=using)
+
+
+def sync(local, remote, batch_size=None, max_rounds=None):
+    """
+    Sync database `local` (a satellite) with `remote` (the central site):
+    each round pushes one batch of every local feed, then pulls one batch of
+    every remote feed, until a round moves nothing or `max_rounds` is
+    reached. Checkpoints live in the local database.
+    """
+    batch_size = batch_size or settings.SYNC_BATCH_SIZE
+    max_rounds = max_rounds or settings.SYNC_MAX_ROUNDS
+    local_site, remote_site = get_site(local), get_site(remote)
+    if local_site.site_id == remote_site.site_id:
+        raise ImproperlyConfigured(f"Databases '{local}' and '{remote}' are both sync site {local_site.site_id}.")
+
+    moved = {SyncCheckpoint.DirectionEnum.PUSH: 0, SyncCheckpoint.DirectionEnum.PULL: 0}
+    written = transferred = rounds = 0
+    blocked = set()
+    legs = [(SyncCheckpoint.DirectionEnum.PUSH, local, remote), (SyncCheckpoint.DirectionEnum.PULL, remote, local)]
+    while rounds < max_rounds:
+        rounds += 1
+        blocked.clear()
+        round_moved = 0
+        for direction, source, target in legs:
+            positions = load_positions(local, remote_site.site_id, direction)
+            batch = export_changes(source, feed_labels(direction), positions, batch_size)
+            if not batch.cursors:
+                continue
+            results = apply_changes(batch.payload, target)
+            advance_checkpoints(local, remote_site.site_id, direction, batch.cursors, results)
+            transferred += len(batch.payload)
+            for label, cursor in batch.cursors.items():
+                result = results.get(label, ApplyResult(0, 0))
+                moved[direction] += result.processed
+                round_moved += result.processed
+                written += result.written
+                if result.processed < len(cursor):
+                    blocked.add(label)
+        if not round_moved:
+            break
+    return SyncReport(
+        rounds, moved[SyncCheckpoint.DirectionEnum.PUSH], moved[SyncCheckpoint.DirectionEnum.PULL],
+        written, transferred, sorted(blocked),
+    )
@@ -0,0 +1,92 @@
+from datetime import date
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from patients.models import Patient
+from staff.models import Staff
+from sync.models import SyncSite
+from sync.protocol import sync
+from visits.models import Visit, VisitStatusConflict
+
+# Create your tests here.
+CENTRAL, SATELLITE = 'default', 'sqlite'
+Status = Visit.VisitStatusEnum
+
+
+def create_patient(using, last_name):
+    return Patient.objects.db_manager(using).create(
+        first_name='Test',
+        last_name=last_name,
+        date_of_birth=date(1990, 1, 1),
+        sex=Patient.SexEnum.FEMALE,
+        region=Patient.RegionEnum.ADDIS_ABABA,
+        city='Addis Ababa',
+    )
+
+
+@override_settings(SYNC_CHANGE_LAG_SECONDS=0)
+class SyncTests(TestCase):
+    databases = {CENTRAL, SATELLITE}
+
+    @classmethod
+    def setUpTestData(cls):
+        SyncSite.objects.using(CENTRAL).create(site_id=1, name='Central')
+        SyncSite.objects.using(SATELLITE).create(site_id=2, name='Satellite')
+        Staff.objects.db_manager(CENTRAL).create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        patient = create_patient(SATELLITE, 'Satellite')
+        cls.visit = Visit.objects.using(SATELLITE).create(
+            patient=patient,
+            visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE,
+            visit_status=Status.AWAITING_VITALS,
+        )
+
+    def central_visit(self):
+        return Visit.objects.using(CENTRAL).get(patient__last_name='Satellite')
+
+    def test_pushes_satellite_rows(self):
+        report = sync(SATELLITE, CENTRAL)
+        self.assertEqual(report.blocked, [])
+        self.assertEqual(self.central_visit().visit_status, Status.AWAITING_VITALS)
+
+    def test_pulls_central_rows(self):
+        create_patient(CENTRAL, 'Central')
+        sync(SATELLITE, CENTRAL)
+        self.assertTrue(Staff.objects.using(SATELLITE).filter(username='doctor').exists())
+        self.assertTrue(Patient.objects.using(SATELLITE).filter(last_name='Central').exists())
+
+    def test_status_never_moves_back(self):
+        sync(SATELLITE, CENTRAL)
+        central = self.central_visit()
+        Visit.objects.using(CENTRAL).filter(pk=central.pk).update(
+            visit_status=Status.AWAITING_CONSULTATION, updated_at=timezone.now(),
+        )
+        # The later edit on the satellite wins, except for its older status.
+        Visit.objects.using(SATELLITE).filter(pk=self.visit.pk).update(chief_complaint='Cough', updated_at=timezone.now())
+        sync(SATELLITE, CENTRAL)
+
+        for visit in (self.central_visit(), Visit.objects.using(SATELLITE).get(pk=self.visit.pk)):
+            self.assertEqual((visit.visit_status, visit.chief_complaint), (Status.AWAITING_CONSULTATION, 'Cough'))
+
+    def test_resync_is_a_no_op(self):
+        sync(SATELLITE, CENTRAL)
+        report = sync(SATELLITE, CENTRAL)
+        self.assertEqual((report.written, report.blocked), (0, []))
+        self.assertEqual(Visit.objects.using(CENTRAL).filter(patient__last_name='Satellite').count(), 1)
+
+    def test_version_is_local(self):
+        sync(SATELLITE, CENTRAL)
+        stale = self.central_visit()
+        satellite = Visit.objects.using(SATELLITE).get(pk=self.visit.pk)
+        for complaint in ('Cough', 'Fever'):
+            satellite.chief_complaint = complaint
+            satellite.save()
+        sync(SATELLITE, CENTRAL)
+
+        # Received once, changed once, whatever the satellite's count.
+        self.assertEqual(self.central_visit().version, 2)
+        self.assertEqual(Visit.objects.using(SATELLITE).get(pk=self.visit.pk).version, 3)
+        stale.chief_complaint = 'Headache'
+        with self.assertRaises(VisitStatusConflict):
+            stale.save()
+        self.assertEqual(self.central_visit().chief_complaint, 'Fever')
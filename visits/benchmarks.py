@@ -0,0 +1,60 @@
+from django.db.models import Prefetch
+
+from benchmarks.registry import benchmark
+from patients.models import Patient
+from visits.detail import get_visit_detail
+from visits.models import Visit
+from visits.services import check_in_patient, transition_visit
+
+
+def pick_patient(ctx):
+    return (ctx.pick(Patient.objects.all()),)
+
+
+def pick_visit(ctx):
+    return (ctx.pick(Visit.objects.all()),)
+
+
+def pick_waiting_visit(ctx):
+    pk = ctx.pick_pk(Visit.objects.all())
+    Visit.objects.filter(pk=pk).update(visit_status=Visit.VisitStatusEnum.AWAITING_VITALS)
+    return (Visit.objects.get(pk=pk),)
+
+
+@benchmark('visits.check_in', setup=pick_patient)
+def check_in(ctx, patient):
+    check_in_patient(patient, Visit.VisitCategoryEnum.PROGRESS_NOTE, 'Follow up')
+
+
+@benchmark('visits.status_transition', setup=pick_waiting_visit)
+def status_transition(ctx, visit):
+    visit.visit_status = Visit.VisitStatusEnum.AWAITING_CONSULTATION
+    visit.save()
+
+
+@benchmark('visits.status_transition_cas', setup=pick_waiting_visit)
+def status_transition_cas(ctx, visit):
+    transition_visit(visit, Visit.VisitStatusEnum.AWAITING_CONSULTATION)
+
+
+@benchmark('visits.balance', setup=pick_visit)
+def balance(ctx, visit):
+    visit.balance
+
+
+@benchmark('visits.detail', setup=pick_visit)
+def detail(ctx, visit):
+    get_visit_detail(visit.pk)
+
+
+@benchmark('visits.timeline', setup=pick_patient)
+def timeline(ctx, patient):
+    list(
+        patient.visits.order_by('-created_at')
+        .prefetch_related(
+            'vital_signs',
+            'physical_exams',
+            'lab_results__results__test',
+            Prefetch('status_history'),
+        )[:20]
+    )
@@ -0,0 +1,120 @@
+"""
+Everything the consultation screen shows for one visit.
+
+The visit is read with its patient joined in, the charge and payment
+totals as correlated subqueries and the id of the latest vital sign as a
+subquery. Each related section is then loaded by one filtered Prefetch,
+so the number of queries does not depend on how many lab tests, results
+or medications the visit has.
+"""
+from django.db.models import Exists, OuterRef, Prefetch, Subquery
+
+from lab_requests.models import LabRequest, LabRequestTest
+from lab_results.models import LabResult, Result
+from physical_exams.models import PhysicalExam
+from prescriptions.models import Medication, Prescription
+from visits.models import Visit
+from vital_signs.models import VitalSign
+
+# The visit row, then one query per prefetch: latest vital sign, physical
+# exams, open lab requests and their tests, lab results and their results,
+# prescriptions and their medications. A nested prefetch is skipped when
+# its parent section is empty, so sparse visits take fewer.
+VISIT_DETAIL_QUERIES = 9
+
+PATIENT_FIELDS = ['id', 'first_name', 'last_name', 'date_of_birth', 'sex', 'weight', 'height', 'region', 'city']
+VISIT_FIELDS = ['id', 'created_at', 'visit_category', 'visit_status', 'current_status_since', 'chief_complaint']
+VITAL_SIGN_FIELDS = [
+    'id', 'created_at', 'bp_systolic', 'bp_diastolic', 'pulse_rate', 'respiratory_rate', 'temperature',
+    'temperature_unit', 'weight', 'weight_unit', 'height', 'height_unit', 'spo2', 'notes', 'recorded_by_id',
+]
+PHYSICAL_EXAM_FIELDS = [
+    'id', 'created_at', 'heent', 'chest', 'cardiovascular', 'abdomen', 'musculoskeletal', 'genitourinary',
+    'cns', 'miscellaneous', 'examined_by_id',
+]
+LAB_REQUEST_FIELDS = ['id', 'created_at', 'price', 'is_paid', 'ordered_by_id']
+TEST_FIELDS = ['id', 'name', 'test_type', 'unit_of_measurement', 'reference_min', 'reference_max']
+LAB_RESULT_FIELDS = ['id', 'created_at', 'lab_request_id', 'notes', 'reported_by_id']
+RESULT_FIELDS = ['id', 'created_at', 'value_numeric', 'value_categorical', 'notes']
+PRESCRIPTION_FIELDS = ['id', 'created_at', 'notes', 'prescribed_by_id']
+MEDICATION_FIELDS = ['id', 'name', 'strength', 'route', 'frequency', 'days', 'notes', 'formulary_item_id']
+
+
+def fields_of(instance, fields):
+    return {field: getattr(instance, field) for field in fields}
+
+
+def detail_queryset():
+    latest_vital_sign = VitalSign.objects.filter(visit=OuterRef('visit')).order_by('-created_at', '-id').values('pk')[:1]
+    has_result = LabResult.objects.filter(lab_request=OuterRef('pk'))
+    return (
+        Visit.objects.select_related('patient')
+        .with_financials()
+        .prefetch_related(
+            Prefetch(
+                'vital_signs',
+                queryset=VitalSign.objects.filter(pk=Subquery(latest_vital_sign)),
+                to_attr='latest_vital_signs',
+            ),
+            Prefetch('physical_exams', queryset=PhysicalExam.objects.order_by('created_at'), to_attr='active_physical_exams'),
+            Prefetch(
+                'lab_requests',
+                queryset=LabRequest.objects.filter(~Exists(has_result)).order_by('created_at').prefetch_related(
+                    Prefetch('tests', queryset=LabRequestTest.objects.select_related('test').order_by('id')),
+                ),
+                to_attr='open_lab_requests',
+            ),
+            Prefetch(
+                'lab_results',
+                queryset=LabResult.objects.order_by('created_at').prefetch_related(
+                    Prefetch('results', queryset=Result.objects.select_related('test').order_by('id')),
+                ),
+                to_attr='active_lab_results',
+            ),
+            Prefetch(
+                'prescription_set',
+                queryset=Prescription.objects.order_by('created_at').prefetch_related(
+                    Prefetch('medications', queryset=Medication.objects.order_by('id')),
+                ),
+                to_attr='active_prescriptions',
+            ),
+        )
+    )
+
+
+def get_visit_detail(visit_id):
+    """
+    Return the consultation view of a visit as plain data, read with
+    VISIT_DETAIL_QUERIES queries when every section has rows and fewer
+    otherwise. Lab requests without a lab result are the open ones. Returns
+    None for an unknown visit.
+    """
+    visit = detail_queryset().filter(pk=visit_id).first()
+    if visit is None:
+        return None
+
+    detail = fields_of(visit, VISIT_FIELDS)
+    detail['patient'] = fields_of(visit.patient, PATIENT_FIELDS)
+    vital_signs = visit.latest_vital_signs
+    detail['latest_vital_sign'] = fields_of(vital_signs[0], VITAL_SIGN_FIELDS) if vital_signs else None
+    detail['physical_exams'] = [fields_of(exam, PHYSICAL_EXAM_FIELDS) for exam in visit.active_physical_exams]
+    detail['open_lab_requests'] = [
+        {**fields_of(lab_request, LAB_REQUEST_FIELDS), 'tests': [fields_of(line.test, TEST_FIELDS) for line in lab_request.tests.all()]}
+        for lab_request in visit.open_lab_requests
+    ]
+    detail['lab_results'] = [
+        {
+            **fields_of(lab_result, LAB_RESULT_FIELDS),
+            'results': [
+                {**fields_of(result, RESULT_FIELDS), 'test': fields_of(result.test, TEST_FIELDS), 'is_abnormal': result.is_abnormal}
+                for result in lab_result.results.all()
+            ],
+        }
+        for lab_result in visit.active_lab_results
+    ]
+    detail['prescriptions'] = [
+        {**fields_of(prescription, PRESCRIPTION_FIELDS), 'medications': [fields_of(medication, MEDICATION_FIELDS) for medication in prescription.medications.all()]}
+        for prescription in visit.active_prescriptions
+    ]
+    detail['financials'] = {'total_charged': visit.total_charged, 'total_paid': visit.total_paid, 'balance': visit.balance}
+    return detail
@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.db import connection, connections, transaction
+
+from patients.models import Patient
+from visits.models import Visit, VisitStatusLog
+from visits.services import VisitStatusConflict, transition_visit
+
+# Each bench visit walks this chain, so every strategy has the same amount of work to do.
+CHAIN = [
+    Visit.VisitStatusEnum.AWAITING_PAYMENT,
+    Visit.VisitStatusEnum.AWAITING_VITALS,
+    Visit.VisitStatusEnum.AWAITING_CONSULTATION,
+    Visit.VisitStatusEnum.IN_CONSULTATION,
+]
+NEXT_STATUS = dict(zip(CHAIN, CHAIN[1:]))
+
+
+def save_row(visit_id, think):
+    """Read the visit, set its status and save the whole row; save() rejects stale versions."""
+    visit = Visit.objects.get(pk=visit_id)
+    if visit.visit_status not in NEXT_STATUS:
+        return False
+    think()
+    visit.visit_status = NEXT_STATUS[visit.visit_status]
+    visit.save()
+    return True
+
+
+def optimistic(visit_id, think):
+    visit = Visit.objects.get(pk=visit_id)
+    if visit.visit_status not in NEXT_STATUS:
+        return False
+    think()
+    transition_visit(visit, NEXT_STATUS[visit.visit_status], retries=0)
+    return True
+
+
+def pessimistic(visit_id, think):
+    """Lock the row for the whole read-think-write, serializing writers to the visit."""
+    with transaction.atomic():
+        visit = Visit.objects.select_for_update().get(pk=visit_id)
+        if visit.visit_status not in NEXT_STATUS:
+            return False
+        think()
+        visit.visit_status = NEXT_STATUS[visit.visit_status]
+        visit.save()
+    return True
+
+
+STRATEGIES = {'save': save_row, 'optimistic': optimistic, 'pessimistic': pessimistic}
+
+
+class Command(BaseCommand):
+    help = (
+        "Race --threads workers advancing the same --visits visits through "
+        f"{' -> '.join(status.value for status in CHAIN)} and compare version-checked saves, "
+        "compare-and-swap transitions and select_for_update. Reports throughput, "
+        "conflicts and lost updates (transitions a worker believed it made that "
+        "never happened). The bench rows are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--strategy', choices=[*STRATEGIES, 'all'], default='all')
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--visits', type=int, default=20)
+        parser.add_argument('--think-ms', type=float, default=5.0, help="Work done between reading a visit and writing it")
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        strategies = list(STRATEGIES) if options['strategy'] == 'all' else [options['strategy']]
+        if not connection.features.has_select_for_update and 'pessimistic' in strategies:
+            self.stderr.write(f"{connection.vendor} has no row locks; skipping the pessimistic strategy.")
+            strategies.remove('pessimistic')
+        self.stdout.write(
+            f"{'strategy':<12} {'transitions':>11} {'claimed':>8} {'lost':>5} {'conflicts':>9} {'seconds':>8} {'per_s':>8}"
+        )
+        patient = Patient.objects.create(
+            first_name='Bench',
+            last_name='Patient',
+            date_of_birth=date(1990, 1, 1),
+            sex=Patient.SexEnum.FEMALE,
+            region=Patient.RegionEnum.ADDIS_ABABA,
+            city='Addis Ababa',
+        )
+        try:
+            for name in strategies:
+                self.run_strategy(name, patient, options)
+        finally:
+            visits = Visit.objects.filter(patient=patient)
+            VisitStatusLog.objects.filter(visit__in=visits).delete()
+            visits.delete()
+            Patient.all_objects.filter(pk=patient.pk).delete()
+
+    def run_strategy(self, name, patient, options):
+        visit_ids = [
+            visit.pk for visit in Visit.objects.bulk_create([
+                Visit(patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=CHAIN[0])
+                for _ in range(options['visits'])
+            ])
+        ]
+        attempt = STRATEGIES[name]
+        think_seconds = options['think_ms'] / 1000
+        counts = Counter()
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            pending = list(visit_ids)
+            local = Counter()
+            try:
+                while pending:
+                    visit_id = rng.choice(pending)
+                    try:
+                        advanced = attempt(visit_id, lambda: time.sleep(think_seconds))
+                    except VisitStatusConflict:
+                        local['conflicts'] += 1
+                        continue
+                    if advanced:
+                        local['claimed'] += 1
+                    else:
+                        pending.remove(visit_id)
+            finally:
+                connections.close_all()
+                with lock:
+                    counts.update(local)
+
+        threads = [threading.Thread(target=worker, args=(options['seed'] + i,)) for i in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        seconds = time.perf_counter() - started
+
+        transitions = len(visit_ids) * (len(CHAIN) - 1)
+        self.stdout.write(
+            f"{name:<12} {transitions:>11} {counts['claimed']:>8} {counts['claimed'] - transitions:>5} "
+            f"{counts['conflicts']:>9} {seconds:>8.2f} {transitions / seconds:>8.1f}"
+        )
@@ -0,0 +1,203 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils import timezone
+
+from appointments.models import Appointment
+from lab_requests.models import LabRequest, LabRequestTest, Test, TestGroup
+from lab_results.models import LabResult, Result
+from lab_results.worklist import outstanding_tests
+from patients.models import Patient
+from physical_exams.models import PhysicalExam
+from prescriptions.models import Medication, Prescription
+from staff.models import Staff
+from visits.models import Visit
+from vital_signs.models import VitalSign
+
+
+# Child rows seeded per parent; the first child of every parent is soft-deleted.
+FAN_OUT = 4
+
+INDEX_MARKERS = {
+    'postgresql': ('Index Scan', 'Index Only Scan', 'Bitmap Index Scan'),
+    'sqlite': ('USING INDEX', 'USING COVERING INDEX'),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway dataset, run EXPLAIN on the hot soft-delete queries and fail "
+        "if any of them does not use its partial is_active index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--rows', type=int, default=1000, help="Number of patients and visits to seed.")
+        parser.add_argument('--keep', action='store_true', help="Keep the seeded rows instead of rolling back.")
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        markers = INDEX_MARKERS.get(connection.vendor)
+        if markers is None:
+            raise CommandError(f"EXPLAIN checks are not supported on {connection.vendor}.")
+
+        failures = []
+        with transaction.atomic(using=alias):
+            sample = self.seed(alias, options['rows'])
+            self.analyze(connection)
+            for label, queryset, index_name in self.get_queries(alias, sample):
+                plan = queryset.explain()
+                uses_index = any(marker in plan for marker in markers) and index_name in plan
+                status = 'OK' if uses_index else 'FAIL'
+                self.stdout.write(f"[{status}] {label} ({index_name})")
+                if not uses_index:
+                    failures.append(label)
+                    self.stdout.write(plan)
+            if not options['keep']:
+                transaction.set_rollback(True, using=alias)
+
+        if failures:
+            raise CommandError(f"{len(failures)} queries did not use their partial index: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("All hot queries use their partial indexes."))
+
+    def analyze(self, connection):
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def seed(self, alias, rows):
+        now = timezone.now()
+        staff = Staff.objects.db_manager(alias).create(
+            username=f'explain-{now.timestamp()}',
+            role=Staff.RoleEnum.DOCTOR,
+        )
+        patients = Patient.objects.db_manager(alias).bulk_create([
+            Patient(
+                first_name=f'First{i}',
+                last_name=f'Last{i}',
+                date_of_birth=date(1980, 1, 1) + timedelta(days=i % 9000),
+                sex=Patient.SexEnum.FEMALE if i % 2 else Patient.SexEnum.MALE,
+                region=Patient.RegionEnum.ADDIS_ABABA,
+                city='Addis Ababa',
+                is_active=i % 10 != 0,
+            )
+            for i in range(rows)
+        ])
+        visits = Visit.objects.db_manager(alias).bulk_create([
+            Visit(
+                patient=patient,
+                visit_category=Visit.VisitCategoryEnum.HISTORY_AND_PHYSICAL,
+                visit_status=Visit.VisitStatusEnum.COMPLETED,
+            )
+            for patient in patients
+        ])
+        group = TestGroup.objects.db_manager(alias).create(name='Hematology', price=Decimal('100.00'), created_by=staff)
+        tests = Test.objects.db_manager(alias).bulk_create([
+            Test(name=f'Test {i}', price=Decimal('25.00'), test_type=Test.TestTypeEnum.NUMERICAL, test_group=group, created_by=staff)
+            for i in range(20)
+        ])
+        lab_requests = LabRequest.objects.db_manager(alias).bulk_create([
+            LabRequest(visit=visit, ordered_by=staff, is_active=j != 0)
+            for visit in visits
+            for j in range(FAN_OUT)
+        ])
+        LabRequestTest.objects.db_manager(alias).bulk_create([
+            LabRequestTest(lab_request=lab_request, test=tests[(i + j) % len(tests)], ordered_by=staff, price=Decimal('25.00'))
+            for i, lab_request in enumerate(lab_requests)
+            for j in range(FAN_OUT)
+        ])
+        lab_results = LabResult.objects.db_manager(alias).bulk_create([
+            LabResult(lab_request=lab_request, visit=lab_request.visit, reported_by=staff, is_active=j != 0)
+            for lab_request in lab_requests
+            for j in range(FAN_OUT)
+        ])
+        Result.objects.db_manager(alias).bulk_create([
+            Result(
+                lab_result=lab_result,
+                test=tests[i % len(tests)],
+                reported_by=staff,
+                value_numeric=Decimal('4.20'),
+                value_categorical=Result.CategoricalEnum.NEGATIVE,
+                is_active=j != 0,
+            )
+            for i, lab_result in enumerate(lab_results)
+            for j in range(FAN_OUT)
+        ])
+        prescriptions = Prescription.objects.db_manager(alias).bulk_create([
+            Prescription(visit=visit, prescribed_by=staff, is_active=j != 0)
+            for visit in visits
+            for j in range(FAN_OUT)
+        ])
+        Medication.objects.db_manager(alias).bulk_create([
+            Medication(
+                prescription=prescription,
+                prescribed_by=staff,
+                name=f'Drug {i % 100}',
+                strength='500mg',
+                route=Medication.RouteEnum.ORAL,
+                frequency=Medication.FrequencyEnum.TID,
+                days=7,
+                is_active=j != 0,
+            )
+            for i, prescription in enumerate(prescriptions)
+            for j in range(FAN_OUT)
+        ])
+        VitalSign.objects.db_manager(alias).bulk_create([
+            VitalSign(visit=visit, recorded_by=staff, pulse_rate=72, is_active=j != 0)
+            for visit in visits
+            for j in range(FAN_OUT)
+        ])
+        PhysicalExam.objects.db_manager(alias).bulk_create([
+            PhysicalExam(visit=visit, examined_by=staff, is_active=j != 0)
+            for visit in visits
+            for j in range(FAN_OUT)
+        ])
+        Appointment.objects.db_manager(alias).bulk_create([
+            Appointment(
+                patient=visit.patient,
+                visit=visit,
+                scheduled_by=staff,
+                scheduled_for=now + timedelta(hours=i, days=j),
+                ends_at=now + timedelta(hours=i, days=j, minutes=30),
+                is_active=j != 0,
+            )
+            for i, visit in enumerate(visits)
+            for j in range(FAN_OUT)
+        ])
+        return {
+            'staff': staff,
+            'group': group,
+            'test': tests[0],
+            'patient': patients[1],
+            'visit': visits[1],
+            'lab_request': lab_requests[1],
+            'lab_result': lab_results[1],
+            'prescription': prescriptions[1],
+        }
+
+    def get_queries(self, alias, sample):
+        now = timezone.now()
+        return [
+            ('recent patients', Patient.objects.using(alias).order_by('-created_at')[:50], 'patient_created_active_idx'),
+            ('patient name lookup', Patient.objects.using(alias).filter(last_name='Last1', first_name='First1'), 'patient_name_active_idx'),
+            ('doctors by role', Staff.objects.using(alias).active().filter(role=Staff.RoleEnum.DOCTOR).order_by('created_at'), 'staff_role_active_idx'),
+            ('tests in group', Test.objects.using(alias).filter(test_group=sample['group']).order_by('created_at'), 'test_group_active_idx'),
+            ('visit lab requests', LabRequest.objects.using(alias).filter(visit=sample['visit']).order_by('-created_at'), 'labreq_visit_active_idx'),
+            ('lab request tests', LabRequestTest.objects.using(alias).filter(lab_request=sample['lab_request']).order_by('created_at'), 'labreqtest_req_active_idx'),
+            ('test order history', LabRequestTest.objects.using(alias).filter(test=sample['test']).order_by('-created_at')[:50], 'labreqtest_test_active_idx'),
+            ('lab request results', LabResult.objects.using(alias).filter(lab_request=sample['lab_request']).order_by('-created_at'), 'labresult_req_active_idx'),
+            ('visit lab results', LabResult.objects.using(alias).filter(visit=sample['visit']).order_by('-created_at'), 'labresult_visit_active_idx'),
+            ('result lines', Result.objects.using(alias).filter(lab_result=sample['lab_result']).order_by('created_at'), 'result_labresult_active_idx'),
+            ('test result history', Result.objects.using(alias).filter(test=sample['test']).order_by('-created_at')[:50], 'result_test_active_idx'),
+            ('visit prescriptions', Prescription.objects.using(alias).filter(visit=sample['visit']).order_by('-created_at'), 'prescription_visit_active_idx'),
+            ('prescription medications', Medication.objects.using(alias).filter(prescription=sample['prescription']).order_by('created_at'), 'medication_rx_active_idx'),
+            ('current medication', Medication.objects.using(alias).current().filter(name='Drug 1'), 'medication_course_end_idx'),
+            ('visit vital signs', VitalSign.objects.using(alias).filter(visit=sample['visit']).order_by('-created_at'), 'vitalsign_visit_active_idx'),
+            ('visit physical exams', PhysicalExam.objects.using(alias).filter(visit=sample['visit']).order_by('-created_at'), 'physexam_visit_active_idx'),
+            ('patient appointments', Appointment.objects.using(alias).filter(patient=sample['patient']).order_by('scheduled_for'), 'appt_patient_active_idx'),
+            ('lab worklist lab results', outstanding_tests().using(alias), 'labresult_req_active_idx'),
+            ('lab worklist results', outstanding_tests().using(alias), 'result_labresult_test_idx'),
+            ('upcoming appointments', Appointment.objects.using(alias).filter(scheduled_for__gte=now, scheduled_for__lt=now + timedelta(days=1)).order_by('scheduled_for'), 'appt_scheduled_active_idx'),
+        ]
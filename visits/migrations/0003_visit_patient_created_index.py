@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_active_partial_indexes'),
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['patient', 'created_at'], name='visit_patient_created_idx'),
+        ),
+    ]
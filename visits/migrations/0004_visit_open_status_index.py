@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0002_active_partial_indexes'),
+        ('visits', '0003_visit_patient_created_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(condition=models.Q(('visit_status__in', ['FIN', 'CAN']), _negated=True), fields=['visit_status', 'current_status_since'], name='visit_open_status_idx'),
+        ),
+    ]
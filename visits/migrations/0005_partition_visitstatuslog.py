@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from partitions.postgres import partition_table, unpartition_table
+
+
+def partition_visitstatuslog(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    VisitStatusLog = apps.get_model('visits', 'VisitStatusLog')
+    partition_table(schema_editor.connection, VisitStatusLog._meta.db_table, 'changed_at')
+
+
+def unpartition_visitstatuslog(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    VisitStatusLog = apps.get_model('visits', 'VisitStatusLog')
+    unpartition_table(schema_editor.connection, VisitStatusLog._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0004_visit_open_status_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_visitstatuslog, unpartition_visitstatuslog),
+    ]
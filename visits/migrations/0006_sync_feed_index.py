@@ -0,0 +1,24 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:06
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('patients', '0003_sync_feed_index'),
+        ('visits', '0005_partition_visitstatuslog'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='visit',
+            index=models.Index(fields=['updated_at', 'id'], name='visit_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='visitstatuslog',
+            index=models.Index(fields=['updated_at', 'id'], name='visitstatuslog_updated_idx'),
+        ),
+    ]
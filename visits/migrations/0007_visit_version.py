@@ -0,0 +1,18 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0006_sync_feed_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='visit',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False, help_text='Bumped on every write so concurrent status changes can detect each other'),
+        ),
+    ]
@@ -1,23 +1,51 @@
 from decimal import Decimal
 
-from django.db import models
-from django.db.models import Sum, Value, F
+from django.core.exceptions import ValidationError
+from django.db import models, router, transaction
+from django.db.models import OuterRef, Subquery, Sum, Value, F, Q
 from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django_enum import EnumField
 
 from patients.models import Patient
 from staff.models import Staff
 
 
+# Charges in these states stay on record but are not owed.
+NON_BILLABLE_CHARGE_STATUSES = ['CANCELLED', 'WAIVED']
+
+# Visits in these states have left the clinic queue.
+CLOSED_VISIT_STATUSES = ['FIN', 'CAN']
+
+
 # Create your models here.
+class VisitStatusConflict(ValidationError):
+    """Another writer changed the visit first and the transition no longer applies."""
+
+
 class VisitQuerySet(models.QuerySet):
     def with_financials(self):
+        """
+        Annotate total_charged, total_paid and balance with one correlated
+        subquery per table, so charges and payments are never joined against
+        each other and the sums cannot fan out.
+        """
+        charges = self.model._meta.get_field('charges').related_model
+        payments = self.model._meta.get_field('payments').related_model
+        charged = (
+            charges.objects.filter(visit=OuterRef('pk'))
+            .exclude(charge_status__in=NON_BILLABLE_CHARGE_STATUSES)
+            .values('visit').annotate(total=Sum('amount')).values('total')
+        )
+        paid = payments.objects.filter(visit=OuterRef('pk')).values('visit').annotate(total=Sum('amount')).values('total')
         return self.annotate(
-            total_charged=Coalesce(Sum("charges__amount"), Value(Decimal("0.00"))),
-            total_paid=Coalesce(Sum("payments__amount"), Value(Decimal("0.00"))),
+            total_charged=Coalesce(Subquery(charged), Value(Decimal("0.00"))),
+            total_paid=Coalesce(Subquery(paid), Value(Decimal("0.00"))),
         ).annotate(
             balance=F("total_charged") - F("total_paid"),
         )
+
+
 class Visit(models.Model):
     class VisitCategoryEnum(models.TextChoices):
         HISTORY_AND_PHYSICAL = 'HISTORY_AND_PHYSICAL', 'History and Physical'
@@ -44,6 +72,7 @@ class Visit(models.Model):
     visit_status = EnumField(VisitStatusEnum, editable=False)
     chief_complaint = models.TextField(blank=True)
     current_status_since = models.DateTimeField(auto_now_add=True)
+    version = models.PositiveIntegerField(default=1, editable=False, help_text="Bumped on every write so concurrent status changes can detect each other")
 
     patient = models.ForeignKey(
         Patient,
@@ -53,22 +82,106 @@ class Visit(models.Model):
 
     objects = VisitQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['patient', 'created_at'], name='visit_patient_created_idx'),
+            models.Index(
+                fields=['visit_status', 'current_status_since'],
+                name='visit_open_status_idx',
+                condition=~Q(visit_status__in=CLOSED_VISIT_STATUSES),
+            ),
+            models.Index(fields=['updated_at', 'id'], name='visit_updated_idx'),
+        ]
+
+    # with_financials() stores its annotations in the instance __dict__
+    # through the setters below; the properties only aggregate when the
+    # visit was loaded without them.
     @property
     def total_charged(self):
-        return self.charges.aggregate(
+        if 'total_charged' in self.__dict__:
+            return self.__dict__['total_charged']
+        return self.charges.exclude(charge_status__in=NON_BILLABLE_CHARGE_STATUSES).aggregate(
             total=Sum("amount")
         )['total'] or Decimal("0.00")
 
+    @total_charged.setter
+    def total_charged(self, value):
+        self.__dict__['total_charged'] = value
+
     @property
     def total_paid(self):
+        if 'total_paid' in self.__dict__:
+            return self.__dict__['total_paid']
         return self.payments.aggregate(
             total=Sum("amount")
         )['total'] or Decimal("0.00")
 
+    @total_paid.setter
+    def total_paid(self, value):
+        self.__dict__['total_paid'] = value
+
     @property
     def balance(self):
+        if 'balance' in self.__dict__:
+            return self.__dict__['balance']
         return self.total_charged - self.total_paid
 
+    @balance.setter
+    def balance(self, value):
+        self.__dict__['balance'] = value
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'visit_status' in field_names:
+            instance._loaded_status = values[field_names.index('visit_status')]
+        return instance
+
+    @property
+    def status_changed(self):
+        """Whether visit_status differs from the value last read from or written to the database."""
+        return getattr(self, '_loaded_status', None) != self.visit_status
+
+    def save(self, *args, **kwargs):
+        """
+        Existing visits are only written while the row still has the version
+        this instance was read with; when another writer saved the visit in
+        between, nothing is written and VisitStatusConflict is raised.
+        """
+        update_fields = kwargs.get('update_fields')
+        if not self._state.adding:
+            expected_version, status_since = self.version, self.current_status_since
+            self.version += 1
+            changed = {'version'}
+            if self.status_changed and (update_fields is None or 'visit_status' in update_fields):
+                self.current_status_since = timezone.now()
+                changed.add('current_status_since')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, *changed}
+            if not kwargs.get('force_insert'):
+                kwargs['force_update'] = True
+            # A savepoint, so a conflict leaves the caller's transaction usable.
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            try:
+                with transaction.atomic(using=using):
+                    super().save(*args, **kwargs)
+            except self.NotUpdated:
+                self.version, self.current_status_since = expected_version, status_since
+                raise VisitStatusConflict(
+                    f"Visit {self.pk} was changed or removed after it was read at version {expected_version}."
+                ) from None
+        else:
+            super().save(*args, **kwargs)
+        if update_fields is None or 'visit_status' in update_fields:
+            self._loaded_status = self.visit_status
+
+    def _do_update(self, base_qs, using, pk_val, values, update_fields, forced_update, returning_fields):
+        # save() has already bumped version; only the row still at the
+        # version before that is written.
+        return super()._do_update(
+            base_qs.filter(version=self.version - 1), using, pk_val, values, update_fields, forced_update, returning_fields,
+        )
+
     def get_valid_transitions(self):
         return {
             self.VisitStatusEnum.AWAITING_PAYMENT: self.VisitStatusEnum.AWAITING_VITALS,
@@ -79,19 +192,21 @@ class Visit(models.Model):
             self.VisitStatusEnum.AWAITING_REVIEW: self.VisitStatusEnum.COMPLETED,
         }
 
-    def advance_status(self, new_status):
-        valid_transitions = self.get_valid_transitions()
+    def advance_status(self, new_status, changed_by=None):
+        """Move the visit to `new_status` through transition_visit(); see there for conflicts."""
+        from visits.services import transition_visit
 
-        if new_status == self.VisitStatusEnum.CANCELLED:
-             if self.visit_status != self.VisitStatusEnum.COMPLETED:
-                 self.visit_status = new_status
-        elif new_status == valid_transitions[self.visit_status]:
-            self.visit_status = new_status
+        return transition_visit(self, new_status, changed_by=changed_by)
 
-    def transition_to_next_status(self):
-        valid_transitions = self.get_valid_transitions()
-        if self.visit_status != self.VisitStatusEnum.COMPLETED:
-            self.visit_status = valid_transitions[self.visit_status]
+    def transition_to_next_status(self, changed_by=None):
+        next_status = self.get_valid_transitions().get(self.visit_status)
+        if next_status is None:
+            if self.visit_status == self.VisitStatusEnum.COMPLETED:
+                return self
+            raise VisitStatusConflict(
+                f"Visit {self.pk} is {self.VisitStatusEnum(self.visit_status).label}; it has no next status."
+            )
+        return self.advance_status(next_status, changed_by=changed_by)
 
     def __str__(self):
         return f"{self.patient.fullname} - {self.visit_status.label}"
@@ -115,4 +230,7 @@ class VisitStatusLog(models.Model):
     )
 
     class Meta:
-        ordering = ['-changed_at']
\ No newline at end of file
+        ordering = ['-changed_at']
+        indexes = [
+            models.Index(fields=['updated_at', 'id'], name='visitstatuslog_updated_idx'),
+        ]
\ No newline at end of file
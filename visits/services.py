@@ -0,0 +1,80 @@
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from audit.trail import current_actor_id
+from charges.services import materialize_consultation_charge
+from monitoring.metrics import VISIT_STATUS_TRANSITIONS
+from patients.chart import invalidate_patient_charts
+from visits.models import Visit, VisitStatusConflict, VisitStatusLog
+
+
+def check_in_patient(patient, visit_category, chief_complaint=''):
+    """
+    Open a visit for `patient`. Patients who owe a visit fee start in the
+    payment queue, the others go straight to vitals; the consultation charge
+    is written in the same transaction.
+    """
+    needs_to_pay = patient.needs_to_pay_visit_fee()
+    with transaction.atomic():
+        visit = Visit.objects.create(
+            patient=patient,
+            visit_category=visit_category,
+            chief_complaint=chief_complaint,
+            visit_status=Visit.VisitStatusEnum.AWAITING_PAYMENT if needs_to_pay else Visit.VisitStatusEnum.AWAITING_VITALS,
+        )
+        materialize_consultation_charge(visit, needs_to_pay=needs_to_pay)
+    return visit
+
+
+def is_valid_transition(visit, current_status, new_status):
+    if new_status == Visit.VisitStatusEnum.CANCELLED:
+        return current_status not in (Visit.VisitStatusEnum.COMPLETED, Visit.VisitStatusEnum.CANCELLED)
+    return visit.get_valid_transitions().get(current_status) == new_status
+
+
+def transition_visit(visit, new_status, changed_by=None, retries=None):
+    """
+    Move `visit` to `new_status` with a compare-and-swap UPDATE that only
+    matches while the row still has the status and version `visit` was read
+    with; no row lock is held between reading the visit and writing it.
+
+    When another writer got there first, the visit's current status and
+    version are read again and the update is retried, at most `retries`
+    times, as long as the transition is still valid from the new status.
+    Otherwise VisitStatusConflict is raised. On success `visit` is updated
+    in place and returned. The change is logged as made by `changed_by`,
+    by default the staff member of the audit context.
+    """
+    retries = settings.VISIT_TRANSITION_RETRIES if retries is None else retries
+    changed_by_id = changed_by.pk if changed_by is not None else current_actor_id()
+    new_status = Visit.VisitStatusEnum(new_status)
+    status, version = visit.visit_status, visit.version
+    for _ in range(retries + 1):
+        if not is_valid_transition(visit, status, new_status):
+            raise VisitStatusConflict(
+                f"Visit {visit.pk} is {Visit.VisitStatusEnum(status).label}; it cannot move to {new_status.label}."
+            )
+        now = timezone.now()
+        with transaction.atomic():
+            swapped = Visit.objects.filter(pk=visit.pk, visit_status=status, version=version).update(
+                visit_status=new_status,
+                version=version + 1,
+                current_status_since=now,
+                updated_at=now,
+            )
+            if swapped:
+                VisitStatusLog.objects.create(visit_id=visit.pk, status=new_status, changed_by_id=changed_by_id)
+                invalidate_patient_charts([visit.patient_id])
+        if swapped:
+            VISIT_STATUS_TRANSITIONS.inc(status=new_status.value)
+            visit.visit_status = visit._loaded_status = new_status
+            visit.version = version + 1
+            visit.current_status_since = visit.updated_at = now
+            return visit
+
+        current = Visit.objects.filter(pk=visit.pk).values_list('visit_status', 'version').first()
+        if current is None:
+            raise VisitStatusConflict(f"Visit {visit.pk} no longer exists.")
+        status, version = current
+    raise VisitStatusConflict(f"Visit {visit.pk} kept changing; gave up after {retries + 1} attempts.")
@@ -1,17 +1,29 @@
 from django.db.models.signals import post_save
-from django.utils import timezone
 from django.dispatch import receiver
 
-from visits.models import Visit, VisitStatusLog
+from audit.trail import current_actor_id
+from jobs.queue import enqueue
+from monitoring.metrics import VISIT_STATUS_TRANSITIONS
+from visits.models import Visit
 
 
 @receiver(post_save, sender=Visit)
-def create_status_log(_, instance, created, **kwargs):
-    last_log = instance.status_history.first()
-
-    if created or (last_log and last_log.status != instance.visit_status):
-        VisitStatusLog.objects.create(
-            visit=instance,
-            status=instance.visit_status,
+def queue_status_log(sender, instance, created, using, update_fields, **kwargs):
+    # Visit.save() has already moved current_status_since; the log itself
+    # is written by a task worker once the save commits, so the transition
+    # is counted here, in the process that serves /metrics.
+    if update_fields is not None and 'visit_status' not in update_fields:
+        return
+    if instance.status_changed:
+        enqueue(
+            'visits.record_status',
+            # isoformat() keeps the microseconds DjangoJSONEncoder would drop.
+            {
+                'visit_id': instance.pk,
+                'status': instance.visit_status,
+                'changed_at': instance.current_status_since.isoformat(),
+                'changed_by': current_actor_id(),
+            },
+            using=using,
         )
-        Visit.objects.filter(pk=instance.pk).update(current_status_since=timezone.now())
\ No newline at end of file
+        VISIT_STATUS_TRANSITIONS.inc(status=Visit.VisitStatusEnum(instance.visit_status).value)
@@ -0,0 +1,21 @@
+from django.utils.dateparse import parse_datetime
+
+from jobs.queue import task
+from visits.models import Visit, VisitStatusLog
+
+
+@task('visits.record_status')
+def record_status(visit_id, status, changed_at, changed_by=None):
+    """
+    Log a status change saved through Visit.save() by the staff member
+    `changed_by`. Running it twice logs the change once; a visit deleted in
+    the meantime is not logged.
+    """
+    changed_at = parse_datetime(changed_at)
+    if not Visit.objects.filter(pk=visit_id).exists():
+        return
+    if VisitStatusLog.objects.filter(visit_id=visit_id, status=status, changed_at=changed_at).exists():
+        return
+    log = VisitStatusLog.objects.create(visit_id=visit_id, status=status, changed_by_id=changed_by)
+    # changed_at is auto_now; keep the time of the change, not of the task.
+    VisitStatusLog.objects.filter(pk=log.pk).update(changed_at=changed_at)
@@ -1,3 +1,219 @@
-from django.test import TestCase
+import io
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connections
+from django.http import Http404
+from django.test import RequestFactory, TestCase, TransactionTestCase, skipUnlessDBFeature
+
+from lab_requests.models import Test, TestGroup
+from lab_requests.services import create_lab_request
+from lab_results.ingestion import ingest_batch, parse_batch
+from patients.models import Patient
+from physical_exams.models import PhysicalExam
+from prescriptions.models import Medication, Prescription
+from staff.models import Staff
+from visits.detail import VISIT_DETAIL_QUERIES, get_visit_detail
+from visits.models import Visit, VisitStatusConflict, VisitStatusLog
+from visits.services import transition_visit
+from visits.views import visit_detail
+from vital_signs.models import VitalSign
 
 # Create your tests here.
+Status = Visit.VisitStatusEnum
+
+
+def create_visit(status=Status.AWAITING_VITALS):
+    patient = Patient.objects.create(
+        first_name='Test',
+        last_name='Patient',
+        date_of_birth=date(1990, 1, 1),
+        sex=Patient.SexEnum.FEMALE,
+        region=Patient.RegionEnum.ADDIS_ABABA,
+        city='Addis Ababa',
+    )
+    return Visit.objects.create(patient=patient, visit_category=Visit.VisitCategoryEnum.PROGRESS_NOTE, visit_status=status)
+
+
+class VisitSaveTests(TestCase):
+    def test_save_bumps_version(self):
+        visit = create_visit()
+        visit.chief_complaint = 'Headache'
+        visit.save()
+        self.assertEqual(visit.version, 2)
+        self.assertEqual(Visit.objects.get(pk=visit.pk).version, 2)
+
+    def test_stale_save_raises_conflict(self):
+        visit = create_visit()
+        stale = Visit.objects.get(pk=visit.pk)
+        transition_visit(visit, Status.AWAITING_CONSULTATION)
+
+        stale.visit_status = Status.CANCELLED
+        with self.assertRaises(VisitStatusConflict):
+            stale.save()
+        self.assertEqual(stale.version, 1)
+        current = Visit.objects.get(pk=visit.pk)
+        self.assertEqual((current.visit_status, current.version), (Status.AWAITING_CONSULTATION, 2))
+
+    def test_save_of_deleted_visit_raises_conflict(self):
+        visit = create_visit()
+        stale = Visit.objects.get(pk=visit.pk)
+        visit.delete()
+        with self.assertRaises(VisitStatusConflict):
+            stale.save()
+        self.assertFalse(Visit.objects.filter(pk=visit.pk).exists())
+
+    def test_advance_status_persists_and_logs(self):
+        visit = create_visit()
+        visit.advance_status(Status.AWAITING_CONSULTATION)
+        self.assertEqual(Visit.objects.get(pk=visit.pk).visit_status, Status.AWAITING_CONSULTATION)
+        self.assertEqual(VisitStatusLog.objects.filter(visit=visit, status=Status.AWAITING_CONSULTATION).count(), 1)
+
+    def test_advance_status_rejects_invalid_transition(self):
+        visit = create_visit()
+        with self.assertRaises(VisitStatusConflict):
+            visit.advance_status(Status.COMPLETED)
+        self.assertEqual(Visit.objects.get(pk=visit.pk).visit_status, Status.AWAITING_VITALS)
+
+    def test_transition_to_next_status_stops_at_completed(self):
+        visit = create_visit(Status.AWAITING_REVIEW)
+        visit.transition_to_next_status()
+        visit.transition_to_next_status()
+        self.assertEqual(Visit.objects.get(pk=visit.pk).visit_status, Status.COMPLETED)
+        self.assertEqual(visit.version, 2)
+
+
+class VisitDetailTests(TestCase):
+    """A visit waiting for its lab sample: vitals, an exam and an open lab request, no results or prescriptions yet."""
+    # The nested prefetches of lab results and prescriptions are skipped
+    # while the visit has none.
+    queries = VISIT_DETAIL_QUERIES - 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctor = Staff.objects.create_user(username='doctor', role=Staff.RoleEnum.DOCTOR)
+        cls.visit = create_visit(Status.AWAITING_LAB_SAMPLE)
+        group = TestGroup.objects.create(name='Chemistry', price=Decimal('100.00'), created_by=cls.doctor)
+        cls.tests = [
+            Test.objects.create(
+                name=name, test_type=Test.TestTypeEnum.NUMERICAL, test_group=group, created_by=cls.doctor,
+                reference_min=Decimal('3.50'), reference_max=Decimal('5.50'),
+            )
+            for name in ('Potassium', 'Sodium', 'Glucose')
+        ]
+        VitalSign.objects.create(visit=cls.visit, recorded_by=cls.doctor, pulse_rate=72)
+        PhysicalExam.objects.create(visit=cls.visit, examined_by=cls.doctor, chest='Clear')
+        cls.lab_request = create_lab_request(cls.visit, cls.doctor, cls.tests[:2])
+
+    def test_detail_sections(self):
+        detail = get_visit_detail(self.visit.pk)
+        self.assertEqual(detail['latest_vital_sign']['pulse_rate'], 72)
+        self.assertEqual(len(detail['physical_exams']), 1)
+        self.assertEqual([test['name'] for test in detail['open_lab_requests'][0]['tests']], ['Potassium', 'Sodium'])
+        self.assertEqual(detail['lab_results'], [])
+        self.assertEqual(detail['prescriptions'], [])
+
+    def test_query_count(self):
+        with self.assertNumQueries(self.queries):
+            get_visit_detail(self.visit.pk)
+
+    def test_query_count_does_not_grow_with_the_visit(self):
+        for pulse_rate in (80, 90):
+            VitalSign.objects.create(visit=self.visit, recorded_by=self.doctor, pulse_rate=pulse_rate)
+        PhysicalExam.objects.create(visit=self.visit, examined_by=self.doctor, abdomen='Soft')
+        create_lab_request(self.visit, self.doctor, self.tests)
+        with self.assertNumQueries(self.queries):
+            detail = get_visit_detail(self.visit.pk)
+        self.assertEqual(detail['latest_vital_sign']['pulse_rate'], 90)
+        self.assertEqual([len(lab_request['tests']) for lab_request in detail['open_lab_requests']], [2, 3])
+
+    def test_query_count_with_every_section(self):
+        rows = [f'{self.lab_request.pk},{test.name},4.1' for test in self.tests[:2]]
+        ingest_batch(list(parse_batch(io.StringIO('\n'.join(['sample_id,test,value', *rows])))), self.doctor)
+        create_lab_request(self.visit, self.doctor, self.tests[2:])
+        prescription = Prescription.objects.create(prescribed_by=self.doctor, visit=self.visit)
+        Medication.objects.create(
+            name='Amoxicillin', strength='500mg capsule', route=Medication.RouteEnum.ORAL,
+            frequency=Medication.FrequencyEnum.TID, days=5, prescribed_by=self.doctor, prescription=prescription,
+        )
+        with self.assertNumQueries(VISIT_DETAIL_QUERIES):
+            detail = get_visit_detail(self.visit.pk)
+        self.assertEqual([test['name'] for test in detail['open_lab_requests'][0]['tests']], ['Glucose'])
+        self.assertEqual(len(detail['lab_results']), 1)
+        self.assertEqual(len(detail['prescriptions']), 1)
+
+    def test_view_query_count(self):
+        request = RequestFactory().get(f'/visits/{self.visit.pk}/detail')
+        request.user = self.doctor
+        with self.assertNumQueries(self.queries):
+            response = visit_detail(request, self.visit.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['id'], self.visit.pk)
+
+    def test_view_unknown_visit(self):
+        request = RequestFactory().get('/visits/0/detail')
+        request.user = self.doctor
+        with self.assertRaises(Http404):
+            visit_detail(request, 0)
+
+
+class ActiveIndexTests(TestCase):
+    def test_hot_queries_use_partial_indexes(self):
+        # Raises CommandError, with the offending plans in the output, when a
+        # soft-delete query stops using its partial is_active index.
+        stdout = io.StringIO()
+        call_command('explain_active_queries', rows=200, stdout=stdout)
+        self.assertIn("All hot queries use their partial indexes.", stdout.getvalue())
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class VisitContentionTests(TransactionTestCase):
+    """Writers that all read the same visit before any of them writes it."""
+    threads = 8
+
+    def race(self, attempt):
+        visit = create_visit()
+        barrier = threading.Barrier(self.threads)
+        outcomes = []
+        lock = threading.Lock()
+
+        def worker():
+            try:
+                stale = Visit.objects.get(pk=visit.pk)
+                barrier.wait()
+                try:
+                    attempt(stale)
+                    outcome = 'applied'
+                except VisitStatusConflict:
+                    outcome = 'conflict'
+                except Exception as exc:
+                    outcome = repr(exc)
+                with lock:
+                    outcomes.append(outcome)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(self.threads)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(outcomes), ['applied'] + ['conflict'] * (self.threads - 1))
+        visit.refresh_from_db()
+        return visit
+
+    def test_concurrent_transitions_apply_once(self):
+        visit = self.race(lambda stale: transition_visit(stale, Status.AWAITING_CONSULTATION))
+        self.assertEqual((visit.visit_status, visit.version), (Status.AWAITING_CONSULTATION, 2))
+        self.assertEqual(VisitStatusLog.objects.filter(visit=visit).count(), 1)
+
+    def test_concurrent_saves_apply_once(self):
+        def save(stale):
+            stale.visit_status = Status.AWAITING_CONSULTATION
+            stale.save()
+
+        visit = self.race(save)
+        self.assertEqual((visit.visit_status, visit.version), (Status.AWAITING_CONSULTATION, 2))
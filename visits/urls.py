@@ -0,0 +1,7 @@
+from django.urls import path
+
+from visits import views
+
+urlpatterns = [
+    path('visits/<int:pk>/detail', views.visit_detail, name='visit-detail'),
+]
@@ -1,3 +1,14 @@
-from django.shortcuts import render
+from django.contrib.auth.decorators import permission_required
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
 
-# Create your views here.
+from visits.detail import get_visit_detail
+
+
+@require_GET
+@permission_required('visits.view_visit', raise_exception=True)
+def visit_detail(request, pk):
+    detail = get_visit_detail(pk)
+    if detail is None:
+        raise Http404("No such visit.")
+    return JsonResponse(detail)
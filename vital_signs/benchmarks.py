@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from django.db.models import Max
+
+from benchmarks.registry import benchmark
+from vital_signs.models import VitalSign
+from vital_signs.reports import vital_sign_rows
+
+
+def last_year(ctx):
+    latest = VitalSign.objects.aggregate(latest=Max('created_at'))['latest']
+    if latest is None:
+        raise LookupError("No vital signs to report on; generate synthetic data first.")
+    return latest.date() - timedelta(days=365), latest.date()
+
+
+# The same year of vital signs read as model instances and as compact rows;
+# compare their peak memory and wall time.
+@benchmark('vital_signs.year_models', setup=last_year, repeat=5)
+def year_models(ctx, since, until):
+    list(VitalSign.objects.filter(created_at__date__gte=since, created_at__date__lte=until).order_by('created_at', 'id'))
+
+
+@benchmark('vital_signs.year_rows', setup=last_year, repeat=5)
+def year_rows(ctx, since, until):
+    list(vital_sign_rows(since, until))
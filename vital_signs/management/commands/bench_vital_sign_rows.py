@@ -0,0 +1,98 @@
+import random
+import tracemalloc
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from app.timestamps import preserve_timestamps
+from staff.models import Staff
+from visits.models import Visit
+from vital_signs.models import VitalSign
+from vital_signs.reports import REPORT_FIELDS, recorded_between, vital_sign_rows
+
+
+def strategies(since, until, chunk_size):
+    queryset = recorded_between(since, until)
+    return [
+        ('model instances', lambda: queryset.iterator(chunk_size=chunk_size)),
+        ('values_list tuples', lambda: queryset.values_list(*REPORT_FIELDS).iterator(chunk_size=chunk_size)),
+        ('compact rows', lambda: vital_sign_rows(since, until, chunk_size=chunk_size)),
+    ]
+
+
+def measure(make_iterable, keep):
+    """(rows, seconds, peak bytes) of one pass, holding every row when `keep` is set."""
+    started = perf_counter()
+    rows = list(make_iterable()) if keep else sum(1 for _ in make_iterable())
+    seconds = perf_counter() - started
+    count = len(rows) if keep else rows
+    del rows
+    tracemalloc.start()
+    try:
+        held = list(make_iterable()) if keep else sum(1 for _ in make_iterable())
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del held
+    return count, seconds, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert a year of synthetic vital signs, then compare reading them as model instances, values_list "
+        "tuples and compact rows: throughput and peak Python memory, streamed and held in a list. "
+        "Everything runs in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=365_000)
+        parser.add_argument('--batch-size', type=int, default=10_000)
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        visit_ids = list(Visit.objects.values_list('pk', flat=True)[:5000])
+        staff = Staff.objects.first()
+        if not visit_ids or staff is None:
+            raise CommandError("No visits to attach vital signs to; generate synthetic data first.")
+        rng = random.Random(options['seed'])
+        until = timezone.localdate()
+        since = until - timedelta(days=365)
+        start = datetime.combine(since, time.min, timezone.get_current_timezone())
+
+        with preserve_timestamps(VitalSign), transaction.atomic():
+            remaining = options['rows']
+            while remaining:
+                size = min(remaining, options['batch_size'])
+                VitalSign.objects.bulk_create([self.make_vital_sign(rng, start, visit_ids, staff) for _ in range(size)])
+                remaining -= size
+
+            self.stdout.write(f"{'strategy':<20} {'mode':<8} {'rows':>8} {'seconds':>8} {'rows/s':>10} {'peak MB':>9}")
+            for label, make_iterable in strategies(since, until, options['chunk_size']):
+                for mode, keep in (('stream', False), ('list', True)):
+                    count, seconds, peak = measure(make_iterable, keep)
+                    self.stdout.write(
+                        f"{label:<20} {mode:<8} {count:>8} {seconds:>8.2f} {count / seconds:>10,.0f} {peak / 2 ** 20:>9.1f}"
+                    )
+            transaction.set_rollback(True)
+
+    def make_vital_sign(self, rng, start, visit_ids, staff):
+        created = start + timedelta(minutes=rng.randrange(365 * 24 * 60))
+        return VitalSign(
+            visit_id=rng.choice(visit_ids),
+            recorded_by=staff,
+            bp_systolic=rng.randint(95, 160),
+            bp_diastolic=rng.randint(55, 100),
+            pulse_rate=rng.randint(55, 120),
+            respiratory_rate=rng.randint(12, 24),
+            temperature=Decimal(rng.randint(358, 400)) / 10,
+            weight=Decimal(rng.randint(40, 110)),
+            height=Decimal(rng.randint(140, 195)) / 100,
+            spo2=Decimal(rng.randint(90, 100)),
+            created_at=created,
+            updated_at=created,
+        )
@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from vital_signs.reports import vital_sign_rows, write_vital_signs_csv
+
+
+class Command(BaseCommand):
+    help = "Export the vital signs recorded over a date range to a CSV file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV file to write.")
+        parser.add_argument('--since', type=date.fromisoformat, help="First day to export (YYYY-MM-DD). Defaults to a year ago.")
+        parser.add_argument('--until', type=date.fromisoformat, help="Last day to export (YYYY-MM-DD). Defaults to today.")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        until = options['until'] or timezone.localdate()
+        since = options['since'] or until - timedelta(days=365)
+        if since > until:
+            raise CommandError("--since must not be after --until.")
+        with open(options['path'], 'w', newline='', encoding='utf-8') as handle:
+            count = write_vital_signs_csv(vital_sign_rows(since, until, chunk_size=options['chunk_size']), handle)
+        self.stdout.write(self.style.SUCCESS(f"Exported {count} vital signs from {since} to {until} to {options['path']}."))
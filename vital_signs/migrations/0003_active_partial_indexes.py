@@ -0,0 +1,20 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('visits', '0002_remove_visit_visits_visit_visit_status_visitstatusenum_and_more'),
+        ('vital_signs', '0002_remove_vitalsign_patient'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='vitalsign',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['visit', 'created_at'], name='vitalsign_visit_active_idx'),
+        ),
+    ]
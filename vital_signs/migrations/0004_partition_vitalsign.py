@@ -0,0 +1,28 @@
+from django.db import migrations
+
+from partitions.postgres import partition_table, unpartition_table
+
+
+def partition_vitalsign(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    VitalSign = apps.get_model('vital_signs', 'VitalSign')
+    partition_table(schema_editor.connection, VitalSign._meta.db_table, 'created_at')
+
+
+def unpartition_vitalsign(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    VitalSign = apps.get_model('vital_signs', 'VitalSign')
+    unpartition_table(schema_editor.connection, VitalSign._meta.db_table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vital_signs', '0003_active_partial_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_vitalsign, unpartition_vitalsign),
+    ]
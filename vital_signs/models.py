@@ -1,13 +1,17 @@
 from django.db import models
+from django.db.models import Q
 from django_enum import EnumField
 
+from app.managers import ActiveManager
+from audit.tracking import Audited
+
 from patients.models import Patient
 from staff.models import Staff
 from visits.models import Visit
 
 
 # Create your models here.
-class VitalSign(models.Model):
+class VitalSign(Audited, models.Model):
     class TemperatureUnitEnum(models.TextChoices):
         CELSIUS = "C", "Celsius"
         FAHRENHEIT = "F", "Fahrenheit"
@@ -44,5 +48,14 @@ class VitalSign(models.Model):
     recorded_by = models.ForeignKey(Staff, on_delete=models.PROTECT, related_name='recorded_vital_signs')
     visit = models.ForeignKey(Visit, on_delete=models.PROTECT, related_name='vital_signs')
 
+    objects = ActiveManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['visit', 'created_at'], name='vitalsign_visit_active_idx', condition=Q(is_active=True)),
+            models.Index(fields=['updated_at', 'id'], name='vitalsign_updated_idx'),
+        ]
+
     def __str__(self):
         return f"Patient {self.visit.patient.fullname} vital signs: Blood Pressure: {self.bp_systolic}/{self.bp_diastolic} mmhg | Pulse rate: {self.pulse_rate} bpm | Respiratory rate: {self.respiratory_rate} bpm | temperature: {self.temperature} {self.temperature_unit} | Weight: {self.weight} {self.weight_unit} | Height: {self.height} {self.height_unit}"
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Vital sign exports.
+
+A year of vital signs runs to hundreds of thousands of rows, more than a
+worker can hold as model instances. The export streams VitalSignRow
+namedtuples (see app.rows) in created_at order. On PostgreSQL the date range
+prunes the monthly partitions of the table.
+"""
+import csv
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from app.rows import iter_rows
+from vital_signs.models import VitalSign
+
+REPORT_FIELDS = [
+    'id', 'created_at', 'visit_id', 'visit__patient_id', 'bp_systolic', 'bp_diastolic', 'pulse_rate',
+    'respiratory_rate', 'temperature', 'temperature_unit', 'weight', 'weight_unit', 'height', 'height_unit', 'spo2',
+]
+
+VitalSignRow = namedtuple('VitalSignRow', [
+    'id', 'created_at', 'visit_id', 'patient_id', 'bp_systolic', 'bp_diastolic', 'pulse_rate',
+    'respiratory_rate', 'temperature', 'temperature_unit', 'weight', 'weight_unit', 'height', 'height_unit', 'spo2',
+])
+
+
+def recorded_between(since, until):
+    """Active vital signs recorded from day `since` up to and including day `until`, oldest first."""
+    tz = timezone.get_current_timezone()
+    return VitalSign.objects.filter(
+        created_at__gte=datetime.combine(since, time.min, tz),
+        created_at__lt=datetime.combine(until + timedelta(days=1), time.min, tz),
+    ).order_by('created_at', 'id')
+
+
+def vital_sign_rows(since, until, chunk_size=2000):
+    return iter_rows(recorded_between(since, until), REPORT_FIELDS, row=VitalSignRow, chunk_size=chunk_size)
+
+
+def write_vital_signs_csv(rows, handle):
+    """Write `rows` as CSV to `handle`; returns the number of rows written."""
+    writer = csv.writer(handle)
+    writer.writerow(VitalSignRow._fields)
+    count = 0
+    for row in rows:
+        writer.writerow(row)
+        count += 1
+    return count